@@ -5,6 +5,8 @@ from sqlalchemy import select
 
 from app.core.database import AsyncSessionLocal
 from app.models import Market, State
+from app.services.broadcast import broker
+from app.services.geo_service import GEO_CHANNEL
 
 API_KEY = "579b464db66ec23bdd0000016c8ea4c756cb4ff176ca711245797702"
 URL = "https://api.data.gov.in/resource/9ef84268-d588-465a-a308-a864a43d0070"
@@ -61,6 +63,17 @@ async def add_markets():
         
         await session.commit()
         print(f"\n✅ Added {added} new markets to database")
+    
+    if added:
+        # API workers drop their market location index (reaches them with BROADCAST_BACKEND=redis)
+        await broker.publish(GEO_CHANNEL, "markets")
+
+
+async def main():
+    try:
+        await add_markets()
+    finally:
+        await broker.close()
 
 if __name__ == "__main__":
-    asyncio.run(add_markets())
+    asyncio.run(main())
@@ -0,0 +1,167 @@
+"""Baseline schema
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-19
+
+Databases created before migrations existed (by `create_all` at startup)
+do not match this revision: their prices are float rupees with a free-text
+`source` and `fetched_at`, and `price_sources` / `price_rollups` are
+missing. Bring one to this revision, then stamp it:
+
+    python compact_prices.py                # paise, source_id, price_sources, price_rollups
+    python manage_partitions.py migrate     # PostgreSQL, only if prices is still a plain table
+    alembic stamp 0001
+    alembic upgrade head
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0001"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    partitioned = op.get_bind().dialect.name == "postgresql"
+
+    op.create_table(
+        "states",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("name", sa.String(100), nullable=False, unique=True),
+        sa.Column("name_telugu", sa.String(100)),
+        sa.Column("name_hindi", sa.String(100)),
+        sa.Column("code", sa.String(10), nullable=False, unique=True),
+    )
+    op.create_table(
+        "markets",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("name", sa.String(200), nullable=False),
+        sa.Column("name_telugu", sa.String(200)),
+        sa.Column("name_hindi", sa.String(200)),
+        sa.Column("state_id", sa.Integer(), sa.ForeignKey("states.id"), nullable=False),
+        sa.Column("district", sa.String(100), nullable=False),
+        sa.Column("latitude", sa.Float()),
+        sa.Column("longitude", sa.Float()),
+        sa.Column("is_active", sa.Boolean(), nullable=False),
+    )
+    op.create_index("ix_markets_name_id", "markets", ["name", "id"])
+    op.create_table(
+        "commodities",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("name", sa.String(100), nullable=False, unique=True),
+        sa.Column("name_telugu", sa.String(100)),
+        sa.Column("name_hindi", sa.String(100)),
+        sa.Column("category", sa.String(50), nullable=False),
+        sa.Column("image_url", sa.String(500)),
+        sa.Column("unit", sa.String(20), nullable=False),
+    )
+
+    price_sources = op.create_table(
+        "price_sources",
+        sa.Column("id", sa.SmallInteger(), primary_key=True, autoincrement=False),
+        sa.Column("name", sa.String(50), nullable=False, unique=True),
+    )
+    op.bulk_insert(price_sources, [{"id": 1, "name": "data.gov.in"}, {"id": 2, "name": "seed_data"}])
+
+    # Prices in integer paise; on PostgreSQL range-partitioned by month
+    op.create_table(
+        "prices",
+        sa.Column("id", sa.Integer(), primary_key=True, autoincrement=True),
+        sa.Column("market_id", sa.Integer(), sa.ForeignKey("markets.id"), nullable=False),
+        sa.Column("commodity_id", sa.Integer(), sa.ForeignKey("commodities.id"), nullable=False),
+        sa.Column("min_price", sa.Integer(), nullable=False),
+        sa.Column("max_price", sa.Integer(), nullable=False),
+        sa.Column("modal_price", sa.Integer(), nullable=False),
+        sa.Column("price_date", sa.Date(), nullable=False, primary_key=partitioned),
+        sa.Column("source_id", sa.SmallInteger(), sa.ForeignKey("price_sources.id"), nullable=False),
+        **({"postgresql_partition_by": "RANGE (price_date)"} if partitioned else {})
+    )
+    op.create_index("ix_prices_date_commodity_market", "prices", ["price_date", "commodity_id", "market_id"])
+    op.create_index("ix_prices_date_modal_id", "prices", ["price_date", "modal_price", "id"])
+    if partitioned:
+        # Monthly partitions are added by app.core.partitions (ingestion / manage_partitions.py)
+        op.execute("CREATE TABLE prices_default PARTITION OF prices DEFAULT")
+
+    op.create_table(
+        "price_rollups",
+        sa.Column("price_date", sa.Date(), primary_key=True),
+        sa.Column("commodity_id", sa.Integer(), sa.ForeignKey("commodities.id"), primary_key=True),
+        sa.Column("modal_total", sa.Float(), nullable=False),
+        sa.Column("row_count", sa.Integer(), nullable=False),
+        sa.Column("modal_low", sa.Float(), nullable=False),
+        sa.Column("modal_high", sa.Float(), nullable=False),
+    )
+
+    op.create_table(
+        "users",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("phone", sa.String(15), unique=True),
+        sa.Column("email", sa.String(255), unique=True),
+        sa.Column("fcm_token", sa.String(500)),
+        sa.Column("preferred_language", sa.String(10), nullable=False),
+        sa.Column("push_enabled", sa.Boolean(), nullable=False),
+        sa.Column("digest_enabled", sa.Boolean(), nullable=False),
+        sa.Column("digest_window_minutes", sa.Integer(), nullable=False),
+        sa.Column("last_digest_at", sa.DateTime()),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+    )
+    op.create_table(
+        "price_alerts",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("user_id", sa.Integer(), sa.ForeignKey("users.id"), nullable=False),
+        sa.Column("commodity_id", sa.Integer(), sa.ForeignKey("commodities.id"), nullable=False),
+        sa.Column("market_id", sa.Integer(), sa.ForeignKey("markets.id")),
+        sa.Column("threshold_price", sa.Float(), nullable=False),
+        sa.Column("alert_type", sa.String(20), nullable=False),
+        sa.Column("is_active", sa.Boolean(), nullable=False),
+        sa.Column("instant", sa.Boolean(), nullable=False),
+        sa.Column("last_triggered", sa.DateTime()),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+    )
+    op.create_index("ix_price_alerts_user_created", "price_alerts", ["user_id", "created_at", "id"])
+    op.create_table(
+        "alert_events",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("user_id", sa.Integer(), sa.ForeignKey("users.id"), nullable=False),
+        sa.Column("alert_id", sa.Integer(), sa.ForeignKey("price_alerts.id", ondelete="CASCADE"), nullable=False),
+        sa.Column("commodity_id", sa.Integer(), sa.ForeignKey("commodities.id"), nullable=False),
+        sa.Column("market_id", sa.Integer(), sa.ForeignKey("markets.id"), nullable=False),
+        sa.Column("alert_type", sa.String(20), nullable=False),
+        sa.Column("price", sa.Float(), nullable=False),
+        sa.Column("threshold_price", sa.Float(), nullable=False),
+        sa.Column("triggered_at", sa.DateTime(), nullable=False),
+        sa.Column("digested_at", sa.DateTime()),
+    )
+    op.create_index("ix_alert_events_pending", "alert_events", ["user_id", "digested_at"])
+
+    op.create_table(
+        "vendors",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("name", sa.String(200), nullable=False),
+        sa.Column("market_id", sa.Integer(), sa.ForeignKey("markets.id")),
+        sa.Column("phone", sa.String(15)),
+        sa.Column("address", sa.Text()),
+        sa.Column("latitude", sa.Float(), nullable=False),
+        sa.Column("longitude", sa.Float(), nullable=False),
+        sa.Column("is_verified", sa.Boolean(), nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+    )
+
+
+def downgrade() -> None:
+    for table in (
+        "vendors",
+        "alert_events",
+        "price_alerts",
+        "users",
+        "price_rollups",
+        "prices",
+        "price_sources",
+        "commodities",
+        "markets",
+        "states",
+    ):
+        op.drop_table(table)
@@ -0,0 +1,130 @@
+"""Change sequence and tombstones for delta sync
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-19
+
+Every insert or update of a synced row stamps its `change_seq`, and every
+delete of a catalog or alert row leaves a `sync_tombstones` entry, all
+from triggers so bulk and raw-SQL writes are tracked too.
+
+On PostgreSQL (13+) the stamp is the writing transaction's id: `/sync`
+only hands out rows of transactions older than its snapshot's xmin, so a
+long transaction that commits late is never skipped. SQLite has a single
+writer and uses a counter table instead.
+
+Existing rows keep a NULL `change_seq` (no table rewrite); a client's
+first sync, which has no token yet, receives them in full.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0002"
+down_revision = "0001"
+branch_labels = None
+depends_on = None
+
+SYNCED_TABLES = ["states", "markets", "commodities", "vendors", "prices", "price_alerts"]
+
+# Price deletes are not tombstoned: archiving removes whole months, and
+# clients drop prices older than the sync window on their own
+TOMBSTONED_TABLES = ["states", "markets", "commodities", "vendors", "price_alerts"]
+
+
+def upgrade() -> None:
+    for table in SYNCED_TABLES:
+        with op.batch_alter_table(table) as batch:
+            batch.add_column(sa.Column("change_seq", sa.BigInteger()))
+        op.create_index(f"ix_{table}_change_seq", table, ["change_seq"])
+    
+    op.create_table(
+        "sync_tombstones",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("table_name", sa.String(50), nullable=False),
+        sa.Column("row_id", sa.Integer(), nullable=False),
+        sa.Column("owner_id", sa.Integer()),
+        sa.Column("change_seq", sa.BigInteger(), nullable=False),
+    )
+    op.create_index("ix_sync_tombstones_change_seq", "sync_tombstones", ["change_seq"])
+    
+    if op.get_bind().dialect.name == "postgresql":
+        _create_postgresql_triggers()
+    else:
+        _create_sqlite_triggers()
+
+
+def _create_postgresql_triggers() -> None:
+    op.execute("""
+        CREATE FUNCTION stamp_change_seq() RETURNS trigger AS $$
+        BEGIN
+            NEW.change_seq := pg_current_xact_id()::text::bigint;
+            RETURN NEW;
+        END $$ LANGUAGE plpgsql
+    """)
+    op.execute("""
+        CREATE FUNCTION record_sync_tombstone() RETURNS trigger AS $$
+        BEGIN
+            INSERT INTO sync_tombstones (table_name, row_id, owner_id, change_seq)
+            VALUES (TG_TABLE_NAME, OLD.id, (to_jsonb(OLD) ->> 'user_id')::integer, pg_current_xact_id()::text::bigint);
+            RETURN OLD;
+        END $$ LANGUAGE plpgsql
+    """)
+    for table in SYNCED_TABLES:
+        op.execute(
+            f"CREATE TRIGGER {table}_change_seq BEFORE INSERT OR UPDATE ON {table} "
+            f"FOR EACH ROW EXECUTE FUNCTION stamp_change_seq()"
+        )
+    for table in TOMBSTONED_TABLES:
+        op.execute(
+            f"CREATE TRIGGER {table}_tombstone AFTER DELETE ON {table} "
+            f"FOR EACH ROW EXECUTE FUNCTION record_sync_tombstone()"
+        )
+
+
+def _create_sqlite_triggers() -> None:
+    op.execute("CREATE TABLE sync_counter (value BIGINT NOT NULL)")
+    op.execute("INSERT INTO sync_counter VALUES (0)")
+    for table in SYNCED_TABLES:
+        # The inner UPDATE does not fire triggers again (recursive_triggers is off)
+        for event in ("INSERT", "UPDATE"):
+            op.execute(f"""
+                CREATE TRIGGER {table}_change_seq_{event.lower()} AFTER {event} ON {table}
+                BEGIN
+                    UPDATE sync_counter SET value = value + 1;
+                    UPDATE {table} SET change_seq = (SELECT value FROM sync_counter) WHERE rowid = NEW.rowid;
+                END
+            """)
+    for table in TOMBSTONED_TABLES:
+        owner = "OLD.user_id" if table == "price_alerts" else "NULL"
+        op.execute(f"""
+            CREATE TRIGGER {table}_tombstone AFTER DELETE ON {table}
+            BEGIN
+                UPDATE sync_counter SET value = value + 1;
+                INSERT INTO sync_tombstones (table_name, row_id, owner_id, change_seq)
+                VALUES ('{table}', OLD.id, {owner}, (SELECT value FROM sync_counter));
+            END
+        """)
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name == "postgresql":
+        for table in TOMBSTONED_TABLES:
+            op.execute(f"DROP TRIGGER {table}_tombstone ON {table}")
+        for table in SYNCED_TABLES:
+            op.execute(f"DROP TRIGGER {table}_change_seq ON {table}")
+        op.execute("DROP FUNCTION record_sync_tombstone()")
+        op.execute("DROP FUNCTION stamp_change_seq()")
+    else:
+        for table in TOMBSTONED_TABLES:
+            op.execute(f"DROP TRIGGER {table}_tombstone")
+        for table in SYNCED_TABLES:
+            op.execute(f"DROP TRIGGER {table}_change_seq_insert")
+            op.execute(f"DROP TRIGGER {table}_change_seq_update")
+        op.execute("DROP TABLE sync_counter")
+    
+    op.drop_table("sync_tombstones")
+    for table in SYNCED_TABLES:
+        op.drop_index(f"ix_{table}_change_seq", table)
+        with op.batch_alter_table(table) as batch:
+            batch.drop_column("change_seq")
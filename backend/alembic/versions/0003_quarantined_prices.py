@@ -0,0 +1,42 @@
+"""Quarantine table for prices rejected by ingestion screening
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-19
+
+Rows that fail the anomaly checks in `app.services.screening_service`
+(modal outside min/max, per-quintal vs per-kg mix-ups, spikes, values
+outside the rolling MAD band) are stored here instead of in `prices`.
+Prices are floats as received, not paise.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0003"
+down_revision = "0002"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "quarantined_prices",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("market_id", sa.Integer(), sa.ForeignKey("markets.id"), nullable=False),
+        sa.Column("commodity_id", sa.Integer(), sa.ForeignKey("commodities.id"), nullable=False),
+        sa.Column("min_price", sa.Float(), nullable=False),
+        sa.Column("max_price", sa.Float(), nullable=False),
+        sa.Column("modal_price", sa.Float(), nullable=False),
+        sa.Column("price_date", sa.Date(), nullable=False),
+        sa.Column("source_id", sa.SmallInteger(), sa.ForeignKey("price_sources.id"), nullable=False),
+        sa.Column("reason", sa.String(20), nullable=False),
+        sa.Column("baseline_price", sa.Float()),
+        sa.Column("quarantined_at", sa.DateTime(), nullable=False),
+    )
+    op.create_index("ix_quarantined_prices_price_date", "quarantined_prices", ["price_date"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_quarantined_prices_price_date", "quarantined_prices")
+    op.drop_table("quarantined_prices")
@@ -4,6 +4,8 @@ from fastapi import APIRouter
 from app.api.prices import router as prices_router
 from app.api.alerts import router as alerts_router
 from app.api.markets import router as markets_router
+from app.api.vendors import router as vendors_router
+from app.api.sync import router as sync_router
 
 # Main API router
 api_router = APIRouter(prefix="/api/v1")
@@ -12,5 +14,7 @@ api_router = APIRouter(prefix="/api/v1")
 api_router.include_router(prices_router)
 api_router.include_router(alerts_router)
 api_router.include_router(markets_router)
+api_router.include_router(vendors_router)
+api_router.include_router(sync_router)
 
 __all__ = ["api_router"]
@@ -2,13 +2,22 @@
 BazaarSetu Backend - Alerts API Routes
 """
 
-from typing import List
-from fastapi import APIRouter, Depends, HTTPException
+from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.database import get_db
+from app.core.pagination import NEXT_CURSOR_HEADER
+from app.core.responses import model_list_response
 from app.services import AlertService
-from app.schemas import PriceAlertCreate, PriceAlertResponse
+from app.schemas import (
+    PriceAlertCreate,
+    PriceAlertResponse,
+    PriceAlertBulkCreate,
+    PriceAlertBulkUpdate,
+    PriceAlertBulkIds,
+    BulkAlertResponse
+)
 
 router = APIRouter(prefix="/alerts", tags=["Alerts"])
 
@@ -30,15 +39,100 @@ async def create_alert(
     return PriceAlertResponse.model_validate(alert)
 
 
+@router.post("/bulk", response_model=BulkAlertResponse)
+async def bulk_create_alerts(
+    payload: PriceAlertBulkCreate,
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Create many alerts for a user in one request.
+    
+    Each item gets its own result (`created`, `invalid`, or `not_found` for
+    an unknown user, commodity or market), in request order.
+    """
+    service = AlertService(db)
+    results = await service.bulk_create_alerts(payload.user_id, payload.alerts)
+    return _bulk_response(results)
+
+
+@router.patch("/bulk", response_model=BulkAlertResponse)
+async def bulk_update_alerts(
+    payload: PriceAlertBulkUpdate,
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Update threshold, type or flags on many alerts in one request.
+    
+    Each item is `updated`, `unchanged` (already had those values),
+    `not_found` or `invalid` (including a repeated id), in request order.
+    """
+    service = AlertService(db)
+    results = await service.bulk_update_alerts(payload.user_id, payload.alerts)
+    return _bulk_response(results)
+
+
+@router.post("/bulk/toggle", response_model=BulkAlertResponse)
+async def bulk_toggle_alerts(
+    payload: PriceAlertBulkIds,
+    db: AsyncSession = Depends(get_db)
+):
+    """Toggle the active status of many alerts in one request."""
+    service = AlertService(db)
+    results = await service.bulk_toggle_alerts(payload.user_id, payload.alert_ids)
+    return _bulk_response(results)
+
+
+@router.post("/bulk/delete", response_model=BulkAlertResponse)
+async def bulk_delete_alerts(
+    payload: PriceAlertBulkIds,
+    db: AsyncSession = Depends(get_db)
+):
+    """Delete many alerts in one request."""
+    service = AlertService(db)
+    results = await service.bulk_delete_alerts(payload.user_id, payload.alert_ids)
+    return _bulk_response(results)
+
+
+def _bulk_response(results: List[dict]) -> BulkAlertResponse:
+    """Wrap per-item service results with success/failure counts."""
+    failed = sum(1 for r in results if r["status"] in ("invalid", "not_found"))
+    return BulkAlertResponse(
+        results=results,
+        succeeded=len(results) - failed,
+        failed=failed
+    )
+
+
 @router.get("/user/{user_id}", response_model=List[PriceAlertResponse])
 async def get_user_alerts(
     user_id: int,
+    response: Response,
+    limit: Optional[int] = Query(None, ge=1, le=500, description="Page size (default: all alerts)"),
+    cursor: Optional[str] = Query(None, description="Opaque cursor from the X-Next-Cursor header"),
     db: AsyncSession = Depends(get_db)
 ):
-    """Get all alerts for a user."""
+    """
+    Get all alerts for a user, newest first.
+    
+    Pass `limit` to page through alerts; the `X-Next-Cursor` header then
+    carries the cursor for the next page.
+    """
     service = AlertService(db)
-    alerts = await service.get_user_alerts(user_id)
-    return [PriceAlertResponse.model_validate(a) for a in alerts]
+    next_cursor = None
+    if limit:
+        try:
+            alerts, next_cursor = await service.get_user_alerts_page(user_id, limit, cursor)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+    else:
+        alerts = await service.get_user_alerts(user_id)
+    
+    return model_list_response(
+        [PriceAlertResponse.model_validate(a) for a in alerts],
+        PriceAlertResponse,
+        response,
+        headers={NEXT_CURSOR_HEADER: next_cursor}
+    )
 
 
 @router.patch("/{alert_id}/toggle")
@@ -75,3 +169,19 @@ async def delete_alert(
         raise HTTPException(status_code=404, detail="Alert not found")
     
     return {"message": "Alert deleted successfully"}
+
+
+@router.post("/digests/dispatch")
+async def dispatch_digests(db: AsyncSession = Depends(get_db)):
+    """
+    Send alert digests for every user whose digest window has elapsed.
+    
+    This endpoint is for testing/admin purposes.
+    In production, digests are dispatched after each scheduled price fetch.
+    """
+    service = AlertService(db)
+    digests = await service.dispatch_digests()
+    return {
+        "sent": len(digests),
+        "events": sum(d["events"] for d in digests)
+    }
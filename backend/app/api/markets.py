@@ -2,31 +2,48 @@
 BazaarSetu Backend - Markets & Commodities API Routes
 """
 
-from typing import List, Optional
-from fastapi import APIRouter, Depends, HTTPException, Query
+from typing import Dict, List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from sqlalchemy import select
+from sqlalchemy.sql import ColumnElement, Select
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
-from app.core.database import get_db
+from app.core.database import get_read_db
+from app.core.pagination import NEXT_CURSOR_HEADER, apply_keyset, decode_cursor, split_page
+from app.core.fieldsets import INTERNAL_COLUMNS, default_fields, localized_name, requested_fields
+from app.core.responses import FastJSONResponse, model_list_response
 from app.models import State, Market, Commodity
-from app.schemas import StateResponse, MarketResponse, CommodityResponse
+from app.schemas import StateResponse, MarketResponse, MarketNearby, CommodityResponse
+from app.services import find_nearby_markets
 
 router = APIRouter(tags=["Markets & Commodities"])
 
+LANG_PATTERN = "^(en|te|hi)$"
+
 
 # ==================== States ====================
 
 @router.get("/states", response_model=List[StateResponse])
-async def get_states(db: AsyncSession = Depends(get_db)):
+async def get_states(
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return"),
+    lang: Optional[str] = Query(None, pattern=LANG_PATTERN, description="Return names in one language: en, te, hi"),
+    db: AsyncSession = Depends(get_read_db)
+):
     """Get all available states."""
+    if fields or lang:
+        available = _catalog_columns(State, lang)
+        query = _projection(available, requested_fields(fields, available), lang)
+        result = await db.execute(query.order_by(State.name))
+        return FastJSONResponse(_rows(result.all()))
+    
     result = await db.execute(select(State).order_by(State.name))
     states = result.scalars().all()
-    return [StateResponse.model_validate(s) for s in states]
+    return model_list_response([StateResponse.model_validate(s) for s in states], StateResponse)
 
 
 @router.get("/states/{state_id}", response_model=StateResponse)
-async def get_state(state_id: int, db: AsyncSession = Depends(get_db)):
+async def get_state(state_id: int, db: AsyncSession = Depends(get_read_db)):
     """Get a specific state by ID."""
     result = await db.execute(select(State).where(State.id == state_id))
     state = result.scalar_one_or_none()
@@ -41,27 +58,85 @@ async def get_state(state_id: int, db: AsyncSession = Depends(get_db)):
 
 @router.get("/markets", response_model=List[MarketResponse])
 async def get_markets(
+    response: Response,
     state_id: Optional[int] = Query(None, description="Filter by state"),
     district: Optional[str] = Query(None, description="Filter by district"),
-    db: AsyncSession = Depends(get_db)
+    limit: Optional[int] = Query(None, ge=1, le=500, description="Page size (default: all markets)"),
+    cursor: Optional[str] = Query(None, description="Opaque cursor from the X-Next-Cursor header"),
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return (state_name replaces the nested state)"),
+    lang: Optional[str] = Query(None, pattern=LANG_PATTERN, description="Return names in one language: en, te, hi"),
+    db: AsyncSession = Depends(get_read_db)
 ):
-    """Get all markets with optional filters."""
-    query = select(Market).options(selectinload(Market.state)).where(Market.is_active == True)
+    """
+    Get all markets with optional filters.
+    
+    Pass `limit` to page through results by name; the `X-Next-Cursor`
+    header then carries the cursor for the next page. With `fields` or
+    `lang`, markets come back as flat rows holding only those columns.
+    """
+    projected = bool(fields or lang)
+    if projected:
+        available = _catalog_columns(Market, lang)
+        available["state_name"] = localized_name(State, lang)
+        selected = requested_fields(fields, available)
+        query = _projection(available, selected, lang)
+        if "state_name" in (selected or default_fields(available, lang)):
+            query = query.join(State, Market.state_id == State.id)
+    else:
+        query = select(Market).options(selectinload(Market.state))
+    query = query.where(Market.is_active == True)
     
     if state_id:
         query = query.where(Market.state_id == state_id)
     if district:
         query = query.where(Market.district.ilike(f"%{district}%"))
     
-    query = query.order_by(Market.name)
+    next_cursor = None
+    if limit:
+        after = _decode_cursor(cursor, "markets:name")
+        query = apply_keyset(query, [Market.name, Market.id], after, False, limit)
+    else:
+        query = query.order_by(Market.name)
     
     result = await db.execute(query)
-    markets = result.scalars().all()
-    return [MarketResponse.model_validate(m) for m in markets]
+    markets = result.all() if projected else result.scalars().all()
+    if limit:
+        markets, next_cursor = split_page(markets, limit, "markets:name", key=_catalog_key)
+    
+    if projected:
+        return FastJSONResponse(_rows(markets), headers={NEXT_CURSOR_HEADER: next_cursor} if next_cursor else None)
+    return model_list_response(
+        [MarketResponse.model_validate(m) for m in markets],
+        MarketResponse,
+        response,
+        headers={NEXT_CURSOR_HEADER: next_cursor}
+    )
+
+
+@router.get("/markets/nearby", response_model=List[MarketNearby])
+async def get_nearby_markets(
+    lat: float = Query(..., ge=-90, le=90, description="Latitude of the search point"),
+    lon: float = Query(..., ge=-180, le=180, description="Longitude of the search point"),
+    radius_km: Optional[float] = Query(None, gt=0, le=500, description="Only markets within this distance"),
+    limit: int = Query(20, ge=1, le=200, description="Max markets (the k nearest without radius_km)"),
+    db: AsyncSession = Depends(get_read_db)
+):
+    """
+    Active markets nearest to a location, closest first, with `distance_km`.
+    
+    Backed by an in-memory grid index of market locations, so only markets
+    around the point are measured.
+    """
+    nearby = await find_nearby_markets(db, lat, lon, radius_km=radius_km, limit=limit)
+    items = [
+        MarketNearby(**MarketResponse.model_validate(market).model_dump(), distance_km=round(distance, 3))
+        for market, distance in nearby
+    ]
+    return model_list_response(items, MarketNearby)
 
 
 @router.get("/markets/{market_id}", response_model=MarketResponse)
-async def get_market(market_id: int, db: AsyncSession = Depends(get_db)):
+async def get_market(market_id: int, db: AsyncSession = Depends(get_read_db)):
     """Get a specific market by ID."""
     result = await db.execute(
         select(Market)
@@ -80,24 +155,55 @@ async def get_market(market_id: int, db: AsyncSession = Depends(get_db)):
 
 @router.get("/commodities", response_model=List[CommodityResponse])
 async def get_commodities(
+    response: Response,
     category: Optional[str] = Query(None, description="Filter by category (vegetable, fruit, etc.)"),
-    db: AsyncSession = Depends(get_db)
+    limit: Optional[int] = Query(None, ge=1, le=500, description="Page size (default: all commodities)"),
+    cursor: Optional[str] = Query(None, description="Opaque cursor from the X-Next-Cursor header"),
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return"),
+    lang: Optional[str] = Query(None, pattern=LANG_PATTERN, description="Return names in one language: en, te, hi"),
+    db: AsyncSession = Depends(get_read_db)
 ):
-    """Get all commodities with optional category filter."""
-    query = select(Commodity)
+    """
+    Get all commodities with optional category filter.
+    
+    Pass `limit` to page through results by name; the `X-Next-Cursor`
+    header then carries the cursor for the next page. With `fields` or
+    `lang`, only those columns are read and returned.
+    """
+    projected = bool(fields or lang)
+    if projected:
+        available = _catalog_columns(Commodity, lang)
+        query = _projection(available, requested_fields(fields, available), lang)
+    else:
+        query = select(Commodity)
     
     if category:
         query = query.where(Commodity.category == category)
     
-    query = query.order_by(Commodity.name)
+    next_cursor = None
+    if limit:
+        after = _decode_cursor(cursor, "commodities:name")
+        query = apply_keyset(query, [Commodity.name, Commodity.id], after, False, limit)
+    else:
+        query = query.order_by(Commodity.name)
     
     result = await db.execute(query)
-    commodities = result.scalars().all()
-    return [CommodityResponse.model_validate(c) for c in commodities]
+    commodities = result.all() if projected else result.scalars().all()
+    if limit:
+        commodities, next_cursor = split_page(commodities, limit, "commodities:name", key=_catalog_key)
+    
+    if projected:
+        return FastJSONResponse(_rows(commodities), headers={NEXT_CURSOR_HEADER: next_cursor} if next_cursor else None)
+    return model_list_response(
+        [CommodityResponse.model_validate(c) for c in commodities],
+        CommodityResponse,
+        response,
+        headers={NEXT_CURSOR_HEADER: next_cursor}
+    )
 
 
 @router.get("/commodities/{commodity_id}", response_model=CommodityResponse)
-async def get_commodity(commodity_id: int, db: AsyncSession = Depends(get_db)):
+async def get_commodity(commodity_id: int, db: AsyncSession = Depends(get_read_db)):
     """Get a specific commodity by ID."""
     result = await db.execute(select(Commodity).where(Commodity.id == commodity_id))
     commodity = result.scalar_one_or_none()
@@ -106,3 +212,55 @@ async def get_commodity(commodity_id: int, db: AsyncSession = Depends(get_db)):
         raise HTTPException(status_code=404, detail="Commodity not found")
     
     return CommodityResponse.model_validate(commodity)
+
+
+def _catalog_columns(model, lang: Optional[str]) -> Dict[str, ColumnElement]:
+    """A catalog table's own public columns, with `name` localized to `lang`."""
+    columns = {
+        column.key: getattr(model, column.key)
+        for column in model.__table__.columns
+        if column.key not in INTERNAL_COLUMNS
+    }
+    columns["name"] = localized_name(model, lang)
+    return columns
+
+
+def _projection(available: Dict[str, ColumnElement], selected: Optional[List[str]], lang: Optional[str]) -> Select:
+    """
+    Select only the requested columns.
+    
+    The English name and id are always selected (as `_name`, `_id`) because
+    ordering and cursors use them; they are dropped from the output.
+    """
+    selected = selected or default_fields(available, lang)
+    model_table = available["id"].table
+    return select(
+        *(available[field].label(field) for field in selected),
+        model_table.c.id.label("_id"),
+        model_table.c.name.label("_name")
+    )
+
+
+def _rows(rows) -> List[dict]:
+    """Projected rows as dicts, without the internal ordering columns."""
+    return [
+        {key: value for key, value in row._mapping.items() if not key.startswith("_")}
+        for row in rows
+    ]
+
+
+def _catalog_key(item) -> tuple:
+    """Cursor key for ORM objects and projected rows alike."""
+    if hasattr(item, "_id"):
+        return item._name, item._id
+    return item.name, item.id
+
+
+def _decode_cursor(cursor: Optional[str], sort: str) -> Optional[list]:
+    """Decode a list cursor, mapping bad cursors to 400."""
+    if not cursor:
+        return None
+    try:
+        return decode_cursor(cursor, sort, (str, int))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
@@ -2,25 +2,54 @@
 BazaarSetu Backend - Price API Routes
 """
 
+import asyncio
 from datetime import date
 from typing import Optional, List
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, WebSocket, WebSocketDisconnect
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.core.database import get_db
-from app.services import PriceService, price_data_service
+from app.core.binary import negotiated, VARY_ACCEPT
+from app.core.compression import negotiate_encoding
+from app.core.config import get_settings
+from app.core.database import get_read_db
+from app.core.pagination import NEXT_CURSOR_HEADER
+from app.core.fieldsets import requested_fields
+from app.core.responses import FastJSONResponse, dump_models, model_list_response
+from app.services import (
+    PriceService,
+    PRICE_FIELDS,
+    COMPARE_FIELDS,
+    price_data_service,
+    build_export_query,
+    stream_export,
+    EXPORT_MEDIA_TYPES,
+    broker,
+    price_channel,
+    filter_event,
+    snapshot_store,
+    get_price_stats
+)
 from app.schemas import (
     PriceWithDetails,
     PriceTrend,
+    PriceStats,
     MarketComparison,
-    CommodityResponse
+    CommodityResponse,
+    HomeSnapshot
 )
 
 router = APIRouter(prefix="/prices", tags=["Prices"])
+settings = get_settings()
+
+LANG_PATTERN = "^(en|te|hi)$"
+TREND_FIELDS = list(PriceTrend.model_fields)
 
 
 @router.get("/today", response_model=List[PriceWithDetails])
 async def get_today_prices(
+    request: Request,
+    response: Response,
     state_id: Optional[int] = Query(None, description="Filter by state ID"),
     commodity_id: Optional[int] = Query(None, description="Filter by commodity ID"),
     market_id: Optional[int] = Query(None, description="Filter by market ID"),
@@ -29,9 +58,12 @@ async def get_today_prices(
     sort_order: Optional[str] = Query("asc", description="Sort order: asc, desc"),
     date_from: Optional[date] = Query(None, description="Start date for price range"),
     date_to: Optional[date] = Query(None, description="End date for price range"),
-    page: int = Query(1, ge=1, description="Page number"),
+    page: int = Query(1, ge=1, description="Page number (ignored when cursor is given)"),
     page_size: int = Query(100, ge=1, le=200, description="Items per page"),
-    db: AsyncSession = Depends(get_db)
+    cursor: Optional[str] = Query(None, description="Opaque cursor from the X-Next-Cursor header"),
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return (e.g. commodity_name,modal_price)"),
+    lang: Optional[str] = Query(None, pattern=LANG_PATTERN, description="Return names in one language: en, te, hi"),
+    db: AsyncSession = Depends(get_read_db)
 ):
     """
     Get today's vegetable prices.
@@ -39,28 +71,89 @@ async def get_today_prices(
     Returns prices with optional filtering by state, commodity, market, or category.
     Supports sorting by name, price, or price change.
     Includes price change percentage compared to yesterday.
+    
+    When more rows exist, the `X-Next-Cursor` response header holds a cursor
+    for the next page. Pass it back as `cursor` (with the same sort) for
+    stable pages that cost the same at any depth.
+    
+    `fields` and `lang` shrink each row to the requested columns and a
+    single language; only those columns are read from the database.
+    
+    Send `Accept: application/x-msgpack` (here and on the trend, stats, compare
+    and sync endpoints) for a compact MessagePack body; see
+    `app.core.binary.dump_msgpack` for its layout.
     """
+    selected = requested_fields(fields, PRICE_FIELDS)
     service = PriceService(db)
-    return await service.get_today_prices(
-        state_id=state_id,
-        commodity_id=commodity_id,
-        market_id=market_id,
-        category=category,
-        sort_by=sort_by,
-        sort_order=sort_order,
-        date_from=date_from,
-        date_to=date_to,
-        page=page,
-        page_size=page_size
-    )
+    try:
+        prices, next_cursor = await service.get_today_prices_page(
+            state_id=state_id,
+            commodity_id=commodity_id,
+            market_id=market_id,
+            category=category,
+            sort_by=sort_by,
+            sort_order=sort_order,
+            date_from=date_from,
+            date_to=date_to,
+            page=page,
+            page_size=page_size,
+            cursor=cursor,
+            fields=selected,
+            lang=lang
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    headers = {**VARY_ACCEPT, **({NEXT_CURSOR_HEADER: next_cursor} if next_cursor else {})}
+    binary = negotiated(request, prices, headers)
+    if binary is not None:
+        return binary
+    if selected or lang:
+        # Partial rows are plain dicts; PriceWithDetails would reject them
+        return FastJSONResponse(prices, headers=headers)
+    return model_list_response(prices, PriceWithDetails, response, headers=headers)
+
+
+@router.get("/snapshot", response_model=HomeSnapshot)
+async def get_home_snapshot(
+    request: Request,
+    state_id: Optional[int] = Query(None, description="State to build the home screen for (default: all states)")
+):
+    """
+    Today's home screen in one response: states, markets, prices with
+    change %, and top movers.
+    
+    Snapshots are built after each ingestion and held pre-encoded and
+    pre-compressed in memory, so this endpoint only touches the database
+    to rebuild them: after midnight, or once they are older than
+    `cache_fallback_ttl_seconds`. Send `If-None-Match` to get a 304 when
+    nothing changed.
+    """
+    await snapshot_store.ensure_built()
+    snapshot = snapshot_store.get(state_id)
+    if snapshot is None:
+        raise HTTPException(status_code=404, detail="State not found")
+    
+    headers = {"ETag": snapshot.etag, "Cache-Control": "no-cache", "Vary": "Accept-Encoding"}
+    if request.headers.get("if-none-match") == snapshot.etag:
+        return Response(status_code=304, headers=headers)
+    
+    encoding = negotiate_encoding(request.headers.get("accept-encoding", ""))
+    if encoding != "identity":
+        headers["Content-Encoding"] = encoding
+    return Response(content=snapshot.bodies[encoding], media_type="application/json", headers=headers)
 
 
 @router.get("/trend/{commodity_id}", response_model=PriceTrend)
 async def get_price_trend(
+    request: Request,
+    response: Response,
     commodity_id: int,
     market_id: Optional[int] = Query(None, description="Specific market (optional)"),
     days: int = Query(30, ge=7, le=365, description="Number of days for trend"),
-    db: AsyncSession = Depends(get_db)
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return (e.g. trend_data,price_change_7d)"),
+    lang: Optional[str] = Query(None, pattern=LANG_PATTERN, description="Return names in one language: en, te, hi"),
+    db: AsyncSession = Depends(get_read_db)
 ):
     """
     Get price trend for a commodity.
@@ -68,44 +161,276 @@ async def get_price_trend(
     Returns historical prices with average, min, max, and percentage changes.
     If no market specified, returns average across all markets.
     """
+    selected = requested_fields(fields, TREND_FIELDS)
     service = PriceService(db)
     try:
-        return await service.get_price_trend(
+        trend = await service.get_price_trend(
             commodity_id=commodity_id,
             market_id=market_id,
-            days=days
+            days=days,
+            lang=lang
         )
     except ValueError as e:
         raise HTTPException(status_code=404, detail=str(e))
+    
+    binary = negotiated(request, trend.model_dump(include=set(selected)) if selected else trend)
+    if binary is not None:
+        return binary
+    if selected:
+        return FastJSONResponse(trend.model_dump_json(include=set(selected)).encode("utf-8"), headers=VARY_ACCEPT)
+    response.headers.update(VARY_ACCEPT)
+    return trend
+
+
+@router.get("/trends", response_model=List[PriceTrend])
+async def get_price_trends(
+    request: Request,
+    response: Response,
+    commodity_ids: List[int] = Query(..., min_length=1, max_length=50, description="Commodity IDs (repeat the parameter)"),
+    market_ids: Optional[List[int]] = Query(None, max_length=20, description="Markets (optional); one series per commodity and market"),
+    days: int = Query(30, ge=7, le=365, description="Number of days for trend"),
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return for each series"),
+    lang: Optional[str] = Query(None, pattern=LANG_PATTERN, description="Return names in one language: en, te, hi"),
+    db: AsyncSession = Depends(get_read_db)
+):
+    """
+    Get price trends for several commodities in one request.
+    
+    Use this for comparison and watchlist screens instead of calling
+    `/prices/trend/{commodity_id}` once per commodity. Duplicate IDs are
+    ignored and commodities without data are left out.
+    """
+    selected = requested_fields(fields, TREND_FIELDS)
+    service = PriceService(db)
+    trends = await service.get_price_trends(
+        commodity_ids=commodity_ids,
+        market_ids=market_ids,
+        days=days,
+        lang=lang
+    )
+    
+    binary = negotiated(request, [t.model_dump(include=set(selected)) for t in trends] if selected else trends)
+    if binary is not None:
+        return binary
+    if selected:
+        return FastJSONResponse(dump_models(trends, PriceTrend, include=selected), headers=VARY_ACCEPT)
+    response.headers.update(VARY_ACCEPT)
+    return trends
+
+
+@router.get("/stats", response_model=List[PriceStats])
+async def get_price_statistics(
+    request: Request,
+    response: Response,
+    commodity_ids: Optional[List[int]] = Query(None, max_length=200, description="Commodity IDs (repeat the parameter; default: all)"),
+    market_ids: Optional[List[int]] = Query(None, max_length=500, description="Markets (optional); one series per commodity and market"),
+    by_market: bool = Query(False, description="One series per commodity and market, for every market"),
+    days: int = Query(365, ge=7, le=366, description="Days of history (percentiles cover all of them)"),
+    lang: Optional[str] = Query(None, pattern=LANG_PATTERN, description="Return names in one language: en, te, hi"),
+    db: AsyncSession = Depends(get_read_db)
+):
+    """
+    Price statistics for many commodities (and markets) in one request.
+    
+    Each series has its latest price, 7/30/90-day moving averages and %
+    changes, 30-day volatility (standard deviation of daily log returns,
+    in %) and the 10th/50th/90th percentiles over `days`. Without
+    `market_ids` or `by_market` each commodity is averaged across markets.
+    A year of every commodity and market is computed in one pass, so
+    prefer this over walking `/prices/trends` for dashboards.
+    """
+    stats = await get_price_stats(
+        db,
+        commodity_ids=commodity_ids,
+        market_ids=market_ids,
+        by_market=by_market,
+        days=days,
+        lang=lang
+    )
+    return negotiated(request, stats) or model_list_response(stats, PriceStats, response, headers=VARY_ACCEPT)
 
 
 @router.get("/compare/{commodity_id}", response_model=MarketComparison)
 async def compare_markets(
+    request: Request,
+    response: Response,
     commodity_id: int,
     price_date: Optional[date] = Query(None, description="Date to compare (default: today)"),
-    db: AsyncSession = Depends(get_db)
+    fields: Optional[str] = Query(None, description="Comma-separated per-market fields (e.g. market_name,modal_price)"),
+    lang: Optional[str] = Query(None, pattern=LANG_PATTERN, description="Return names in one language: en, te, hi"),
+    lat: Optional[float] = Query(None, ge=-90, le=90, description="Your latitude, to rank by price plus travel cost"),
+    lon: Optional[float] = Query(None, ge=-180, le=180, description="Your longitude, to rank by price plus travel cost"),
+    cost_per_km: float = Query(0.0, ge=0, description="Travel cost per km, in the same currency as prices"),
+    quantity: float = Query(1.0, gt=0, description="Units you plan to buy or sell (scales the price part of the cost)"),
+    limit: Optional[int] = Query(None, ge=1, le=500, description="Return only the best N markets"),
+    db: AsyncSession = Depends(get_read_db)
 ):
     """
     Compare prices across markets for a commodity.
     
     Returns prices from all available markets, sorted by modal price.
     Helps find the cheapest market for a vegetable.
+    
+    Pass `lat` and `lon` to rank by effective cost instead:
+    `modal_price * quantity + cost_per_km * distance_km`. Each market then
+    includes `distance_km` and `effective_cost`.
     """
+    if (lat is None) != (lon is None):
+        raise HTTPException(status_code=400, detail="lat and lon must be given together")
+    
+    selected = requested_fields(fields, COMPARE_FIELDS)
     service = PriceService(db)
     try:
-        return await service.compare_markets(
+        comparison = await service.compare_markets(
             commodity_id=commodity_id,
-            target_date=price_date
+            target_date=price_date,
+            fields=selected,
+            lang=lang,
+            lat=lat,
+            lon=lon,
+            cost_per_km=cost_per_km,
+            quantity=quantity,
+            limit=limit
         )
     except ValueError as e:
         raise HTTPException(status_code=404, detail=str(e))
+    
+    response.headers.update(VARY_ACCEPT)
+    return negotiated(request, comparison) or comparison
+
+
+@router.get("/export")
+async def export_prices(
+    format: str = Query("csv", pattern="^(csv|ndjson|parquet)$", description="csv, ndjson or parquet"),
+    date_from: Optional[date] = Query(None, description="First day to export (default: 30 days before date_to)"),
+    date_to: Optional[date] = Query(None, description="Last day to export (default: today)"),
+    state_id: Optional[int] = Query(None, description="Filter by state ID"),
+    market_id: Optional[int] = Query(None, description="Filter by market ID"),
+    commodity_id: Optional[int] = Query(None, description="Filter by commodity ID")
+):
+    """
+    Stream price history for bulk analysis.
+    
+    Rows are read with a server-side cursor and written out batch by batch,
+    so exports of any size use constant memory. Prefer this over paging
+    through `/prices/today` day by day. Archived months are read from
+    their Parquet files and streamed ahead of the live rows.
+    """
+    if date_from and date_to and date_from > date_to:
+        raise HTTPException(status_code=400, detail="date_from must not be after date_to")
+    
+    export = build_export_query(
+        date_from=date_from,
+        date_to=date_to,
+        state_id=state_id,
+        market_id=market_id,
+        commodity_id=commodity_id
+    )
+    chunks = stream_export(export, fmt=format)
+    try:
+        # Surface setup errors (e.g. an unsupported format) before streaming starts
+        first = await chunks.__anext__()
+    except StopAsyncIteration:
+        first = b""
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    async def body():
+        yield first
+        async for chunk in chunks:
+            yield chunk
+    
+    return StreamingResponse(
+        body(),
+        media_type=EXPORT_MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="prices.{format}"'}
+    )
+
+
+@router.get("/stream")
+async def stream_price_updates(
+    state_id: Optional[int] = Query(None, description="Only updates for markets in this state"),
+    market_id: Optional[int] = Query(None, description="Only updates for this market"),
+    commodity_id: Optional[int] = Query(None, description="Only updates for this commodity")
+):
+    """
+    Push price updates as Server-Sent Events.
+    
+    Instead of polling `/prices/today`, open an `EventSource` here once
+    and apply the `prices` events as they arrive. Each event carries
+    compact deltas for the prices stored by the latest ingestion:
+    `s`/`m`/`c` (state, market, commodity ids), `d` (date), `p`/`lo`/`hi`
+    (modal, min, max price) and `chg` (% change from the previous day).
+    """
+    channel = price_channel(state_id, market_id, commodity_id)
+    
+    async def events():
+        async with broker.subscribe(channel) as subscription:
+            yield b"retry: 5000\n\n"
+            while True:
+                message = await subscription.get(timeout=settings.stream_heartbeat_seconds)
+                if message is None:
+                    # Comment line keeps proxies from closing an idle stream
+                    yield b": ping\n\n"
+                    continue
+                message = filter_event(message, state_id, market_id, commodity_id)
+                if message is not None:
+                    yield f"event: prices\ndata: {message}\n\n".encode()
+    
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+@router.websocket("/ws")
+async def price_updates_socket(
+    websocket: WebSocket,
+    state_id: Optional[int] = None,
+    market_id: Optional[int] = None,
+    commodity_id: Optional[int] = None
+):
+    """
+    Push price updates over a WebSocket.
+    
+    Same filters and event payload as `/prices/stream`, sent as JSON text
+    frames; anything the client sends is ignored.
+    """
+    await websocket.accept()
+    channel = price_channel(state_id, market_id, commodity_id)
+    
+    async with broker.subscribe(channel) as subscription:
+        # Reading is the only way to notice the client going away
+        receiver = asyncio.create_task(_drain_socket(websocket))
+        try:
+            while not receiver.done():
+                message = await subscription.get(timeout=settings.stream_heartbeat_seconds)
+                if message is None:
+                    continue
+                message = filter_event(message, state_id, market_id, commodity_id)
+                if message is not None:
+                    await websocket.send_text(message)
+        except WebSocketDisconnect:
+            pass
+        finally:
+            receiver.cancel()
+
+
+async def _drain_socket(websocket: WebSocket) -> None:
+    """Discard client messages until it disconnects."""
+    try:
+        while True:
+            await websocket.receive_text()
+    except WebSocketDisconnect:
+        pass
 
 
 @router.get("/search", response_model=List[CommodityResponse])
 async def search_commodities(
     q: str = Query(..., min_length=2, description="Search query"),
     limit: int = Query(20, ge=1, le=50, description="Max results"),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """
     Search for commodities by name.
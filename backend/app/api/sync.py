@@ -0,0 +1,41 @@
+"""
+BazaarSetu Backend - Delta Sync API Routes
+"""
+
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.binary import negotiated, VARY_ACCEPT
+from app.core.database import get_read_db
+from app.core.responses import FastJSONResponse, dump_json
+from app.schemas import SyncResponse
+from app.services import collect_changes, parse_sync_token
+
+router = APIRouter(prefix="/sync", tags=["Sync"])
+
+
+@router.get("", response_model=SyncResponse)
+async def sync(
+    request: Request,
+    since: Optional[str] = Query(None, description="Token from the previous sync; omit for a full first sync"),
+    user_id: Optional[int] = Query(None, description="Also sync this user's alerts"),
+    db: AsyncSession = Depends(get_read_db)
+):
+    """
+    Everything inserted, updated or deleted since `since`, for offline-first clients.
+    
+    Covers states, commodities, markets, vendors, recent prices and (with
+    `user_id`) alerts. Tables come as column names plus value rows, with
+    the ids of deleted rows; unchanged tables are omitted, so a sync with
+    nothing new is a few bytes. Store the returned `token` and pass it as
+    `since` next time.
+    """
+    try:
+        since_seq = parse_sync_token(since)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    changes = await collect_changes(db, since_seq, user_id=user_id)
+    headers = {"Cache-Control": "no-store", **VARY_ACCEPT}
+    return negotiated(request, changes, headers) or FastJSONResponse(dump_json(changes), headers=headers)
@@ -0,0 +1,107 @@
+"""
+BazaarSetu Backend - Vendors API Routes
+"""
+
+from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Path, Query, Request, Response
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import get_settings
+from app.core.database import get_db, get_read_db
+from app.core.responses import model_list_response
+from app.models import Vendor, Market
+from app.services import broker, find_nearby_vendors, vendor_tiles, GEO_CHANNEL
+from app.schemas import VendorCreate, VendorResponse, VendorNearby
+
+router = APIRouter(prefix="/vendors", tags=["Vendors"])
+settings = get_settings()
+
+
+@router.post("/", response_model=VendorResponse)
+async def create_vendor(
+    vendor_data: VendorCreate,
+    db: AsyncSession = Depends(get_db)
+):
+    """Register a vendor/shop at a location."""
+    if vendor_data.market_id:
+        market = await db.get(Market, vendor_data.market_id)
+        if not market:
+            raise HTTPException(status_code=404, detail="Market not found")
+    
+    vendor = Vendor(**vendor_data.model_dump())
+    db.add(vendor)
+    await db.commit()
+    await db.refresh(vendor)
+    
+    # Every worker drops its vendor location index
+    await broker.publish(GEO_CHANNEL, "vendors")
+    return VendorResponse.model_validate(vendor)
+
+
+@router.get("/nearby", response_model=List[VendorNearby])
+async def get_nearby_vendors(
+    lat: float = Query(..., ge=-90, le=90, description="Latitude of the search point"),
+    lon: float = Query(..., ge=-180, le=180, description="Longitude of the search point"),
+    radius_km: Optional[float] = Query(None, gt=0, le=100, description="Only vendors within this distance"),
+    limit: int = Query(20, ge=1, le=200, description="Max vendors (the k nearest without radius_km)"),
+    market_id: Optional[int] = Query(None, description="Only vendors attached to this market"),
+    verified_only: bool = Query(False, description="Only verified vendors"),
+    db: AsyncSession = Depends(get_read_db)
+):
+    """
+    Vendors nearest to a location, closest first, with `distance_km`.
+    
+    Backed by an in-memory grid index of vendor locations that is rebuilt
+    after vendors change.
+    """
+    nearby = await find_nearby_vendors(
+        db, lat, lon,
+        radius_km=radius_km,
+        limit=limit,
+        market_id=market_id,
+        verified_only=verified_only
+    )
+    items = [
+        VendorNearby(**VendorResponse.model_validate(vendor).model_dump(), distance_km=round(distance, 3))
+        for vendor, distance in nearby
+    ]
+    return model_list_response(items, VendorNearby)
+
+
+@router.get("/tiles/{z}/{x}/{y}")
+async def get_vendor_tile(
+    request: Request,
+    z: int = Path(..., ge=0, le=20, description="Zoom level"),
+    x: int = Path(..., ge=0, description="Tile column"),
+    y: int = Path(..., ge=0, description="Tile row")
+):
+    """
+    Vendors in one web-mercator map tile (same z/x/y scheme as OSM tiles).
+    
+    Up to the cluster zoom the tile holds `clusters` (mean position, vendor
+    count and verified count per grid cell); above it, individual
+    `vendors`. Clusters are precomputed for every zoom level and encoded
+    tiles are cached, so panning only ever costs a lookup. Responses carry
+    an ETag and may be cached by the client.
+    """
+    if x >= 1 << z or y >= 1 << z:
+        raise HTTPException(status_code=400, detail=f"Tile {x}/{y} is outside zoom level {z}")
+    
+    body, etag = await vendor_tiles.get_tile(z, x, y)
+    headers = {"ETag": etag, "Cache-Control": f"public, max-age={settings.vendor_tile_cache_ttl_seconds // 10}"}
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
+@router.get("/{vendor_id}", response_model=VendorResponse)
+async def get_vendor(vendor_id: int, db: AsyncSession = Depends(get_read_db)):
+    """Get a specific vendor by ID."""
+    result = await db.execute(select(Vendor).where(Vendor.id == vendor_id))
+    vendor = result.scalar_one_or_none()
+    
+    if not vendor:
+        raise HTTPException(status_code=404, detail="Vendor not found")
+    
+    return VendorResponse.model_validate(vendor)
@@ -0,0 +1,183 @@
+"""
+BazaarSetu Backend - Compact Binary Responses
+MessagePack encoding with column-oriented lists and a table of repeated strings, for mobile clients.
+"""
+
+from datetime import date, datetime
+from typing import Any, Dict, List, Optional
+
+from fastapi import Request, Response
+from pydantic import BaseModel
+
+from app.core.responses import list_adapter
+
+try:
+    import msgpack
+except ImportError:  # msgpack is optional; without it every client gets JSON
+    msgpack = None
+
+
+MSGPACK_MEDIA_TYPE = "application/x-msgpack"
+MSGPACK_MEDIA_TYPES = (MSGPACK_MEDIA_TYPE, "application/msgpack", "application/vnd.msgpack")
+
+# Ext type of a reference into the payload's string table (big-endian index)
+STRING_REF = 1
+
+# A reference costs 3-4 bytes, so shorter strings are always sent inline
+MIN_SHARED_STRING_CHARS = 4
+
+# Negotiated endpoints send JSON or MessagePack for the same URL; both need this for shared caches
+VARY_ACCEPT = {"Vary": "Accept"}
+
+
+def wants_msgpack(request: Request) -> bool:
+    """Whether the client's Accept header asks for MessagePack (and we can produce it)."""
+    if msgpack is None:
+        return False
+    for part in request.headers.get("accept", "").lower().split(","):
+        media_type, _, params = part.strip().partition(";")
+        if media_type.strip() in MSGPACK_MEDIA_TYPES:
+            params = params.strip()
+            if params.startswith("q="):
+                try:
+                    return float(params[2:]) > 0
+                except ValueError:
+                    return False
+            return True
+    return False
+
+
+_NUMBERS = {int, float, bool, type(None)}
+
+
+def _compact_float(value: float) -> Any:
+    """Whole numbers (most mandi prices) as ints: 1-3 bytes instead of a 9-byte float64."""
+    return int(value) if value.is_integer() and abs(value) < 2 ** 53 else value
+
+
+_STRINGS = {str, type(None)}
+
+
+class _CompactEncoder:
+    """
+    Turns response content into plain data for packing, in one pass.
+    
+    Models become dicts and dates ISO strings; a list of objects with the
+    same keys becomes `{"columns": [...], "rows": [[...]]}` so keys are sent
+    once per list instead of once per row; and each distinct string value
+    of `MIN_SHARED_STRING_CHARS` or more is added to `strings` on first
+    sight and sent as a reference everywhere it occurs.
+    """
+    
+    def __init__(self):
+        self.strings: List[str] = []
+        self._refs: Dict[str, "msgpack.ExtType"] = {}
+    
+    def share(self, text: str) -> Any:
+        ref = self._refs.get(text)
+        if ref is None:
+            if len(text) < MIN_SHARED_STRING_CHARS:
+                return text
+            index = len(self.strings)
+            width = 1 if index < 0x100 else 2 if index < 0x10000 else 4
+            ref = self._refs[text] = msgpack.ExtType(STRING_REF, index.to_bytes(width, "big"))
+            self.strings.append(text)
+        return ref
+    
+    def column(self, values: List[Any]) -> List[Any]:
+        """Encode one column of a table; plain numbers and strings take a fast path."""
+        kinds = {type(value) for value in values}
+        if float in kinds and kinds <= _NUMBERS:
+            return [_compact_float(value) if type(value) is float else value for value in values]
+        if kinds <= _NUMBERS:
+            return values
+        if kinds <= _STRINGS:
+            share = self.share
+            return [value if value is None else share(value) for value in values]
+        return [self.encode(value) for value in values]
+    
+    def encode(self, value: Any) -> Any:
+        if isinstance(value, str):
+            return self.share(value)
+        if type(value) is float:
+            return _compact_float(value)
+        if isinstance(value, (int, bool)) or value is None:
+            return value
+        if isinstance(value, BaseModel):
+            value = value.model_dump()
+        if isinstance(value, dict):
+            return {key: self.encode(item) for key, item in value.items()}
+        if isinstance(value, (list, tuple)):
+            if value and isinstance(value[0], BaseModel) and all(type(item) is type(value[0]) for item in value):
+                # One pydantic-core call for the whole list instead of one per model
+                value = list_adapter(type(value[0])).dump_python(list(value))
+            if value and all(isinstance(item, dict) for item in value):
+                columns = list(value[0])
+                if all(len(item) == len(columns) and list(item) == columns for item in value):
+                    encoded = [self.column([item[column] for item in value]) for column in columns]
+                    return {"columns": columns, "rows": [list(row) for row in zip(*encoded)]}
+            return [self.encode(item) for item in value]
+        if isinstance(value, (date, datetime)):
+            return self.share(value.isoformat())
+        return value
+
+
+def dump_msgpack(content: Any) -> bytes:
+    """
+    Encode a response body as compact MessagePack.
+    
+    The result is `{"strings": [...], "data": ...}`. String values
+    (commodity, market and state names, dates, units...) are stored once
+    in `strings` and referenced from `data` by an ext value of type
+    `STRING_REF` whose payload is the big-endian index; strings shorter
+    than a reference are sent inline. Lists of objects are
+    column-oriented (see `_CompactEncoder`), and whole-number floats are
+    sent as integers.
+    """
+    encoder = _CompactEncoder()
+    data = encoder.encode(content)
+    return msgpack.packb({"strings": encoder.strings, "data": data}, use_bin_type=True)
+
+
+def load_msgpack(body: bytes) -> Any:
+    """Decode `dump_msgpack` output back to plain data (what a client does)."""
+    strings = []
+    
+    def ext_hook(code: int, payload: bytes):
+        if code == STRING_REF:
+            return strings[int.from_bytes(payload, "big")]
+        return msgpack.ExtType(code, payload)
+    
+    # The string table precedes the data, so it is complete before any reference
+    unpacker = msgpack.Unpacker(raw=False, ext_hook=ext_hook)
+    unpacker.feed(body)
+    envelope_size = unpacker.read_map_header()
+    message = {}
+    for _ in range(envelope_size):
+        key = unpacker.unpack()
+        message[key] = unpacker.unpack()
+        if key == "strings":
+            strings.extend(message[key])
+    return message["data"]
+
+
+class MsgPackResponse(Response):
+    """Response encoded with `dump_msgpack`."""
+    
+    media_type = MSGPACK_MEDIA_TYPE
+    
+    def render(self, content: Any) -> bytes:
+        return dump_msgpack(content)
+
+
+def negotiated(request: Request, content: Any, headers: Optional[Dict[str, str]] = None) -> Optional[Response]:
+    """
+    A MessagePack response if the client asked for one, else None (send JSON as usual).
+    
+    The MessagePack response carries `Vary: Accept`; the route adds
+    `VARY_ACCEPT` to its JSON response too.
+    """
+    if not wants_msgpack(request):
+        return None
+    headers = {k: v for k, v in (headers or {}).items() if v is not None}
+    return MsgPackResponse(content, headers={**headers, **VARY_ACCEPT})
@@ -0,0 +1,75 @@
+"""
+BazaarSetu Backend - In-Process Cache
+Small TTL + LRU cache shared by response and service-level caching.
+"""
+
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, Optional
+
+from app.core.config import get_settings
+
+
+settings = get_settings()
+
+
+class TTLCache:
+    """
+    Dictionary-like cache with per-entry expiry and LRU eviction.
+    
+    Lives in one worker process and is only touched from the event loop,
+    so no locking is needed.
+    """
+    
+    def __init__(self, ttl_seconds: float, max_entries: int = 1024):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._data: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+    
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Return a live entry (refreshing its LRU position) or `default`."""
+        entry = self._data.get(key)
+        if entry is None:
+            self.misses += 1
+            return default
+        
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            del self._data[key]
+            self.misses += 1
+            return default
+        
+        self._data.move_to_end(key)
+        self.hits += 1
+        return value
+    
+    def set(self, key: Hashable, value: Any, ttl_seconds: Optional[float] = None) -> None:
+        """Store a value, evicting the least recently used entries when full."""
+        ttl = self.ttl_seconds if ttl_seconds is None else ttl_seconds
+        self._data[key] = (time.monotonic() + ttl, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.max_entries:
+            self._data.popitem(last=False)
+    
+    def clear(self) -> None:
+        """Drop every entry (e.g. after new prices are ingested)."""
+        self._data.clear()
+    
+    def discard_where(self, predicate: Callable[[Hashable], bool]) -> int:
+        """Drop the entries whose key matches `predicate` and return how many were dropped."""
+        keys = [key for key in self._data if predicate(key)]
+        for key in keys:
+            del self._data[key]
+        return len(keys)
+    
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+# Compressed HTTP responses, filled by CompressionMiddleware
+response_cache = TTLCache(
+    ttl_seconds=settings.response_cache_ttl_seconds,
+    max_entries=settings.response_cache_max_entries
+)
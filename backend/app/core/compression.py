@@ -0,0 +1,201 @@
+"""
+BazaarSetu Backend - Response Compression
+Negotiated gzip/brotli compression with a cache of already-compressed responses.
+"""
+
+import gzip
+import zlib
+from typing import List, Optional, Tuple
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.cache import TTLCache
+
+try:
+    import brotli
+except ImportError:  # brotli is optional; gzip is always available
+    brotli = None
+
+
+COMPRESSIBLE_TYPES = ("application/json", "text/", "application/x-ndjson", "application/javascript", "application/x-msgpack")
+
+# Compressors buffer output, which would hold back server-sent events
+UNCOMPRESSIBLE_TYPES = ("text/event-stream",)
+
+
+def negotiate_encoding(accept_encoding: str) -> str:
+    """Pick the best supported encoding from an Accept-Encoding header."""
+    offered = {}
+    for part in accept_encoding.lower().split(","):
+        name, _, params = part.strip().partition(";")
+        quality = 1.0
+        if params.strip().startswith("q="):
+            try:
+                quality = float(params.strip()[2:])
+            except ValueError:
+                quality = 0.0
+        if name:
+            offered[name] = quality
+    
+    if brotli is not None and offered.get("br", 0) > 0:
+        return "br"
+    if offered.get("gzip", 0) > 0:
+        return "gzip"
+    return "identity"
+
+
+class _StreamCompressor:
+    """Incremental compressor for responses sent in several body chunks."""
+    
+    def __init__(self, encoding: str, gzip_level: int, brotli_quality: int):
+        if encoding == "br":
+            self._compressor = brotli.Compressor(quality=brotli_quality)
+            self._compress = self._compressor.process
+            self._finish = self._compressor.finish
+        else:
+            self._compressor = zlib.compressobj(gzip_level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+            self._compress = self._compressor.compress
+            self._finish = self._compressor.flush
+    
+    def compress(self, data: bytes, final: bool) -> bytes:
+        chunk = self._compress(data)
+        if final:
+            chunk += self._finish()
+        return chunk
+
+
+class CompressionMiddleware:
+    """
+    Compress responses above a size threshold with the client's preferred encoding.
+    
+    GET responses under `cache_paths` are stored *after* compression, keyed by
+    path, query, Accept and chosen encoding, so repeated hits are served as
+    stored bytes without running the endpoint or the compressor again.
+    """
+    
+    def __init__(
+        self,
+        app: ASGIApp,
+        cache: TTLCache,
+        cache_paths: List[str],
+        minimum_size: int = 1024,
+        gzip_level: int = 6,
+        brotli_quality: int = 5
+    ):
+        self.app = app
+        self.cache = cache
+        self.cache_paths = tuple(cache_paths)
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+    
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        
+        request_headers = Headers(scope=scope)
+        encoding = negotiate_encoding(request_headers.get("accept-encoding", ""))
+        
+        cache_key = None
+        if scope["method"] == "GET" and scope["path"].startswith(self.cache_paths):
+            cache_key = (
+                scope["path"],
+                scope.get("query_string", b""),
+                request_headers.get("accept", ""),
+                encoding
+            )
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                status, headers, body = cached
+                await send({"type": "http.response.start", "status": status, "headers": headers + [(b"x-cache", b"HIT")]})
+                await send({"type": "http.response.body", "body": body})
+                return
+        
+        responder = _CompressionResponder(self, send, encoding, cache_key)
+        await self.app(scope, receive, responder)
+    
+    def compress(self, body: bytes, encoding: str) -> bytes:
+        if encoding == "br":
+            return brotli.compress(body, quality=self.brotli_quality)
+        return gzip.compress(body, compresslevel=self.gzip_level)
+
+
+class _CompressionResponder:
+    """Wraps `send` for one request, deciding on compression at the first body chunk."""
+    
+    def __init__(self, middleware: CompressionMiddleware, send: Send, encoding: str, cache_key: Optional[tuple]):
+        self.middleware = middleware
+        self.send = send
+        self.encoding = encoding
+        self.cache_key = cache_key
+        self.start_message: Optional[Message] = None
+        self.streamer: Optional[_StreamCompressor] = None
+        self.passthrough = False
+    
+    async def __call__(self, message: Message) -> None:
+        if message["type"] == "http.response.start":
+            # Hold the start message until we know whether the body is compressed
+            self.start_message = message
+            return
+        
+        if message["type"] != "http.response.body":
+            await self.send(message)
+            return
+        
+        if self.passthrough:
+            await self.send(message)
+            return
+        
+        if self.streamer is not None:
+            final = not message.get("more_body", False)
+            await self.send({
+                "type": "http.response.body",
+                "body": self.streamer.compress(message.get("body", b""), final),
+                "more_body": not final
+            })
+            return
+        
+        await self._first_chunk(message)
+    
+    async def _first_chunk(self, message: Message) -> None:
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+        headers = MutableHeaders(raw=list(self.start_message["headers"]))
+        
+        compressible = (
+            self.encoding != "identity"
+            and "content-encoding" not in headers
+            and headers.get("content-type", "").startswith(COMPRESSIBLE_TYPES)
+            and not headers.get("content-type", "").startswith(UNCOMPRESSIBLE_TYPES)
+        )
+        if compressible:
+            headers.add_vary_header("Accept-Encoding")
+        
+        if more_body:
+            # Streaming response: compress incrementally, never cache
+            if compressible:
+                headers["Content-Encoding"] = self.encoding
+                del headers["Content-Length"]
+                self.streamer = _StreamCompressor(self.encoding, self.middleware.gzip_level, self.middleware.brotli_quality)
+                body = self.streamer.compress(body, final=False)
+            else:
+                self.passthrough = True
+            await self.send({**self.start_message, "headers": headers.raw})
+            await self.send({"type": "http.response.body", "body": body, "more_body": True})
+            return
+        
+        if compressible and len(body) >= self.middleware.minimum_size:
+            body = self.middleware.compress(body, self.encoding)
+            headers["Content-Encoding"] = self.encoding
+            headers["Content-Length"] = str(len(body))
+        
+        status = self.start_message["status"]
+        raw_headers = headers.raw
+        if self.cache_key is not None and status == 200 and "set-cookie" not in headers:
+            self.middleware.cache.set(self.cache_key, (status, raw_headers, body))
+            raw_headers = raw_headers + [(b"x-cache", b"MISS")]
+        
+        await self.send({**self.start_message, "headers": raw_headers})
+        await self.send({"type": "http.response.body", "body": body})
@@ -4,7 +4,7 @@ BazaarSetu Backend - Configuration Module
 
 from pydantic_settings import BaseSettings
 from functools import lru_cache
-from typing import Optional
+from typing import List, Optional
 
 
 class Settings(BaseSettings):
@@ -17,6 +17,20 @@ class Settings(BaseSettings):
     
     # Database
     database_url: str = "postgresql+asyncpg://localhost:5432/bazaarsetu"
+    db_pool_size: int = 10  # Persistent connections per worker
+    db_max_overflow: int = 20  # Extra connections allowed under bursts
+    db_pool_timeout: float = 30.0  # Seconds to wait for a free connection before failing
+    db_pool_recycle: int = 1800  # Seconds before a connection is replaced (survives failovers/idle kills)
+    db_pool_pre_ping: bool = True  # Test connections on checkout and drop stale ones
+    db_connect_timeout: float = 10.0
+    db_command_timeout: Optional[float] = None  # Per-statement timeout in seconds (asyncpg)
+    db_statement_cache_size: int = 100  # Prepared statements cached per connection; 0 behind PgBouncer transaction pooling
+    database_read_urls: List[str] = []  # Read replicas for GET endpoints; empty = read from the primary
+    db_replica_retry_seconds: int = 30  # How long a failing replica is skipped before being tried again
+    database_bundle_path: Optional[str] = None  # Serve everything read-only from a snapshot bundle (kiosks); replaces database_url and replicas
+    db_auto_migrate: bool = False  # Run `alembic upgrade head` at startup instead of only checking the revision (dev / single instance)
+    price_partition_months_back: int = 3  # Monthly price partitions kept ready behind the current month (PostgreSQL)
+    price_partition_months_ahead: int = 3  # ...and ahead of it, created at startup and before each ingestion
     
     # Security
     secret_key: str = "your-secret-key-change-in-production"
@@ -28,12 +42,85 @@ class Settings(BaseSettings):
     enam_api_key: Optional[str] = None
     data_gov_base_url: str = "https://api.data.gov.in/resource"
     
+    # Responses
+    fast_json_responses: bool = False  # Serialize list endpoints without re-validation
+    compression_minimum_size: int = 1024  # Bytes; smaller bodies are sent as-is
+    compression_gzip_level: int = 6
+    compression_brotli_quality: int = 5
+    
+    # Response cache (stores compressed bodies)
+    response_cache_ttl_seconds: int = 60
+    response_cache_max_entries: int = 512
+    response_cache_paths: List[str] = [
+        "/api/v1/prices/today",
+        "/api/v1/prices/trend",
+        "/api/v1/prices/compare",
+        "/api/v1/states",
+        "/api/v1/markets",
+        "/api/v1/commodities",
+    ]
+    
+    # Warm-up before /ready reports the worker ready
+    warmup_enabled: bool = True
+    warmup_connections: Optional[int] = None  # Connections opened per engine; default db_pool_size
+    warmup_paths: List[str] = [  # Rendered once into the response cache
+        "/api/v1/states",
+        "/api/v1/commodities",
+        "/api/v1/markets",
+        "/api/v1/prices/today",
+    ]
+    
+    # Delta sync (/sync)
+    sync_price_days: int = 30  # Prices older than this are not synced; clients prune them
+    
+    # Anomaly screening of ingested prices (suspect rows go to quarantined_prices)
+    screening_enabled: bool = True
+    screening_baseline_days: int = 30  # History the rolling medians are taken over
+    screening_min_history: int = 5  # Prices a (commodity, market) needs before its own band applies
+    screening_mad_threshold: float = 6.0  # Allowed distance from the median, in scaled MADs of log price
+    screening_min_spread: float = 0.1  # Floor on the log-price MAD (~10%), so steady series are not over-tight
+    screening_spike_ratio: float = 10.0  # This many times above (or below) the median is always suspect
+    screening_confirm_days: int = 3  # Quarantined days agreeing on a new level after which it is accepted (and released)
+    
+    # Service caches
+    trend_cache_ttl_seconds: int = 300
+    cache_fallback_ttl_seconds: int = 900  # Longest an index, tile set or snapshot is kept without an invalidation message
+    geo_index_cell_degrees: float = 0.1  # Grid cell size of the nearby-search index (~11 km)
+    
+    # Vendor map tiles
+    vendor_cluster_max_zoom: int = 14  # Tiles above this zoom list individual vendors
+    vendor_cluster_cell_px: int = 64  # Cluster grid size in screen pixels (divides 256)
+    vendor_tile_cache_ttl_seconds: int = 600
+    vendor_tile_cache_max_entries: int = 4096
+    
+    # Price archive (raw prices older than this move to Parquet files; daily rollups stay in the DB)
+    price_archive_after_days: int = 90
+    price_archive_dir: str = "data/archive/prices"
+    
+    # Snapshot bundles for offline kiosks (built by build_bundle.py)
+    bundle_output_path: str = "data/bundle/bazaarsetu.db"
+    bundle_rollup_days: int = 365  # History kept as daily rollups before the raw-price window (longest trend)
+    bundle_mmap_bytes: int = 256 * 1024 * 1024  # SQLite mmap_size when serving from a bundle
+    
     # Redis
     redis_url: str = "redis://localhost:6379/0"
     
+    # Live price push (SSE / WebSocket)
+    broadcast_backend: str = "local"  # "local" (single process) or "redis" (fan-out across workers and the ingestion job)
+    broadcast_queue_size: int = 100  # Per-client backlog; oldest events are dropped beyond this
+    stream_heartbeat_seconds: int = 15
+    
     # Firebase
     firebase_credentials_path: Optional[str] = None
     
+    @property
+    def effective_database_url(self) -> str:
+        """`database_url`, or the read-only snapshot bundle when one is configured."""
+        if self.database_bundle_path:
+            # immutable: no locking or journal checks, the file never changes under us
+            return f"sqlite+aiosqlite:///file:{self.database_bundle_path}?mode=ro&immutable=1&uri=true"
+        return self.database_url
+    
     class Config:
         env_file = ".env"
         env_file_encoding = "utf-8"
@@ -2,19 +2,92 @@
 BazaarSetu Backend - Database Connection
 """
 
+import asyncio
+import logging
+import time
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, List
+
+from sqlalchemy import event, exc, inspect, text
+from sqlalchemy.engine import make_url
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
 from sqlalchemy.orm import DeclarativeBase
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 from app.core.config import get_settings
+from app.core.metrics import pool_metrics
+from app.core.partitions import PARTITIONED_PRICES, ensure_upcoming_partitions
 
 
+logger = logging.getLogger(__name__)
 settings = get_settings()
 
+
+class InstrumentedPool(AsyncAdaptedQueuePool):
+    """Queue pool that records how long each checkout waits."""
+    
+    def connect(self):
+        started = time.perf_counter()
+        try:
+            return super().connect()
+        except exc.TimeoutError:
+            pool_metrics.checkout_timeouts += 1
+            raise
+        finally:
+            pool_metrics.checkout_seconds.observe(time.perf_counter() - started)
+
+
+def engine_options(url: str) -> Dict[str, Any]:
+    """Pool and driver options from settings (SQLite keeps its own defaults)."""
+    backend = make_url(url).get_backend_name()
+    if backend == "sqlite":
+        return {}
+    
+    options: Dict[str, Any] = {
+        "poolclass": InstrumentedPool,
+        "pool_size": settings.db_pool_size,
+        "max_overflow": settings.db_max_overflow,
+        "pool_timeout": settings.db_pool_timeout,
+        "pool_recycle": settings.db_pool_recycle,
+        "pool_pre_ping": settings.db_pool_pre_ping,
+    }
+    if make_url(url).get_driver_name() == "asyncpg":
+        options["connect_args"] = {
+            "timeout": settings.db_connect_timeout,
+            "command_timeout": settings.db_command_timeout,
+            # asyncpg's own statement cache and SQLAlchemy's prepared-statement cache
+            "statement_cache_size": settings.db_statement_cache_size,
+            "prepared_statement_cache_size": settings.db_statement_cache_size,
+        }
+    return options
+
+
 # Create async engine
 engine = create_async_engine(
-    settings.database_url,
+    settings.effective_database_url,
     echo=settings.debug,
-    future=True
+    future=True,
+    **engine_options(settings.effective_database_url)
 )
+pool_metrics.pool = engine.sync_engine.pool
+
+
+if settings.database_bundle_path:
+    @event.listens_for(engine.sync_engine, "connect")
+    def _map_bundle(dbapi_connection, connection_record):
+        # Pages are read straight from the page cache instead of copied per read
+        cursor = dbapi_connection.cursor()
+        cursor.execute(f"PRAGMA mmap_size = {settings.bundle_mmap_bytes}")
+        cursor.close()
+
+
+@event.listens_for(engine.sync_engine, "connect")
+def _count_connect(dbapi_connection, connection_record):
+    pool_metrics.connections_opened += 1
+
+
+@event.listens_for(engine.sync_engine, "invalidate")
+def _count_invalidate(dbapi_connection, connection_record, exception):
+    pool_metrics.connections_invalidated += 1
 
 # Create async session factory
 AsyncSessionLocal = async_sessionmaker(
@@ -44,7 +117,126 @@ async def get_db() -> AsyncSession:
             await session.close()
 
 
+class ReadReplicas:
+    """
+    Engines for the configured read replicas, tried round-robin.
+    
+    A replica that fails to hand out a connection is skipped for
+    `db_replica_retry_seconds`; with none available, reads go to the primary.
+    """
+    
+    def __init__(self, urls: List[str]):
+        self.engines = [
+            create_async_engine(url, echo=settings.debug, future=True, **engine_options(url))
+            for url in urls
+        ]
+        self._next = 0
+        self._down_until: Dict[int, float] = {}
+    
+    def candidates(self) -> List:
+        """Healthy replica engines, starting with the next in rotation."""
+        if not self.engines:
+            return []
+        start = self._next
+        self._next = (self._next + 1) % len(self.engines)
+        now = time.monotonic()
+        rotated = self.engines[start:] + self.engines[:start]
+        return [e for e in rotated if self._down_until.get(id(e), 0) <= now]
+    
+    def mark_down(self, replica) -> None:
+        self._down_until[id(replica)] = time.monotonic() + settings.db_replica_retry_seconds
+
+
+# A bundle is self-contained: replicas of the main database do not apply
+read_replicas = ReadReplicas([] if settings.database_bundle_path else settings.database_read_urls)
+
+
+@asynccontextmanager
+async def read_session() -> AsyncIterator[AsyncSession]:
+    """
+    Session for read-only work, on a replica when one is reachable.
+    
+    Nothing is committed: the transaction is simply rolled back when the
+    connection returns to the pool.
+    """
+    for replica in read_replicas.candidates():
+        session = AsyncSession(bind=replica, expire_on_commit=False, autoflush=False)
+        try:
+            # Check out the connection now so an unreachable replica falls through
+            await session.connection()
+        except (OSError, asyncio.TimeoutError, exc.DBAPIError, exc.TimeoutError) as e:
+            await session.close()
+            read_replicas.mark_down(replica)
+            logger.warning(f"Read replica unavailable, trying the next one: {e}")
+            continue
+        try:
+            yield session
+        finally:
+            await session.close()
+        return
+    
+    async with AsyncSessionLocal() as session:
+        yield session
+
+
+async def get_read_db() -> AsyncSession:
+    """Dependency for GET endpoints: read-only session, no commit round trip."""
+    async with read_session() as session:
+        yield session
+
+
 async def init_db():
-    """Initialize database tables."""
+    """Apply pending migrations (setup scripts, development and `db_auto_migrate`)."""
+    # Alembic is only imported at startup: serving requests never needs it
+    from app.core.migrations import upgrade_to_head
+    
     async with engine.begin() as conn:
-        await conn.run_sync(Base.metadata.create_all)
+        await conn.run_sync(upgrade_to_head)
+        if PARTITIONED_PRICES:
+            await ensure_upcoming_partitions(conn)
+
+
+# How to bring a database created by `create_all` before migrations to revision 0001
+LEGACY_HINT = (
+    "for a database created before migrations run `python compact_prices.py` "
+    "(and on PostgreSQL `python manage_partitions.py migrate` if prices is not partitioned), "
+    "then `alembic stamp 0001` and `alembic upgrade head`"
+)
+
+
+async def match_baseline_prices(conn) -> bool:
+    """
+    Drop what later migrations add from a `prices` table just created from
+    the model, if the database is not under migrations yet.
+    
+    The table then matches revision 0001, so after `alembic stamp 0001`,
+    `alembic upgrade head` adds `change_seq` with its triggers like on
+    every other table. Returns whether anything was dropped.
+    """
+    if await conn.run_sync(lambda sync_conn: inspect(sync_conn).has_table("alembic_version")):
+        return False
+    await conn.execute(text("DROP INDEX ix_prices_change_seq"))
+    await conn.execute(text("ALTER TABLE prices DROP COLUMN change_seq"))
+    return True
+
+
+async def check_schema_version() -> str:
+    """
+    Fail fast unless the database is at the migration head this code expects.
+    
+    This is the only schema work done at startup: one read of
+    `alembic_version` instead of reflecting and creating every table.
+    The expected revision is the head of alembic/versions.
+    """
+    from app.core.migrations import head_revision
+    
+    expected = head_revision()
+    async with engine.connect() as conn:
+        try:
+            current = (await conn.execute(text("SELECT version_num FROM alembic_version"))).scalar()
+        except exc.DBAPIError:
+            current = None  # Never migrated (or created by create_all before migrations existed)
+    if current != expected:
+        hint = "alembic upgrade head" if current else f"alembic upgrade head ({LEGACY_HINT})"
+        raise RuntimeError(f"Database schema is at revision {current or 'none'}, expected {expected}: run {hint}")
+    return current
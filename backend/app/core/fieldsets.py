@@ -0,0 +1,65 @@
+"""
+BazaarSetu Backend - Sparse Fieldsets & Language Scoping
+Helpers for `fields=` and `lang=` query parameters.
+"""
+
+from typing import Iterable, List, Optional
+
+from fastapi import HTTPException
+from sqlalchemy import func
+from sqlalchemy.sql import ColumnElement
+
+
+LANGUAGES = ("en", "te", "hi")
+
+# Columns holding translations, per language
+_NAME_COLUMNS = {"te": "name_telugu", "hi": "name_hindi"}
+
+# Bookkeeping columns that are never returned through `fields=` (change_seq drives /sync)
+INTERNAL_COLUMNS = ("change_seq",)
+
+
+def parse_fields(raw: Optional[str], allowed: Iterable[str]) -> Optional[List[str]]:
+    """
+    Parse a comma-separated `fields=` value, keeping request order.
+    
+    Returns None when no selection was made. Raises ValueError for
+    unknown field names.
+    """
+    if not raw:
+        return None
+    
+    fields = list(dict.fromkeys(f.strip() for f in raw.split(",") if f.strip()))
+    allowed = list(allowed)
+    unknown = [f for f in fields if f not in allowed]
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(unknown)}. Allowed: {', '.join(allowed)}")
+    return fields or None
+
+
+def requested_fields(raw: Optional[str], allowed: Iterable[str]) -> Optional[List[str]]:
+    """`parse_fields` for endpoints: unknown field names are a 400."""
+    try:
+        return parse_fields(raw, allowed)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+def localized_name(model, lang: Optional[str]) -> ColumnElement:
+    """The model's name in `lang`, falling back to English when untranslated."""
+    translated = _NAME_COLUMNS.get(lang)
+    if translated is None:
+        return model.name
+    return func.coalesce(getattr(model, translated), model.name)
+
+
+def default_fields(all_fields: Iterable[str], lang: Optional[str]) -> List[str]:
+    """
+    Fields returned when only `lang=` is given.
+    
+    The per-language name columns are dropped because `*name` fields
+    already carry the requested language.
+    """
+    if not lang:
+        return list(all_fields)
+    return [f for f in all_fields if not f.endswith(("_telugu", "_hindi"))]
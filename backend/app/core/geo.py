@@ -0,0 +1,143 @@
+"""
+BazaarSetu Backend - Geospatial Helpers
+Vectorized haversine distances and an in-memory grid index for nearby lookups.
+"""
+
+import math
+from typing import Dict, List, Sequence, Tuple
+
+import numpy as np
+
+
+EARTH_RADIUS_KM = 6371.0088
+KM_PER_DEGREE_LAT = 111.32
+
+
+def haversine_km(lat: float, lon: float, lats: np.ndarray, lons: np.ndarray) -> np.ndarray:
+    """Great-circle distances in km from one point to arrays of points."""
+    lat1 = math.radians(lat)
+    lat2 = np.radians(lats)
+    dlat = lat2 - lat1
+    dlon = np.radians(lons) - math.radians(lon)
+    a = np.sin(dlat / 2) ** 2 + math.cos(lat1) * np.cos(lat2) * np.sin(dlon / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.minimum(a, 1.0)))
+
+
+def _km_per_degree_lon(lat: float) -> float:
+    return KM_PER_DEGREE_LAT * max(math.cos(math.radians(min(abs(lat), 89.0))), 1e-6)
+
+
+class GeoIndex:
+    """
+    Immutable grid index over points with ids.
+    
+    Points are bucketed into square lat/lon cells and stored sorted by cell,
+    so each cell is a contiguous slice of the coordinate arrays. A query
+    only computes distances for the cells around the search point, which
+    keeps lookups cheap with hundreds of thousands of points.
+    """
+    
+    def __init__(
+        self,
+        ids: Sequence[int],
+        lats: Sequence[float],
+        lons: Sequence[float],
+        cell_degrees: float = 0.1
+    ):
+        self.cell_degrees = cell_degrees
+        ids = np.asarray(ids, dtype=np.int64)
+        lats = np.asarray(lats, dtype=np.float64)
+        lons = np.asarray(lons, dtype=np.float64)
+        
+        rows = np.floor(lats / cell_degrees).astype(np.int64)
+        cols = np.floor(lons / cell_degrees).astype(np.int64)
+        order = np.lexsort((cols, rows))
+        self.ids, self.lats, self.lons = ids[order], lats[order], lons[order]
+        rows, cols = rows[order], cols[order]
+        
+        # Cell -> (start, end) slice into the sorted arrays
+        self._cells: Dict[Tuple[int, int], Tuple[int, int]] = {}
+        if len(ids):
+            boundaries = np.flatnonzero((np.diff(rows) != 0) | (np.diff(cols) != 0)) + 1
+            starts = np.concatenate(([0], boundaries))
+            ends = np.concatenate((boundaries, [len(ids)]))
+            for start, end in zip(starts.tolist(), ends.tolist()):
+                self._cells[(int(rows[start]), int(cols[start]))] = (start, end)
+            self._row_range = (int(rows.min()), int(rows.max()))
+            self._col_range = (int(cols.min()), int(cols.max()))
+    
+    def __len__(self) -> int:
+        return len(self.ids)
+    
+    def within(self, lat: float, lon: float, radius_km: float, limit: int) -> List[Tuple[int, float]]:
+        """Up to `limit` (id, distance_km) pairs within `radius_km`, nearest first."""
+        dlat = radius_km / KM_PER_DEGREE_LAT
+        dlon = radius_km / _km_per_degree_lon(abs(lat) + dlat)
+        cell = self.cell_degrees
+        row_span = range(math.floor((lat - dlat) / cell), math.floor((lat + dlat) / cell) + 1)
+        col_span = range(math.floor((lon - dlon) / cell), math.floor((lon + dlon) / cell) + 1)
+        
+        candidates = self._gather(row_span, col_span)
+        distances = haversine_km(lat, lon, self.lats[candidates], self.lons[candidates])
+        inside = distances <= radius_km
+        return self._closest(candidates[inside], distances[inside], limit)
+    
+    def nearest(self, lat: float, lon: float, k: int) -> List[Tuple[int, float]]:
+        """The `k` nearest (id, distance_km) pairs, nearest first."""
+        if not len(self.ids) or k <= 0:
+            return []
+        
+        cell = self.cell_degrees
+        row, col = math.floor(lat / cell), math.floor(lon / cell)
+        max_ring = max(
+            abs(row - self._row_range[0]), abs(row - self._row_range[1]),
+            abs(col - self._col_range[0]), abs(col - self._col_range[1])
+        )
+        
+        # Grow a square of cells until the k-th hit is closer than any
+        # point outside the square could be; start at the occupied area
+        ring = max(
+            0,
+            self._row_range[0] - row, row - self._row_range[1],
+            self._col_range[0] - col, col - self._col_range[1]
+        )
+        while ring < max_ring:
+            candidates = self._gather(range(row - ring, row + ring + 1), range(col - ring, col + ring + 1))
+            if len(candidates) >= k:
+                distances = haversine_km(lat, lon, self.lats[candidates], self.lons[candidates])
+                kth = np.partition(distances, k - 1)[k - 1]
+                covered_km = ring * cell * min(KM_PER_DEGREE_LAT, _km_per_degree_lon(abs(lat) + (ring + 1) * cell))
+                if kth <= covered_km:
+                    return self._closest(candidates, distances, k)
+            ring = max(1, ring * 2)
+        
+        # The square covers every cell: measure all points
+        candidates = np.arange(len(self.ids))
+        distances = haversine_km(lat, lon, self.lats, self.lons)
+        return self._closest(candidates, distances, k)
+    
+    def _gather(self, row_span: range, col_span: range) -> np.ndarray:
+        """Positions of every point in the given block of cells."""
+        if len(row_span) * len(col_span) <= len(self._cells):
+            slices = [self._cells.get((r, c)) for r in row_span for c in col_span]
+        else:
+            # Block is larger than the occupied area: walk occupied cells instead
+            slices = [
+                bounds for (r, c), bounds in self._cells.items()
+                if r in row_span and c in col_span
+            ]
+        slices = [s for s in slices if s is not None]
+        if not slices:
+            return np.empty(0, dtype=np.int64)
+        return np.concatenate([np.arange(start, end) for start, end in slices])
+    
+    def _closest(self, positions: np.ndarray, distances: np.ndarray, limit: int) -> List[Tuple[int, float]]:
+        """Sort only the `limit` smallest distances (argpartition, then argsort)."""
+        if len(positions) > limit:
+            keep = np.argpartition(distances, limit - 1)[:limit]
+            positions, distances = positions[keep], distances[keep]
+        order = np.argsort(distances, kind="stable")
+        return [
+            (int(self.ids[p]), float(d))
+            for p, d in zip(positions[order], distances[order])
+        ]
@@ -0,0 +1,116 @@
+"""
+BazaarSetu Backend - Runtime Metrics
+Connection pool and startup telemetry, exposed in the Prometheus text format.
+"""
+
+import bisect
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional, Sequence
+
+from sqlalchemy.pool import Pool
+
+
+class Histogram:
+    """Cumulative-bucket histogram in the shape Prometheus expects."""
+    
+    def __init__(self, buckets: Sequence[float]):
+        self.buckets = list(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+    
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+    
+    def render(self, name: str) -> List[str]:
+        lines = []
+        cumulative = 0
+        for bound, count in zip(self.buckets + [float("inf")], self.counts):
+            cumulative += count
+            le = "+Inf" if bound == float("inf") else repr(bound)
+            lines.append(f'{name}_bucket{{le="{le}"}} {cumulative}')
+        lines.append(f"{name}_sum {self.sum:.6f}")
+        lines.append(f"{name}_count {self.count}")
+        return lines
+
+
+class PoolMetrics:
+    """
+    Counters fed by the engine's pool, plus gauges read at scrape time.
+    
+    Checkout time covers everything a request waits for before it holds a
+    connection: queueing for a free slot, opening a new connection and the
+    pre-ping.
+    """
+    
+    def __init__(self):
+        self.pool: Optional[Pool] = None
+        self.checkout_seconds = Histogram([0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30])
+        self.checkout_timeouts = 0
+        self.connections_opened = 0
+        self.connections_invalidated = 0
+    
+    def render(self) -> str:
+        lines = []
+        
+        def metric(name: str, kind: str, help_text: str, value) -> None:
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            lines.append(f"{name} {value}")
+        
+        pool = self.pool
+        if pool is not None and hasattr(pool, "checkedout"):
+            metric("db_pool_size", "gauge", "Configured number of persistent connections.", pool.size())
+            metric("db_pool_checked_out", "gauge", "Connections currently in use.", pool.checkedout())
+            metric("db_pool_checked_in", "gauge", "Idle connections in the pool.", pool.checkedin())
+            metric("db_pool_overflow", "gauge", "Connections open beyond pool_size (negative while below it).", pool.overflow())
+        
+        lines.append("# HELP db_pool_checkout_seconds Time spent waiting to obtain a connection.")
+        lines.append("# TYPE db_pool_checkout_seconds histogram")
+        lines.extend(self.checkout_seconds.render("db_pool_checkout_seconds"))
+        metric("db_pool_checkout_timeouts_total", "counter", "Checkouts that gave up after pool_timeout.", self.checkout_timeouts)
+        metric("db_pool_connections_opened_total", "counter", "New DBAPI connections opened.", self.connections_opened)
+        metric("db_pool_connections_invalidated_total", "counter", "Connections discarded as stale or broken.", self.connections_invalidated)
+        return "\n".join(lines) + "\n"
+
+
+pool_metrics = PoolMetrics()
+
+
+class StartupMetrics:
+    """Durations of the phases a worker goes through before serving."""
+    
+    def __init__(self):
+        self.phases: Dict[str, float] = {}
+    
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases[name] = time.perf_counter() - started
+    
+    def summary(self) -> str:
+        return ", ".join(f"{name} {seconds * 1000:.0f} ms" for name, seconds in self.phases.items())
+    
+    def render(self) -> str:
+        if not self.phases:
+            return ""
+        lines = [
+            "# HELP app_startup_seconds Time spent in each startup phase of this worker.",
+            "# TYPE app_startup_seconds gauge",
+        ]
+        lines.extend(f'app_startup_seconds{{phase="{name}"}} {seconds:.6f}' for name, seconds in self.phases.items())
+        return "\n".join(lines) + "\n"
+
+
+startup_metrics = StartupMetrics()
+
+
+def render_metrics() -> str:
+    """All metrics in the Prometheus text exposition format."""
+    return pool_metrics.render() + startup_metrics.render()
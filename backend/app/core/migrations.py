@@ -0,0 +1,32 @@
+"""
+BazaarSetu Backend - Schema Migrations
+Alembic helpers for running migrations in-process (kept out of the request path).
+"""
+
+from functools import lru_cache
+from pathlib import Path
+
+from alembic import command
+from alembic.config import Config
+from alembic.script import ScriptDirectory
+from sqlalchemy.engine import Connection
+
+
+ALEMBIC_INI = Path(__file__).resolve().parents[2] / "alembic.ini"
+
+
+def alembic_config() -> Config:
+    return Config(str(ALEMBIC_INI))
+
+
+@lru_cache()
+def head_revision() -> str:
+    """Latest revision in alembic/versions (read from disk once per process)."""
+    return ScriptDirectory.from_config(alembic_config()).get_current_head()
+
+
+def upgrade_to_head(connection: Connection) -> None:
+    """Apply pending migrations on an open (sync) connection."""
+    config = alembic_config()
+    config.attributes["connection"] = connection
+    command.upgrade(config, "head")
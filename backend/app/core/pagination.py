@@ -0,0 +1,81 @@
+"""
+BazaarSetu Backend - Keyset (Cursor) Pagination
+Opaque cursors that encode the last row's sort key plus id.
+"""
+
+import base64
+import json
+from typing import Any, List, Optional, Sequence, Tuple
+
+from sqlalchemy import literal, tuple_
+from sqlalchemy.sql import ColumnElement, Select
+
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+# Key type of numeric sort columns (JSON may bring back 40.0 as 40)
+NUMBER = (int, float)
+
+
+def encode_cursor(sort: str, values: Sequence[Any]) -> str:
+    """Encode the sort name and the last row's key values as an opaque token."""
+    payload = json.dumps({"s": sort, "k": list(values)}, separators=(",", ":"), default=str)
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str, sort: str, types: Sequence[Any]) -> List[Any]:
+    """
+    Decode a cursor produced by `encode_cursor` for the same sort order.
+    
+    `types` holds the expected type (or tuple of types) of each key value.
+    Raises ValueError for malformed cursors, ones issued for another sort
+    and ones whose key does not match `types`.
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        values = payload["k"]
+        issued_for = payload["s"]
+    except (ValueError, KeyError, TypeError):
+        raise ValueError("Invalid cursor")
+    
+    if issued_for != sort:
+        raise ValueError(f"Cursor was issued for sort '{issued_for}', not '{sort}'")
+    if not isinstance(values, list) or len(values) != len(types) or not all(
+        isinstance(value, kind) and not isinstance(value, bool) for value, kind in zip(values, types)
+    ):
+        raise ValueError("Invalid cursor")
+    return values
+
+
+def apply_keyset(
+    query: Select,
+    columns: Sequence[ColumnElement],
+    after: Optional[Sequence[Any]],
+    descending: bool,
+    limit: int
+) -> Select:
+    """
+    Order by `columns` and fetch `limit + 1` rows after the cursor position.
+    
+    The last column must be unique (normally the primary key) so positions
+    are unambiguous. The extra row tells `split_page` whether more remain.
+    Cursor values are bound with their column's type (e.g. rupees as paise).
+    """
+    if after is not None:
+        position = tuple_(*columns)
+        cursor = tuple_(*(literal(value, type_=column.type) for column, value in zip(columns, after)))
+        query = query.where(position < cursor if descending else position > cursor)
+    
+    order = [c.desc() if descending else c.asc() for c in columns]
+    return query.order_by(*order).limit(limit + 1)
+
+
+def split_page(rows: Sequence[Any], limit: int, sort: str, key) -> Tuple[List[Any], Optional[str]]:
+    """Trim the look-ahead row and build the next cursor from the last row kept."""
+    rows = list(rows)
+    if len(rows) <= limit:
+        return rows, None
+    
+    rows = rows[:limit]
+    return rows, encode_cursor(sort, key(rows[-1]))
@@ -0,0 +1,171 @@
+"""
+BazaarSetu Backend - Price Partitions
+Monthly range partitions of the prices table on PostgreSQL.
+"""
+
+import logging
+import re
+from datetime import date
+from typing import List, Optional, Tuple
+
+from sqlalchemy import text
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+from app.core.config import get_settings
+
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+# Prices are range-partitioned by price_date only on PostgreSQL; other
+# databases (SQLite in development) keep a plain table
+PARTITIONED_PRICES = make_url(settings.effective_database_url).get_backend_name() == "postgresql"
+
+DEFAULT_PARTITION = "prices_default"
+
+_BOUND_PATTERN = re.compile(r"FROM \('(\d{4}-\d{2}-\d{2})'\) TO \('(\d{4}-\d{2}-\d{2})'\)")
+
+
+def month_start(day: date) -> date:
+    return day.replace(day=1)
+
+
+def add_months(month: date, months: int) -> date:
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(month: date) -> str:
+    return f"prices_y{month.year}m{month.month:02d}"
+
+
+async def is_partitioned(conn: AsyncConnection) -> bool:
+    """Whether the prices table exists as a partitioned table."""
+    result = await conn.execute(text(
+        "SELECT 1 FROM pg_partitioned_table pt "
+        "JOIN pg_class c ON c.oid = pt.partrelid "
+        "WHERE c.relname = 'prices' AND pg_table_is_visible(c.oid)"
+    ))
+    return result.first() is not None
+
+
+async def list_price_partitions(conn: AsyncConnection) -> List[Tuple[str, Optional[date], Optional[date]]]:
+    """(name, first day, day after last) per partition; bounds are None for the default one."""
+    result = await conn.execute(text(
+        "SELECT c.relname, pg_get_expr(c.relpartbound, c.oid) "
+        "FROM pg_inherits i "
+        "JOIN pg_class c ON c.oid = i.inhrelid "
+        "JOIN pg_class p ON p.oid = i.inhparent "
+        "WHERE p.relname = 'prices' AND pg_table_is_visible(p.oid) "
+        "ORDER BY c.relname"
+    ))
+    partitions = []
+    for name, bound in result.all():
+        match = _BOUND_PATTERN.search(bound or "")
+        if match:
+            partitions.append((name, date.fromisoformat(match.group(1)), date.fromisoformat(match.group(2))))
+        else:
+            partitions.append((name, None, None))
+    return partitions
+
+
+async def ensure_price_partitions(conn: AsyncConnection, first: date, last: date) -> List[str]:
+    """
+    Create the monthly partitions covering `first`..`last` plus the default
+    partition, returning the names of partitions that were created.
+    
+    Rows that already landed in the default partition for a new month are
+    moved into it, since PostgreSQL refuses to add a partition whose range
+    the default partition already holds rows for.
+    """
+    existing = {name for name, _, _ in await list_price_partitions(conn)}
+    has_default = DEFAULT_PARTITION in existing
+    created = []
+    
+    month = month_start(first)
+    while month <= last:
+        name = partition_name(month)
+        if name not in existing:
+            await _create_month(conn, name, month, add_months(month, 1), has_default)
+            created.append(name)
+        month = add_months(month, 1)
+    
+    if not has_default:
+        await conn.execute(text(f"CREATE TABLE {DEFAULT_PARTITION} PARTITION OF prices DEFAULT"))
+        created.append(DEFAULT_PARTITION)
+    
+    if created:
+        logger.info(f"Created price partitions: {', '.join(created)}")
+    return created
+
+
+async def _create_month(conn: AsyncConnection, name: str, lower: date, upper: date, has_default: bool) -> None:
+    bounds = {"lower": lower, "upper": upper}
+    stray = False
+    if has_default:
+        result = await conn.execute(
+            text(f"SELECT 1 FROM {DEFAULT_PARTITION} WHERE price_date >= :lower AND price_date < :upper LIMIT 1"),
+            bounds
+        )
+        stray = result.first() is not None
+    
+    if not stray:
+        await conn.execute(text(
+            f"CREATE TABLE {name} PARTITION OF prices FOR VALUES FROM ('{lower}') TO ('{upper}')"
+        ))
+        return
+    
+    # Move the month's rows out of the default partition around the CREATE
+    await conn.execute(text(f"ALTER TABLE prices DETACH PARTITION {DEFAULT_PARTITION}"))
+    await conn.execute(text(
+        f"CREATE TABLE {name} PARTITION OF prices FOR VALUES FROM ('{lower}') TO ('{upper}')"
+    ))
+    await conn.execute(
+        text(
+            f"WITH moved AS ("
+            f"DELETE FROM {DEFAULT_PARTITION} WHERE price_date >= :lower AND price_date < :upper RETURNING *"
+            f") INSERT INTO {name} SELECT * FROM moved"
+        ),
+        bounds
+    )
+    await conn.execute(text(f"ALTER TABLE prices ATTACH PARTITION {DEFAULT_PARTITION} DEFAULT"))
+
+
+async def ensure_upcoming_partitions(conn: AsyncConnection, today: Optional[date] = None) -> List[str]:
+    """Partitions from `price_partition_months_back` months ago to `price_partition_months_ahead` ahead."""
+    month = month_start(today or date.today())
+    return await ensure_price_partitions(
+        conn,
+        add_months(month, -settings.price_partition_months_back),
+        add_months(month, settings.price_partition_months_ahead)
+    )
+
+
+async def drop_month_partition(conn: AsyncConnection, month: date) -> bool:
+    """Detach and drop one month's partition; False if it does not exist."""
+    name = partition_name(month_start(month))
+    if name not in {partition for partition, _, _ in await list_price_partitions(conn)}:
+        return False
+    await conn.execute(text(f"ALTER TABLE prices DETACH PARTITION {name}"))
+    await conn.execute(text(f"DROP TABLE {name}"))
+    return True
+
+
+async def drop_partitions_before(conn: AsyncConnection, cutoff: date, detach_only: bool = False) -> List[str]:
+    """
+    Remove every monthly partition that ends on or before `cutoff`.
+    
+    Detaching or dropping a partition is a catalog change, so this takes
+    the same time however many rows the month holds. With `detach_only`
+    the tables are kept as standalone tables (e.g. for archiving).
+    """
+    removed = []
+    for name, _, upper in await list_price_partitions(conn):
+        if upper is None or upper > cutoff:
+            continue
+        await conn.execute(text(f"ALTER TABLE prices DETACH PARTITION {name}"))
+        if not detach_only:
+            await conn.execute(text(f"DROP TABLE {name}"))
+        removed.append(name)
+    return removed
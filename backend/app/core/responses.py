@@ -0,0 +1,75 @@
+"""
+BazaarSetu Backend - Fast JSON Responses
+Serializes already-built response models without FastAPI's second validation pass.
+"""
+
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Sequence, Type, Union
+
+import orjson
+from fastapi import Response
+from pydantic import BaseModel, TypeAdapter
+
+from app.core.config import get_settings
+
+
+settings = get_settings()
+
+
+@lru_cache(maxsize=None)
+def list_adapter(model: Type[BaseModel]) -> TypeAdapter:
+    """Cached TypeAdapter for List[model] (building one is not free)."""
+    return TypeAdapter(List[model])
+
+
+def dump_models(
+    items: Sequence[BaseModel],
+    model: Type[BaseModel],
+    include: Optional[Sequence[str]] = None
+) -> bytes:
+    """
+    Serialize a list of models straight to JSON bytes using pydantic-core.
+    
+    `include` limits every item to the given top-level fields.
+    """
+    if include is not None:
+        return list_adapter(model).dump_json(list(items), include={"__all__": set(include)})
+    return list_adapter(model).dump_json(list(items))
+
+
+def dump_json(content: Any) -> bytes:
+    """Serialize plain data (dicts, lists, dates) to JSON bytes."""
+    return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
+
+
+class FastJSONResponse(Response):
+    """JSON response that accepts pre-encoded bytes or plain data."""
+    
+    media_type = "application/json"
+    
+    def render(self, content: Any) -> bytes:
+        if isinstance(content, bytes):
+            return content
+        return dump_json(content)
+
+
+def model_list_response(
+    items: Sequence[BaseModel],
+    model: Type[BaseModel],
+    response: Optional[Response] = None,
+    headers: Optional[Dict[str, str]] = None
+) -> Union[Sequence[BaseModel], Response]:
+    """
+    Return list endpoint results, using the fast path when enabled.
+    
+    Returning a Response makes FastAPI skip `response_model` validation,
+    while the declared model still documents the endpoint in OpenAPI.
+    `headers` go on whichever response is actually sent; pass the route's
+    injected `response` when using them.
+    """
+    headers = {k: v for k, v in (headers or {}).items() if v is not None}
+    if not settings.fast_json_responses:
+        if response is not None:
+            response.headers.update(headers)
+        return items
+    return FastJSONResponse(dump_models(items, model), headers=headers)
@@ -5,12 +5,17 @@ Fetches real prices from data.gov.in and stores them in the database.
 
 import asyncio
 import httpx
+from collections import Counter
 from datetime import date, datetime
 from sqlalchemy import select
 
-from app.core.database import AsyncSessionLocal
-from app.models import Market, Commodity, Price
+from app.core.database import AsyncSessionLocal, engine
+from app.core.partitions import PARTITIONED_PRICES, is_partitioned, ensure_upcoming_partitions
+from app.models import Market, Commodity, Price, QuarantinedPrice, DATA_GOV_SOURCE_ID
 from app.core.config import get_settings
+from app.services.alert_service import AlertService, send_push_notification
+from app.services.broadcast import broker, build_price_deltas, publish_price_deltas, INGEST_CHANNEL
+from app.services.screening_service import screen_prices, REASONS
 import logging
 
 logging.basicConfig(level=logging.INFO)
@@ -45,6 +50,16 @@ async def fetch_and_store_prices():
     
     print("🚀 Starting live price fetch...")
     
+    if settings.broadcast_backend != "redis":
+        # The local broker only reaches this process: API workers would keep
+        # serving cached prices until their TTLs run out, and push no deltas
+        message = (
+            "BROADCAST_BACKEND is 'local', so API workers will not be told about these prices "
+            "(no live updates; caches refresh only on expiry). Set BROADCAST_BACKEND=redis."
+        )
+        print(f"⚠️ {message}")
+        logger.warning(message)
+    
     # Step 1: Fetch from API
     try:
         all_records = await fetch_from_api(limit=2000)
@@ -67,7 +82,12 @@ async def fetch_and_store_prices():
         print("⚠️ No records found for AP/Telangana in API data.")
         return
     
-    # Step 2: Store in database
+    # Step 2: Store in database, making sure this month's partition exists
+    if PARTITIONED_PRICES:
+        async with engine.begin() as conn:
+            if await is_partitioned(conn):
+                await ensure_upcoming_partitions(conn)
+    
     async with AsyncSessionLocal() as session:
         # Get existing markets and commodities for mapping
         markets_result = await session.execute(select(Market))
@@ -78,8 +98,9 @@ async def fetch_and_store_prices():
         
         print(f"📋 DB has {len(markets)} markets, {len(commodities)} commodities")
         
-        prices_added = 0
         prices_skipped = 0
+        candidates = []
+        new_prices = []
         today = date.today()
         
         for record in records:
@@ -152,28 +173,67 @@ async def fetch_and_store_prices():
                     prices_skipped += 1
                     continue
                 
-                # Create and add price record
-                price = Price(
-                    market_id=market.id,
-                    commodity_id=commodity.id,
-                    price_date=price_date,
-                    min_price=min_price,
-                    max_price=max_price,
-                    modal_price=modal_price,
-                    source="data.gov.in"
-                )
-                session.add(price)
-                prices_added += 1
+                candidates.append({
+                    "market_id": market.id,
+                    "commodity_id": commodity.id,
+                    "price_date": price_date,
+                    "min_price": min_price,
+                    "max_price": max_price,
+                    "modal_price": modal_price,
+                    "source_id": DATA_GOV_SOURCE_ID
+                })
                 
             except Exception as e:
                 logger.error(f"Error processing record: {e}")
                 prices_skipped += 1
                 continue
         
+        # Screen the batch against recent history; suspect rows never reach trends or alerts
+        accepted, quarantined, released = await screen_prices(session, candidates)
+        for row in accepted:
+            price = Price(**row)
+            session.add(price)
+            new_prices.append(price)
+        session.add_all(QuarantinedPrice(**row) for row in quarantined)
+        new_prices.extend(released)
+        
         await session.commit()
-        print(f"✅ Added {prices_added} real price records!")
+        print(f"✅ Added {len(accepted)} real price records!")
         print(f"⏭️ Skipped {prices_skipped} (no matching commodity/market in DB)")
+        if quarantined:
+            rejects = Counter(row["reason"] for row in quarantined)
+            summary = ", ".join(f"{reason}: {rejects[reason]}" for reason in REASONS if rejects[reason])
+            print(f"🚧 Quarantined {len(quarantined)} suspect records ({summary})")
+            logger.warning(f"Quarantined {len(quarantined)} of {len(candidates)} ingested prices: {summary}")
+        if released:
+            print(f"🔓 Released {len(released)} quarantined records confirmed by this batch")
+        
+        # Step 3: Push the new prices to connected clients
+        deltas = await build_price_deltas(session, new_prices)
+        published = await publish_price_deltas(deltas)
+        await broker.publish(INGEST_CHANNEL, str(len(deltas)))
+        print(f"📣 Published {len(deltas)} price updates on {published} channels")
+        
+        # Step 4: Notify users whose alerts fired
+        alert_service = AlertService(session)
+        triggered = await alert_service.check_and_trigger_alerts(new_prices)
+        for alert in triggered:
+            if alert["push_enabled"] and alert["fcm_token"]:
+                await send_push_notification(
+                    alert["fcm_token"],
+                    "BazaarSetu price alert",
+                    f"Price is now ₹{alert['current_price']:.0f} ({alert['alert_type']} ₹{alert['threshold_price']:.0f})"
+                )
+        digests = await alert_service.dispatch_digests()
+        print(f"🔔 Sent {len(triggered)} instant alerts and {len(digests)} digests")
+
+
+async def main():
+    try:
+        await fetch_and_store_prices()
+    finally:
+        await broker.close()
 
 
 if __name__ == "__main__":
-    asyncio.run(fetch_and_store_prices())
+    asyncio.run(main())
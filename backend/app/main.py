@@ -2,13 +2,27 @@
 BazaarSetu Backend - Main Application Entry Point
 """
 
+import time
+
+# Measured from here, so the startup report includes importing the app
+_IMPORT_STARTED = time.perf_counter()
+
+import asyncio
 from contextlib import asynccontextmanager
 from fastapi import FastAPI
+from fastapi.responses import JSONResponse, PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
 import logging
 
 from app.core.config import get_settings
-from app.core.database import init_db
+from app.core.database import init_db, check_schema_version
+from app.core.cache import response_cache
+from app.core.compression import CompressionMiddleware
+from app.core.metrics import render_metrics, startup_metrics
+from app.services import broker, snapshot_store, location_indexes, vendor_tiles, INGEST_CHANNEL, GEO_CHANNEL
+from app.services.price_service import trend_cache
+from app.services.analytics_service import stats_cache
+from app.services.warmup import readiness, warm_up
 from app.api import api_router
 
 # Configure logging
@@ -21,18 +35,76 @@ logger = logging.getLogger(__name__)
 settings = get_settings()
 
 
+async def refresh_on_ingest():
+    """Drop cached responses and rebuild snapshots whenever an ingestion run publishes new prices."""
+    async with broker.subscribe(INGEST_CHANNEL) as subscription:
+        while True:
+            if await subscription.get() is None:
+                continue
+            response_cache.clear()
+            trend_cache.clear()
+            stats_cache.clear()
+            logger.info("New prices ingested, response caches cleared")
+            try:
+                await snapshot_store.rebuild()
+            except Exception as e:
+                logger.error(f"Home snapshot rebuild failed, keeping the previous one: {e}")
+
+
+# Cached responses built from market locations (market lists, nearby search, travel-cost ranking)
+MARKET_RESPONSE_PATHS = ("/api/v1/markets", "/api/v1/prices/compare")
+
+
+async def refresh_on_location_change():
+    """Drop location indexes, vendor tiles and cached market responses when markets or vendors change in any worker."""
+    async with broker.subscribe(GEO_CHANNEL) as subscription:
+        while True:
+            name = await subscription.get()
+            if name is None:
+                continue
+            location_indexes.invalidate(name or None)
+            if name in ("", "vendors"):
+                vendor_tiles.invalidate()
+            if name in ("", "markets"):
+                response_cache.discard_where(lambda key: key[0].startswith(MARKET_RESPONSE_PATHS))
+
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Application lifespan events."""
     # Startup
     logger.info("Starting BazaarSetu API...")
-    await init_db()
-    logger.info("Database initialized")
+    startup_metrics.phases["imports"] = time.perf_counter() - _IMPORT_STARTED
+    if settings.db_auto_migrate:
+        with startup_metrics.phase("migrations"):
+            await init_db()
+    else:
+        with startup_metrics.phase("schema_check"):
+            await check_schema_version()
+    with startup_metrics.phase("broker"):
+        await broker.start()
+    ingest_listener = asyncio.create_task(refresh_on_ingest())
+    location_listener = asyncio.create_task(refresh_on_location_change())
+    startup_metrics.phases["total"] = time.perf_counter() - _IMPORT_STARTED
+    logger.info(f"Startup finished: {startup_metrics.summary()}")
+    
+    # Warm up in the background so /ready can answer "warming" meanwhile
+    if settings.warmup_enabled:
+        warmup = asyncio.create_task(warm_up(app))
+    else:
+        warmup = None
+        readiness.ready = True
     
     yield
     
-    # Shutdown
+    # Shutdown: leave the load balancer's rotation before closing anything
     logger.info("Shutting down BazaarSetu API...")
+    readiness.ready = False
+    if warmup is not None:
+        warmup.cancel()
+    ingest_listener.cancel()
+    location_listener.cancel()
+    await broker.close()
 
 
 # Create FastAPI application
@@ -60,6 +132,17 @@ app = FastAPI(
     redoc_url="/redoc"
 )
 
+# Compression (gzip/brotli) with a cache of compressed responses. Added first so it
+# sits inside CORS: cache hits still get the CORS headers for their own Origin
+app.add_middleware(
+    CompressionMiddleware,
+    cache=response_cache,
+    cache_paths=settings.response_cache_paths,
+    minimum_size=settings.compression_minimum_size,
+    gzip_level=settings.compression_gzip_level,
+    brotli_quality=settings.compression_brotli_quality,
+)
+
 # CORS middleware - allow Flutter app to connect
 app.add_middleware(
     CORSMiddleware,
@@ -67,6 +150,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],
 )
 
 # Include API routes
@@ -92,3 +176,15 @@ async def health_check():
         "database": "connected",
         "version": settings.version
     }
+
+
+@app.get("/ready", tags=["Health"])
+async def ready():
+    """Readiness probe: 503 until this worker has warmed up, and again once it is shutting down."""
+    return JSONResponse(readiness.status(), status_code=200 if readiness.ready else 503)
+
+
+@app.get("/metrics", tags=["Health"], response_class=PlainTextResponse)
+async def metrics():
+    """Runtime metrics (connection pool usage and checkout latency) for Prometheus."""
+    return PlainTextResponse(render_metrics(), media_type="text/plain; version=0.0.4")
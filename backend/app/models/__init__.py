@@ -5,9 +5,17 @@ from app.models.models import (
     Market,
     Commodity,
     Price,
+    PriceSource,
+    PriceRollup,
+    QuarantinedPrice,
     User,
     PriceAlert,
-    Vendor
+    AlertEvent,
+    Vendor,
+    SyncTombstone,
+    Paise,
+    DATA_GOV_SOURCE_ID,
+    SEED_SOURCE_ID
 )
 
 __all__ = [
@@ -15,7 +23,15 @@ __all__ = [
     "Market",
     "Commodity",
     "Price",
+    "PriceSource",
+    "PriceRollup",
+    "QuarantinedPrice",
     "User",
     "PriceAlert",
-    "Vendor"
+    "AlertEvent",
+    "Vendor",
+    "SyncTombstone",
+    "Paise",
+    "DATA_GOV_SOURCE_ID",
+    "SEED_SOURCE_ID"
 ]
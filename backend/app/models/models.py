@@ -4,9 +4,35 @@ BazaarSetu Backend - Database Models
 
 from datetime import datetime, date
 from typing import Optional, List
-from sqlalchemy import String, Integer, Float, Boolean, Date, DateTime, ForeignKey, Text
+from sqlalchemy import String, Integer, SmallInteger, BigInteger, Float, Boolean, Date, DateTime, ForeignKey, Text, Index, event
 from sqlalchemy.orm import Mapped, mapped_column, relationship
+from sqlalchemy.sql import operators
+from sqlalchemy.types import TypeDecorator
 from app.core.database import Base
+from app.core.partitions import PARTITIONED_PRICES
+
+
+class Paise(TypeDecorator):
+    """Rupee amounts stored as integer paise (4 bytes instead of an 8-byte float)."""
+    impl = Integer
+    cache_ok = True
+    
+    @property
+    def python_type(self):
+        return float
+    
+    def process_bind_param(self, value, dialect):
+        return None if value is None else int(round(value * 100))
+    
+    def process_result_value(self, value, dialect):
+        # Aggregates (e.g. avg on PostgreSQL) come back as Decimal
+        return None if value is None else float(value) / 100
+    
+    def coerce_compared_value(self, op, value):
+        # Amounts compared or added to prices are rupees; factors (price * 100.0) are plain numbers
+        if op in (operators.mul, operators.truediv, operators.floordiv, operators.mod):
+            return Float()
+        return self
 
 
 class State(Base):
@@ -18,6 +44,7 @@ class State(Base):
     name_telugu: Mapped[Optional[str]] = mapped_column(String(100))
     name_hindi: Mapped[Optional[str]] = mapped_column(String(100))
     code: Mapped[str] = mapped_column(String(10), unique=True, nullable=False)
+    change_seq: Mapped[Optional[int]] = mapped_column(BigInteger, index=True)  # Set by triggers, see /sync
     
     # Relationships
     markets: Mapped[List["Market"]] = relationship(back_populates="state")
@@ -29,6 +56,9 @@ class State(Base):
 class Market(Base):
     """Mandi/Market locations."""
     __tablename__ = "markets"
+    __table_args__ = (
+        Index("ix_markets_name_id", "name", "id"),  # Keyset pagination
+    )
     
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
     name: Mapped[str] = mapped_column(String(200), nullable=False)
@@ -39,6 +69,7 @@ class Market(Base):
     latitude: Mapped[Optional[float]] = mapped_column(Float)
     longitude: Mapped[Optional[float]] = mapped_column(Float)
     is_active: Mapped[bool] = mapped_column(Boolean, default=True)
+    change_seq: Mapped[Optional[int]] = mapped_column(BigInteger, index=True)  # Set by triggers, see /sync
     
     # Relationships
     state: Mapped["State"] = relationship(back_populates="markets")
@@ -60,6 +91,7 @@ class Commodity(Base):
     category: Mapped[str] = mapped_column(String(50), default="vegetable")
     image_url: Mapped[Optional[str]] = mapped_column(String(500))
     unit: Mapped[str] = mapped_column(String(20), default="kg")  # kg, dozen, piece
+    change_seq: Mapped[Optional[int]] = mapped_column(BigInteger, index=True)  # Set by triggers, see /sync
     
     # Relationships
     prices: Mapped[List["Price"]] = relationship(back_populates="commodity")
@@ -69,19 +101,53 @@ class Commodity(Base):
         return f"<Commodity(id={self.id}, name='{self.name}')>"
 
 
+class PriceSource(Base):
+    """Where price records come from (small lookup table referenced by prices)."""
+    __tablename__ = "price_sources"
+    
+    id: Mapped[int] = mapped_column(SmallInteger, primary_key=True, autoincrement=False)
+    name: Mapped[str] = mapped_column(String(50), unique=True, nullable=False)
+    
+    def __repr__(self) -> str:
+        return f"<PriceSource(id={self.id}, name='{self.name}')>"
+
+
+# Fixed ids of the sources the app itself writes, inserted with the table
+DATA_GOV_SOURCE_ID = 1
+SEED_SOURCE_ID = 2
+PRICE_SOURCES = {DATA_GOV_SOURCE_ID: "data.gov.in", SEED_SOURCE_ID: "seed_data"}
+
+
+@event.listens_for(PriceSource.__table__, "after_create")
+def _insert_price_sources(target, connection, **kw):
+    connection.execute(target.insert(), [{"id": id, "name": name} for id, name in PRICE_SOURCES.items()])
+
+
 class Price(Base):
     """Daily price records."""
     __tablename__ = "prices"
+    __table_args__ = (
+        # Daily listing / yesterday lookup, and keyset pagination by price
+        Index("ix_prices_date_commodity_market", "price_date", "commodity_id", "market_id"),
+        Index("ix_prices_date_modal_id", "price_date", "modal_price", "id"),
+        # On PostgreSQL: monthly range partitions (see app/core/partitions.py)
+        {"postgresql_partition_by": "RANGE (price_date)"},
+    )
     
-    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    # Columns are ordered widest first so rows carry no alignment padding
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
     market_id: Mapped[int] = mapped_column(ForeignKey("markets.id"), nullable=False)
     commodity_id: Mapped[int] = mapped_column(ForeignKey("commodities.id"), nullable=False)
-    min_price: Mapped[float] = mapped_column(Float, nullable=False)
-    max_price: Mapped[float] = mapped_column(Float, nullable=False)
-    modal_price: Mapped[float] = mapped_column(Float, nullable=False)  # Most common price
-    price_date: Mapped[date] = mapped_column(Date, nullable=False)
-    fetched_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
-    source: Mapped[str] = mapped_column(String(50), default="data.gov.in")
+    min_price: Mapped[float] = mapped_column(Paise, nullable=False)
+    max_price: Mapped[float] = mapped_column(Paise, nullable=False)
+    modal_price: Mapped[float] = mapped_column(Paise, nullable=False)  # Most common price
+    # A partitioned table's primary key must include the partition key
+    price_date: Mapped[date] = mapped_column(Date, nullable=False, primary_key=PARTITIONED_PRICES)
+    source_id: Mapped[int] = mapped_column(
+        SmallInteger, ForeignKey("price_sources.id"), nullable=False, default=DATA_GOV_SOURCE_ID
+    )
+    # Last: added after the layout above, where ALTER TABLE puts it
+    change_seq: Mapped[Optional[int]] = mapped_column(BigInteger, index=True)  # Set by triggers, see /sync
     
     # Relationships
     market: Mapped["Market"] = relationship(back_populates="prices")
@@ -91,6 +157,44 @@ class Price(Base):
         return f"<Price(commodity={self.commodity_id}, market={self.market_id}, modal={self.modal_price})>"
 
 
+class QuarantinedPrice(Base):
+    """Ingested prices held back by anomaly screening, kept for review (see screening_service)."""
+    __tablename__ = "quarantined_prices"
+    
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    market_id: Mapped[int] = mapped_column(ForeignKey("markets.id"), nullable=False)
+    commodity_id: Mapped[int] = mapped_column(ForeignKey("commodities.id"), nullable=False)
+    # Floats, not Paise: values are kept as received, and some are far out of range
+    min_price: Mapped[float] = mapped_column(Float, nullable=False)
+    max_price: Mapped[float] = mapped_column(Float, nullable=False)
+    modal_price: Mapped[float] = mapped_column(Float, nullable=False)
+    price_date: Mapped[date] = mapped_column(Date, nullable=False, index=True)
+    source_id: Mapped[int] = mapped_column(
+        SmallInteger, ForeignKey("price_sources.id"), nullable=False, default=DATA_GOV_SOURCE_ID
+    )
+    reason: Mapped[str] = mapped_column(String(20), nullable=False)  # outside_range, unit_mismatch, spike, outside_band
+    baseline_price: Mapped[Optional[float]] = mapped_column(Float)  # Median modal price it was compared with
+    quarantined_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+    
+    def __repr__(self) -> str:
+        return f"<QuarantinedPrice(commodity={self.commodity_id}, market={self.market_id}, reason='{self.reason}')>"
+
+
+class PriceRollup(Base):
+    """Daily per-commodity aggregates of prices that were moved to the archive."""
+    __tablename__ = "price_rollups"
+    
+    price_date: Mapped[date] = mapped_column(Date, primary_key=True)
+    commodity_id: Mapped[int] = mapped_column(ForeignKey("commodities.id"), primary_key=True)
+    modal_total: Mapped[float] = mapped_column(Float, nullable=False)  # Sum of modal prices
+    row_count: Mapped[int] = mapped_column(Integer, nullable=False)
+    modal_low: Mapped[float] = mapped_column(Float, nullable=False)
+    modal_high: Mapped[float] = mapped_column(Float, nullable=False)
+    
+    def __repr__(self) -> str:
+        return f"<PriceRollup(commodity={self.commodity_id}, date={self.price_date}, rows={self.row_count})>"
+
+
 class User(Base):
     """App users for alerts and preferences."""
     __tablename__ = "users"
@@ -101,6 +205,9 @@ class User(Base):
     fcm_token: Mapped[Optional[str]] = mapped_column(String(500))  # Firebase Cloud Messaging
     preferred_language: Mapped[str] = mapped_column(String(10), default="en")  # en, te, hi
     push_enabled: Mapped[bool] = mapped_column(Boolean, default=True)
+    digest_enabled: Mapped[bool] = mapped_column(Boolean, default=False)  # Group alerts into one summary
+    digest_window_minutes: Mapped[int] = mapped_column(Integer, default=60)
+    last_digest_at: Mapped[Optional[datetime]] = mapped_column(DateTime)
     created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
     
     # Relationships
@@ -113,6 +220,9 @@ class User(Base):
 class PriceAlert(Base):
     """User-configured price alerts."""
     __tablename__ = "price_alerts"
+    __table_args__ = (
+        Index("ix_price_alerts_user_created", "user_id", "created_at", "id"),
+    )
     
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
     user_id: Mapped[int] = mapped_column(ForeignKey("users.id"), nullable=False)
@@ -121,8 +231,10 @@ class PriceAlert(Base):
     threshold_price: Mapped[float] = mapped_column(Float, nullable=False)
     alert_type: Mapped[str] = mapped_column(String(20), default="below")  # below, above
     is_active: Mapped[bool] = mapped_column(Boolean, default=True)
+    instant: Mapped[bool] = mapped_column(Boolean, default=False)  # Bypass the user's digest
     last_triggered: Mapped[Optional[datetime]] = mapped_column(DateTime)
     created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+    change_seq: Mapped[Optional[int]] = mapped_column(BigInteger, index=True)  # Set by triggers, see /sync
     
     # Relationships
     user: Mapped["User"] = relationship(back_populates="alerts")
@@ -132,6 +244,28 @@ class PriceAlert(Base):
         return f"<PriceAlert(user={self.user_id}, commodity={self.commodity_id}, threshold={self.threshold_price})>"
 
 
+class AlertEvent(Base):
+    """Triggered alerts waiting to be sent in a user's digest."""
+    __tablename__ = "alert_events"
+    __table_args__ = (
+        Index("ix_alert_events_pending", "user_id", "digested_at"),
+    )
+    
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    user_id: Mapped[int] = mapped_column(ForeignKey("users.id"), nullable=False)
+    alert_id: Mapped[int] = mapped_column(ForeignKey("price_alerts.id", ondelete="CASCADE"), nullable=False)
+    commodity_id: Mapped[int] = mapped_column(ForeignKey("commodities.id"), nullable=False)
+    market_id: Mapped[int] = mapped_column(ForeignKey("markets.id"), nullable=False)
+    alert_type: Mapped[str] = mapped_column(String(20), nullable=False)
+    price: Mapped[float] = mapped_column(Float, nullable=False)
+    threshold_price: Mapped[float] = mapped_column(Float, nullable=False)
+    triggered_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+    digested_at: Mapped[Optional[datetime]] = mapped_column(DateTime)  # NULL until sent
+    
+    def __repr__(self) -> str:
+        return f"<AlertEvent(user={self.user_id}, alert={self.alert_id}, price={self.price})>"
+
+
 class Vendor(Base):
     """Vegetable vendors/shops."""
     __tablename__ = "vendors"
@@ -145,9 +279,24 @@ class Vendor(Base):
     longitude: Mapped[float] = mapped_column(Float, nullable=False)
     is_verified: Mapped[bool] = mapped_column(Boolean, default=False)
     created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+    change_seq: Mapped[Optional[int]] = mapped_column(BigInteger, index=True)  # Set by triggers, see /sync
     
     # Relationships
     market: Mapped[Optional["Market"]] = relationship(back_populates="vendors")
     
     def __repr__(self) -> str:
         return f"<Vendor(id={self.id}, name='{self.name}')>"
+
+
+class SyncTombstone(Base):
+    """Deleted catalog and alert rows, kept so /sync can tell clients to drop them."""
+    __tablename__ = "sync_tombstones"
+    
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    table_name: Mapped[str] = mapped_column(String(50), nullable=False)
+    row_id: Mapped[int] = mapped_column(Integer, nullable=False)
+    owner_id: Mapped[Optional[int]] = mapped_column(Integer)  # user_id of a deleted alert
+    change_seq: Mapped[int] = mapped_column(BigInteger, nullable=False, index=True)
+    
+    def __repr__(self) -> str:
+        return f"<SyncTombstone(table='{self.table_name}', row={self.row_id}, seq={self.change_seq})>"
@@ -4,31 +4,38 @@ from app.schemas.schemas import (
     # State
     StateBase, StateCreate, StateResponse,
     # Market
-    MarketBase, MarketCreate, MarketResponse,
+    MarketBase, MarketCreate, MarketResponse, MarketNearby,
     # Commodity
     CommodityBase, CommodityCreate, CommodityResponse,
     # Price
     PriceBase, PriceCreate, PriceResponse, PriceWithDetails,
     # Trends
-    PriceTrendPoint, PriceTrend,
+    PriceTrendPoint, PriceTrend, PriceStats,
     # User
     UserBase, UserCreate, UserResponse,
     # Alerts
     PriceAlertBase, PriceAlertCreate, PriceAlertResponse,
+    PriceAlertBulkCreate, PriceAlertUpdate, PriceAlertBulkUpdate, PriceAlertBulkIds,
+    BulkAlertResult, BulkAlertResponse,
     # Vendor
-    VendorBase, VendorCreate, VendorResponse,
+    VendorBase, VendorCreate, VendorResponse, VendorNearby,
     # Responses
-    PaginatedResponse, MarketComparison
+    PaginatedResponse, MarketComparison, HomeSnapshot,
+    # Sync
+    SyncTable, SyncResponse
 )
 
 __all__ = [
     "StateBase", "StateCreate", "StateResponse",
-    "MarketBase", "MarketCreate", "MarketResponse",
+    "MarketBase", "MarketCreate", "MarketResponse", "MarketNearby",
     "CommodityBase", "CommodityCreate", "CommodityResponse",
     "PriceBase", "PriceCreate", "PriceResponse", "PriceWithDetails",
-    "PriceTrendPoint", "PriceTrend",
+    "PriceTrendPoint", "PriceTrend", "PriceStats",
     "UserBase", "UserCreate", "UserResponse",
     "PriceAlertBase", "PriceAlertCreate", "PriceAlertResponse",
-    "VendorBase", "VendorCreate", "VendorResponse",
-    "PaginatedResponse", "MarketComparison"
+    "PriceAlertBulkCreate", "PriceAlertUpdate", "PriceAlertBulkUpdate", "PriceAlertBulkIds",
+    "BulkAlertResult", "BulkAlertResponse",
+    "VendorBase", "VendorCreate", "VendorResponse", "VendorNearby",
+    "PaginatedResponse", "MarketComparison", "HomeSnapshot",
+    "SyncTable", "SyncResponse"
 ]
@@ -3,8 +3,8 @@ BazaarSetu Backend - Pydantic Schemas
 """
 
 from datetime import datetime, date
-from typing import Optional, List
-from pydantic import BaseModel, ConfigDict
+from typing import Any, Dict, Optional, List
+from pydantic import BaseModel, ConfigDict, Field
 
 
 # ==================== State Schemas ====================
@@ -48,6 +48,10 @@ class MarketResponse(MarketBase):
     model_config = ConfigDict(from_attributes=True)
 
 
+class MarketNearby(MarketResponse):
+    distance_km: float
+
+
 # ==================== Commodity Schemas ====================
 
 class CommodityBase(BaseModel):
@@ -80,15 +84,14 @@ class PriceBase(BaseModel):
 class PriceCreate(PriceBase):
     market_id: int
     commodity_id: int
-    source: str = "data.gov.in"
+    source_id: int = 1  # data.gov.in
 
 
 class PriceResponse(PriceBase):
     id: int
     market_id: int
     commodity_id: int
-    fetched_at: datetime
-    source: str
+    source_id: int
     commodity: Optional[CommodityResponse] = None
     market: Optional[MarketResponse] = None
     model_config = ConfigDict(from_attributes=True)
@@ -102,6 +105,7 @@ class PriceWithDetails(BaseModel):
     commodity_name_hindi: Optional[str] = None
     commodity_image: Optional[str] = None
     category: Optional[str] = "vegetable"
+    market_id: Optional[int] = None
     market_name: str
     district: str
     state_name: str
@@ -133,12 +137,35 @@ class PriceTrend(BaseModel):
     price_change_30d: Optional[float] = None  # % change over 30 days
 
 
+class PriceStats(BaseModel):
+    """Summary statistics of one daily price series (see /prices/stats)."""
+    commodity_id: int
+    commodity_name: Optional[str] = None  # None when the commodity row is gone (e.g. only archived prices remain)
+    market_id: Optional[int] = None
+    market_name: Optional[str] = None
+    latest_date: date
+    latest_price: float
+    days_with_prices: int
+    moving_avg_7d: Optional[float] = None  # Mean of the prices in the last 7 days
+    moving_avg_30d: Optional[float] = None
+    moving_avg_90d: Optional[float] = None
+    price_change_7d: Optional[float] = None  # % change from the price 7 days ago
+    price_change_30d: Optional[float] = None
+    price_change_90d: Optional[float] = None
+    volatility_30d: Optional[float] = None  # Std. dev. of daily log returns over 30 days, in %
+    percentile_10: Optional[float] = None  # Over the whole period
+    median_price: Optional[float] = None
+    percentile_90: Optional[float] = None
+
+
 # ==================== User Schemas ====================
 
 class UserBase(BaseModel):
     phone: Optional[str] = None
     email: Optional[str] = None
     preferred_language: str = "en"
+    digest_enabled: bool = False
+    digest_window_minutes: int = Field(60, ge=5, le=1440)
 
 
 class UserCreate(UserBase):
@@ -159,6 +186,7 @@ class PriceAlertBase(BaseModel):
     market_id: Optional[int] = None
     threshold_price: float
     alert_type: str = "below"  # below, above
+    instant: bool = False  # Skip the user's digest and notify immediately
 
 
 class PriceAlertCreate(PriceAlertBase):
@@ -175,6 +203,44 @@ class PriceAlertResponse(PriceAlertBase):
     model_config = ConfigDict(from_attributes=True)
 
 
+class PriceAlertBulkCreate(BaseModel):
+    user_id: int
+    alerts: List[PriceAlertBase] = Field(..., min_length=1, max_length=500)
+
+
+class PriceAlertUpdate(BaseModel):
+    """Partial update for one alert; unset fields keep their current value."""
+    id: int
+    threshold_price: Optional[float] = None
+    alert_type: Optional[str] = None
+    is_active: Optional[bool] = None
+    instant: Optional[bool] = None
+
+
+class PriceAlertBulkUpdate(BaseModel):
+    user_id: int
+    alerts: List[PriceAlertUpdate] = Field(..., min_length=1, max_length=500)
+
+
+class PriceAlertBulkIds(BaseModel):
+    user_id: int
+    alert_ids: List[int] = Field(..., min_length=1, max_length=500)
+
+
+class BulkAlertResult(BaseModel):
+    index: int  # Position in the request list
+    id: Optional[int] = None
+    status: str  # created, updated, unchanged, toggled, deleted, not_found, invalid
+    detail: Optional[str] = None
+    alert: Optional[PriceAlertResponse] = None
+
+
+class BulkAlertResponse(BaseModel):
+    results: List[BulkAlertResult]
+    succeeded: int
+    failed: int
+
+
 # ==================== Vendor Schemas ====================
 
 class VendorBase(BaseModel):
@@ -197,6 +263,10 @@ class VendorResponse(VendorBase):
     model_config = ConfigDict(from_attributes=True)
 
 
+class VendorNearby(VendorResponse):
+    distance_km: float
+
+
 # ==================== API Response Wrappers ====================
 
 class PaginatedResponse(BaseModel):
@@ -213,3 +283,29 @@ class MarketComparison(BaseModel):
     commodity_name: str
     price_date: date
     markets: List[dict]  # [{market_name, district, modal_price, min_price, max_price}]
+
+
+class HomeSnapshot(BaseModel):
+    """Everything the home screen needs for one state (or all states), in one payload."""
+    state_id: Optional[int] = None
+    price_date: date
+    generated_at: datetime
+    states: List[StateResponse]
+    markets: List[MarketResponse]
+    prices: List[PriceWithDetails]
+    top_gainers: List[PriceWithDetails]
+    top_losers: List[PriceWithDetails]
+
+
+class SyncTable(BaseModel):
+    """Changed rows of one table: values in `columns` order, plus ids of deleted rows."""
+    columns: List[str]
+    rows: List[List[Any]]
+    deleted: List[int]
+
+
+class SyncResponse(BaseModel):
+    """Changes since the client's token; send `token` back as `since` next time."""
+    token: str
+    prices_from: date
+    tables: Dict[str, SyncTable]
@@ -6,6 +6,8 @@ Run this script to populate initial data
 import asyncio
 from app.core.database import AsyncSessionLocal, init_db
 from app.models import State, Market, Commodity
+from app.services.broadcast import broker
+from app.services.geo_service import GEO_CHANNEL
 
 
 # AP & Telangana States
@@ -117,7 +119,17 @@ async def seed_database():
         print(f"   - {len(STATES)} states")
         print(f"   - {len(MARKETS)} markets")
         print(f"   - {len(COMMODITIES)} commodities")
+    
+    # A running API drops its (empty) market location index
+    await broker.publish(GEO_CHANNEL, "markets")
+
+
+async def main():
+    try:
+        await seed_database()
+    finally:
+        await broker.close()
 
 
 if __name__ == "__main__":
-    asyncio.run(seed_database())
+    asyncio.run(main())
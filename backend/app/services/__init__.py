@@ -1,14 +1,68 @@
 """Services module initialization."""
 
 from app.services.data_fetcher import price_data_service, DataGovFetcher, ENAMFetcher
-from app.services.price_service import PriceService
+from app.services.price_service import PriceService, PRICE_FIELDS, COMPARE_FIELDS
 from app.services.alert_service import AlertService, send_push_notification
+from app.services.export_service import build_export_query, stream_export, EXPORT_MEDIA_TYPES
+from app.services.broadcast import (
+    broker,
+    price_channel,
+    filter_event,
+    build_price_deltas,
+    publish_price_deltas,
+    INGEST_CHANNEL
+)
+from app.services.snapshot_service import snapshot_store, SnapshotStore
+from app.services.geo_service import (
+    location_indexes,
+    find_nearby_markets,
+    find_nearby_vendors,
+    GEO_CHANNEL
+)
+from app.services.tile_service import vendor_tiles, VendorTileSet
+from app.services.archive_service import price_archive, archive_prices, PriceArchive
+from app.services.bundle_service import build_bundle
+from app.services.sync_service import collect_changes, parse_sync_token, SYNC_TABLES
+from app.services.analytics_service import get_price_stats, load_price_cube, price_stats, PriceCube
+from app.services.screening_service import screen_prices, release_quarantined
 
 __all__ = [
     "price_data_service",
     "DataGovFetcher",
     "ENAMFetcher",
     "PriceService",
+    "PRICE_FIELDS",
+    "COMPARE_FIELDS",
     "AlertService",
-    "send_push_notification"
+    "send_push_notification",
+    "build_export_query",
+    "stream_export",
+    "EXPORT_MEDIA_TYPES",
+    "broker",
+    "price_channel",
+    "filter_event",
+    "build_price_deltas",
+    "publish_price_deltas",
+    "INGEST_CHANNEL",
+    "snapshot_store",
+    "SnapshotStore",
+    "location_indexes",
+    "find_nearby_markets",
+    "find_nearby_vendors",
+    "GEO_CHANNEL",
+    "vendor_tiles",
+    "VendorTileSet",
+    "price_archive",
+    "archive_prices",
+    "PriceArchive",
+    "build_bundle",
+    "collect_changes",
+    "parse_sync_token",
+    "SYNC_TABLES",
+    "get_price_stats",
+    "load_price_cube",
+    "price_stats",
+    "PriceCube",
+    "screen_prices",
+    "release_quarantined"
 ]
@@ -3,18 +3,43 @@ BazaarSetu Backend - Alert Service
 Manages price alerts and push notifications
 """
 
-from datetime import datetime
-from typing import List, Optional
-from sqlalchemy import select, and_
+from collections import defaultdict
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+from sqlalchemy import select, insert, update, delete, case, func, and_, not_
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 import logging
 
-from app.models import PriceAlert, Price, User, Commodity
-from app.schemas import PriceAlertCreate, PriceAlertResponse
+from app.core.pagination import apply_keyset, decode_cursor, split_page
+from app.models import PriceAlert, AlertEvent, Price, User, Commodity, Market
+from app.schemas import PriceAlertBase, PriceAlertCreate, PriceAlertUpdate, PriceAlertResponse
 
 logger = logging.getLogger(__name__)
 
+ALERT_TYPES = ("below", "above")
+
+# Plain columns returned by bulk statements (no lazy relationships to load)
+ALERT_COLUMNS = tuple(PriceAlert.__table__.c)
+
+# Fields a bulk update may change
+UPDATE_FIELDS = ("threshold_price", "alert_type", "is_active", "instant")
+
+
+def _repeated(alert_ids: List[int]) -> set:
+    """Indexes of ids already seen earlier in the list."""
+    seen = set()
+    repeats = set()
+    for index, alert_id in enumerate(alert_ids):
+        if alert_id in seen:
+            repeats.add(index)
+        seen.add(alert_id)
+    return repeats
+
+
+def _duplicate(index: int, alert_id: int) -> dict:
+    return {"index": index, "id": alert_id, "status": "invalid", "detail": f"Duplicate alert id {alert_id}"}
+
 
 class AlertService:
     """Service for managing price alerts."""
@@ -31,12 +56,13 @@ class AlertService:
             market_id=alert_data.market_id,
             threshold_price=alert_data.threshold_price,
             alert_type=alert_data.alert_type,
+            instant=alert_data.instant,
             is_active=True
         )
         
         self.db.add(alert)
         await self.db.commit()
-        await self.db.refresh(alert)
+        await self.db.refresh(alert, attribute_names=["commodity"])
         
         logger.info(f"Created alert {alert.id} for user {alert.user_id}")
         return alert
@@ -54,74 +80,333 @@ class AlertService:
         result = await self.db.execute(query)
         return result.scalars().all()
     
+    async def get_user_alerts_page(
+        self,
+        user_id: int,
+        limit: int,
+        cursor: Optional[str] = None
+    ) -> Tuple[List[PriceAlert], Optional[str]]:
+        """
+        Get one page of a user's alerts, newest first, plus the next cursor.
+        
+        Raises ValueError for an invalid cursor.
+        """
+        
+        after = None
+        if cursor:
+            created_at, alert_id = decode_cursor(cursor, "alerts:created", (str, int))
+            after = (datetime.fromisoformat(created_at), alert_id)
+        
+        query = (
+            select(PriceAlert)
+            .options(selectinload(PriceAlert.commodity))
+            .where(PriceAlert.user_id == user_id)
+        )
+        query = apply_keyset(query, [PriceAlert.created_at, PriceAlert.id], after, True, limit)
+        
+        result = await self.db.execute(query)
+        return split_page(
+            result.scalars().all(), limit, "alerts:created",
+            key=lambda a: (a.created_at.isoformat(), a.id)
+        )
+    
     async def toggle_alert(self, alert_id: int, user_id: int) -> Optional[PriceAlert]:
         """Toggle an alert's active status."""
         
-        query = select(PriceAlert).where(
-            and_(
-                PriceAlert.id == alert_id,
-                PriceAlert.user_id == user_id
+        query = (
+            update(PriceAlert)
+            .where(
+                and_(
+                    PriceAlert.id == alert_id,
+                    PriceAlert.user_id == user_id
+                )
             )
+            .values(is_active=not_(PriceAlert.is_active))
+            .returning(PriceAlert)
         )
         
         result = await self.db.execute(query)
         alert = result.scalar_one_or_none()
-        
-        if alert:
-            alert.is_active = not alert.is_active
-            await self.db.commit()
-            await self.db.refresh(alert)
+        await self.db.commit()
         
         return alert
     
     async def delete_alert(self, alert_id: int, user_id: int) -> bool:
         """Delete an alert."""
         
-        query = select(PriceAlert).where(
-            and_(
-                PriceAlert.id == alert_id,
-                PriceAlert.user_id == user_id
+        query = (
+            delete(PriceAlert)
+            .where(
+                and_(
+                    PriceAlert.id == alert_id,
+                    PriceAlert.user_id == user_id
+                )
             )
+            .returning(PriceAlert.id)
         )
         
         result = await self.db.execute(query)
-        alert = result.scalar_one_or_none()
+        deleted = result.scalar_one_or_none() is not None
+        await self.db.commit()
+        
+        return deleted
+    
+    # ==================== Bulk operations ====================
+    
+    async def bulk_create_alerts(self, user_id: int, items: List[PriceAlertBase]) -> List[dict]:
+        """
+        Create many alerts with one multi-row INSERT ... RETURNING.
+        
+        The user, commodities and markets are looked up first, so unknown
+        ones are reported per item (`not_found`) instead of failing the
+        whole batch on a foreign key error.
+        """
+        
+        user_found = (await self.db.execute(select(User.id).where(User.id == user_id))).scalar_one_or_none()
+        if user_found is None:
+            return [
+                {"index": index, "status": "not_found", "detail": f"User {user_id} not found"}
+                for index in range(len(items))
+            ]
+        
+        commodity_ids = {item.commodity_id for item in items}
+        market_ids = {item.market_id for item in items if item.market_id is not None}
+        known_commodities = set(
+            (await self.db.execute(select(Commodity.id).where(Commodity.id.in_(commodity_ids)))).scalars()
+        )
+        known_markets = set()
+        if market_ids:
+            known_markets = set(
+                (await self.db.execute(select(Market.id).where(Market.id.in_(market_ids)))).scalars()
+            )
         
-        if alert:
-            await self.db.delete(alert)
+        results: List[dict] = []
+        rows = []
+        row_indexes = []
+        for index, item in enumerate(items):
+            if item.alert_type not in ALERT_TYPES:
+                results.append({"index": index, "status": "invalid", "detail": f"Invalid alert_type '{item.alert_type}'"})
+                continue
+            missing = None
+            if item.commodity_id not in known_commodities:
+                missing = f"Commodity {item.commodity_id} not found"
+            elif item.market_id is not None and item.market_id not in known_markets:
+                missing = f"Market {item.market_id} not found"
+            if missing:
+                results.append({"index": index, "status": "not_found", "detail": missing})
+                continue
+            
+            rows.append({
+                "user_id": user_id,
+                "commodity_id": item.commodity_id,
+                "market_id": item.market_id,
+                "threshold_price": item.threshold_price,
+                "alert_type": item.alert_type,
+                "instant": item.instant,
+                "is_active": True
+            })
+            row_indexes.append(index)
+        
+        if rows:
+            result = await self.db.execute(
+                insert(PriceAlert).returning(*ALERT_COLUMNS, sort_by_parameter_order=True),
+                rows
+            )
+            for index, alert in zip(row_indexes, result.mappings().all()):
+                results.append({"index": index, "id": alert["id"], "status": "created", "alert": dict(alert)})
             await self.db.commit()
-            return True
+            logger.info(f"Created {len(rows)} alerts for user {user_id}")
         
-        return False
+        return sorted(results, key=lambda r: r["index"])
     
-    async def check_and_trigger_alerts(self, prices: List[Price]) -> List[dict]:
+    async def bulk_update_alerts(self, user_id: int, items: List[PriceAlertUpdate]) -> List[dict]:
         """
-        Check if any alerts should be triggered based on new prices.
-        Returns list of triggered alerts with user info for notification.
+        Apply per-alert partial updates with a single UPDATE ... RETURNING.
+        
+        The current values are read first: alerts the user does not own are
+        `not_found`, and ones the update would not change are `unchanged`
+        and left out of the statement. Each changed field becomes a
+        `CASE id WHEN ... THEN ...` expression, so alerts with different new
+        values still share one statement. Repeated ids are `invalid`.
         """
         
-        triggered = []
+        results: List[dict] = []
+        valid = {}
+        repeats = _repeated([item.id for item in items])
+        for index, item in enumerate(items):
+            if index in repeats:
+                results.append(_duplicate(index, item.id))
+                continue
+            detail = None
+            if item.alert_type is not None and item.alert_type not in ALERT_TYPES:
+                detail = f"Invalid alert_type '{item.alert_type}'"
+            elif all(getattr(item, field) is None for field in UPDATE_FIELDS):
+                detail = "No fields to update"
+            if detail:
+                results.append({"index": index, "id": item.id, "status": "invalid", "detail": detail})
+                continue
+            valid[index] = item
         
-        for price in prices:
-            # Find matching alerts
+        current = {}
+        if valid:
+            result = await self.db.execute(
+                select(*ALERT_COLUMNS).where(
+                    and_(
+                        PriceAlert.id.in_({item.id for item in valid.values()}),
+                        PriceAlert.user_id == user_id
+                    )
+                )
+            )
+            current = {alert["id"]: dict(alert) for alert in result.mappings().all()}
+        
+        changes = {}
+        for index, item in valid.items():
+            alert = current.get(item.id)
+            if alert is None:
+                results.append({"index": index, "id": item.id, "status": "not_found"})
+                continue
+            changed = {
+                field: getattr(item, field)
+                for field in UPDATE_FIELDS
+                if getattr(item, field) is not None and getattr(item, field) != alert[field]
+            }
+            if changed:
+                changes[index] = changed
+            else:
+                results.append({"index": index, "id": item.id, "status": "unchanged", "alert": alert})
+        
+        values = {}
+        for field in UPDATE_FIELDS:
+            whens = {valid[index].id: changed[field] for index, changed in changes.items() if field in changed}
+            if whens:
+                column = getattr(PriceAlert, field)
+                values[field] = case(whens, value=PriceAlert.id, else_=column)
+        
+        updated = {}
+        if values:
             query = (
-                select(PriceAlert)
-                .options(selectinload(PriceAlert.user))
+                update(PriceAlert)
                 .where(
                     and_(
-                        PriceAlert.commodity_id == price.commodity_id,
-                        PriceAlert.is_active == True,
-                        # Either no specific market or matching market
-                        (PriceAlert.market_id == None) | 
-                        (PriceAlert.market_id == price.market_id)
+                        PriceAlert.id.in_({valid[index].id for index in changes}),
+                        PriceAlert.user_id == user_id
                     )
                 )
+                .values(**values)
+                .returning(*ALERT_COLUMNS)
+                .execution_options(synchronize_session=False)
             )
-            
             result = await self.db.execute(query)
-            alerts = result.scalars().all()
-            
-            for alert in alerts:
+            updated = {alert["id"]: dict(alert) for alert in result.mappings().all()}
+            await self.db.commit()
+        
+        for index in changes:
+            alert_id = valid[index].id
+            if alert_id in updated:
+                results.append({"index": index, "id": alert_id, "status": "updated", "alert": updated[alert_id]})
+            else:
+                # Deleted between the read and the update
+                results.append({"index": index, "id": alert_id, "status": "not_found"})
+        
+        return sorted(results, key=lambda r: r["index"])
+    
+    async def bulk_toggle_alerts(self, user_id: int, alert_ids: List[int]) -> List[dict]:
+        """Flip `is_active` on many alerts with one UPDATE ... RETURNING (repeated ids are `invalid`)."""
+        
+        query = (
+            update(PriceAlert)
+            .where(
+                and_(
+                    PriceAlert.id.in_(set(alert_ids)),
+                    PriceAlert.user_id == user_id
+                )
+            )
+            .values(is_active=not_(PriceAlert.is_active))
+            .returning(*ALERT_COLUMNS)
+            .execution_options(synchronize_session=False)
+        )
+        
+        result = await self.db.execute(query)
+        toggled = {alert["id"]: dict(alert) for alert in result.mappings().all()}
+        await self.db.commit()
+        
+        repeats = _repeated(alert_ids)
+        return [
+            _duplicate(index, alert_id) if index in repeats
+            else {"index": index, "id": alert_id, "status": "toggled", "alert": toggled[alert_id]}
+            if alert_id in toggled
+            else {"index": index, "id": alert_id, "status": "not_found"}
+            for index, alert_id in enumerate(alert_ids)
+        ]
+    
+    async def bulk_delete_alerts(self, user_id: int, alert_ids: List[int]) -> List[dict]:
+        """Delete many alerts with one DELETE ... RETURNING (repeated ids are `invalid`)."""
+        
+        query = (
+            delete(PriceAlert)
+            .where(
+                and_(
+                    PriceAlert.id.in_(set(alert_ids)),
+                    PriceAlert.user_id == user_id
+                )
+            )
+            .returning(PriceAlert.id)
+            .execution_options(synchronize_session=False)
+        )
+        
+        result = await self.db.execute(query)
+        deleted = set(result.scalars().all())
+        await self.db.commit()
+        
+        repeats = _repeated(alert_ids)
+        return [
+            _duplicate(index, alert_id) if index in repeats
+            else {"index": index, "id": alert_id, "status": "deleted" if alert_id in deleted else "not_found"}
+            for index, alert_id in enumerate(alert_ids)
+        ]
+    
+    async def check_and_trigger_alerts(self, prices: List[Price]) -> List[dict]:
+        """
+        Check if any alerts should be triggered based on new prices.
+        Returns list of triggered alerts with user info for notification
+        (callers push only when `push_enabled` and an `fcm_token` is set).
+        
+        Alerts owned by users in digest mode are queued as `AlertEvent` rows
+        instead of being returned; `dispatch_digests` sends them later as a
+        single summary per user.
+        """
+        
+        if not prices:
+            return []
+        
+        # Load every candidate alert in one query instead of one per price
+        commodity_ids = {p.commodity_id for p in prices}
+        query = (
+            select(PriceAlert)
+            .options(selectinload(PriceAlert.user))
+            .where(
+                and_(
+                    PriceAlert.commodity_id.in_(commodity_ids),
+                    PriceAlert.is_active == True
+                )
+            )
+        )
+        result = await self.db.execute(query)
+        
+        alerts_by_commodity: Dict[int, List[PriceAlert]] = defaultdict(list)
+        for alert in result.scalars().all():
+            alerts_by_commodity[alert.commodity_id].append(alert)
+        
+        now = datetime.utcnow()
+        triggered = []
+        digest_events = []
+        
+        for price in prices:
+            for alert in alerts_by_commodity.get(price.commodity_id, ()):
+                # Either no specific market or matching market
+                if alert.market_id is not None and alert.market_id != price.market_id:
+                    continue
+                
                 should_trigger = False
                 
                 if alert.alert_type == "below":
@@ -129,26 +414,189 @@ class AlertService:
                 elif alert.alert_type == "above":
                     should_trigger = price.modal_price >= alert.threshold_price
                 
-                if should_trigger:
-                    # Update last triggered
-                    alert.last_triggered = datetime.utcnow()
-                    
-                    triggered.append({
-                        "alert_id": alert.id,
+                if not should_trigger:
+                    continue
+                
+                # Update last triggered
+                alert.last_triggered = now
+                
+                if alert.user and alert.user.digest_enabled and not alert.instant:
+                    digest_events.append({
                         "user_id": alert.user_id,
-                        "fcm_token": alert.user.fcm_token if alert.user else None,
+                        "alert_id": alert.id,
                         "commodity_id": price.commodity_id,
                         "market_id": price.market_id,
-                        "current_price": price.modal_price,
+                        "alert_type": alert.alert_type,
+                        "price": price.modal_price,
                         "threshold_price": alert.threshold_price,
-                        "alert_type": alert.alert_type
+                        "triggered_at": now
                     })
+                    continue
+                
+                triggered.append({
+                    "alert_id": alert.id,
+                    "user_id": alert.user_id,
+                    "fcm_token": alert.user.fcm_token if alert.user else None,
+                    "push_enabled": bool(alert.user and alert.user.push_enabled),
+                    "commodity_id": price.commodity_id,
+                    "market_id": price.market_id,
+                    "current_price": price.modal_price,
+                    "threshold_price": alert.threshold_price,
+                    "alert_type": alert.alert_type
+                })
+        
+        if digest_events:
+            # executemany with batched multi-row VALUES
+            await self.db.execute(insert(AlertEvent), digest_events)
         
-        if triggered:
+        if triggered or digest_events:
             await self.db.commit()
-            logger.info(f"Triggered {len(triggered)} price alerts")
+            logger.info(
+                f"Triggered {len(triggered)} price alerts, "
+                f"queued {len(digest_events)} for digests"
+            )
         
         return triggered
+    
+    async def dispatch_digests(self, now: Optional[datetime] = None) -> List[dict]:
+        """
+        Send one localized summary to every user whose digest window has elapsed.
+        
+        A user's window opens with their oldest pending event. Pending events
+        are aggregated in the database (per user, commodity and alert type),
+        so the work done here scales with the number of summary lines rather
+        than the number of raw events.
+        """
+        
+        now = now or datetime.utcnow()
+        
+        # Oldest pending event per user
+        pending_query = (
+            select(
+                AlertEvent.user_id,
+                func.min(AlertEvent.triggered_at).label("first_event")
+            )
+            .where(AlertEvent.digested_at == None)
+            .group_by(AlertEvent.user_id)
+        )
+        pending = (await self.db.execute(pending_query)).all()
+        if not pending:
+            return []
+        
+        users_result = await self.db.execute(
+            select(User).where(User.id.in_([row.user_id for row in pending]))
+        )
+        users = {u.id: u for u in users_result.scalars().all()}
+        
+        due_ids = [
+            row.user_id for row in pending
+            if row.user_id in users
+            and now - row.first_event >= timedelta(minutes=users[row.user_id].digest_window_minutes or 60)
+        ]
+        if not due_ids:
+            return []
+        
+        window_filter = and_(
+            AlertEvent.user_id.in_(due_ids),
+            AlertEvent.digested_at == None,
+            AlertEvent.triggered_at <= now
+        )
+        summary_query = (
+            select(
+                AlertEvent.user_id,
+                AlertEvent.commodity_id,
+                AlertEvent.alert_type,
+                func.count().label("events"),
+                func.count(func.distinct(AlertEvent.market_id)).label("markets"),
+                func.min(AlertEvent.price).label("min_price"),
+                func.max(AlertEvent.price).label("max_price")
+            )
+            .where(window_filter)
+            .group_by(AlertEvent.user_id, AlertEvent.commodity_id, AlertEvent.alert_type)
+        )
+        lines_by_user: Dict[int, list] = defaultdict(list)
+        for row in (await self.db.execute(summary_query)).all():
+            lines_by_user[row.user_id].append(row)
+        
+        commodity_ids = {row.commodity_id for rows in lines_by_user.values() for row in rows}
+        commodities_result = await self.db.execute(
+            select(Commodity).where(Commodity.id.in_(commodity_ids))
+        )
+        commodities = {c.id: c for c in commodities_result.scalars().all()}
+        
+        digests = []
+        for user_id, rows in lines_by_user.items():
+            user = users[user_id]
+            title, body = format_digest(rows, commodities, user.preferred_language)
+            digests.append({
+                "user_id": user_id,
+                "fcm_token": user.fcm_token,
+                "language": user.preferred_language,
+                "title": title,
+                "body": body,
+                "events": sum(row.events for row in rows)
+            })
+            if user.push_enabled and user.fcm_token:
+                await send_push_notification(user.fcm_token, title, body)
+        
+        await self.db.execute(
+            update(AlertEvent)
+            .where(window_filter)
+            .values(digested_at=now)
+            .execution_options(synchronize_session=False)
+        )
+        await self.db.execute(
+            update(User)
+            .where(User.id.in_(list(lines_by_user)))
+            .values(last_digest_at=now)
+            .execution_options(synchronize_session=False)
+        )
+        await self.db.commit()
+        
+        logger.info(f"Sent {len(digests)} alert digests")
+        return digests
+
+
+# Digest wording per supported language (en, te, hi)
+DIGEST_TEMPLATES = {
+    "en": {
+        "title": "BazaarSetu: {count} price alerts",
+        "below": "{name} fell to ₹{price:.0f} in {markets} market(s)",
+        "above": "{name} rose to ₹{price:.0f} in {markets} market(s)",
+    },
+    "te": {
+        "title": "బజార్‌సేతు: {count} ధర హెచ్చరికలు",
+        "below": "{name} ధర ₹{price:.0f}కి తగ్గింది ({markets} మార్కెట్లు)",
+        "above": "{name} ధర ₹{price:.0f}కి పెరిగింది ({markets} మార్కెట్లు)",
+    },
+    "hi": {
+        "title": "बाज़ारसेतु: {count} मूल्य अलर्ट",
+        "below": "{name} का दाम ₹{price:.0f} तक गिरा ({markets} बाज़ार)",
+        "above": "{name} का दाम ₹{price:.0f} तक बढ़ा ({markets} बाज़ार)",
+    },
+}
+
+
+def format_digest(rows: list, commodities: Dict[int, Commodity], language: str) -> Tuple[str, str]:
+    """Build a localized (title, body) pair from aggregated digest rows."""
+    
+    templates = DIGEST_TEMPLATES.get(language, DIGEST_TEMPLATES["en"])
+    name_attr = {"te": "name_telugu", "hi": "name_hindi"}.get(language)
+    
+    lines = []
+    for row in sorted(rows, key=lambda r: r.commodity_id):
+        commodity = commodities.get(row.commodity_id)
+        name = str(row.commodity_id)
+        if commodity:
+            name = (getattr(commodity, name_attr) if name_attr else None) or commodity.name
+        
+        # Report the best price seen for the alert direction
+        price = row.min_price if row.alert_type == "below" else row.max_price
+        template = templates.get(row.alert_type, templates["below"])
+        lines.append(template.format(name=name, price=price, markets=row.markets))
+    
+    title = templates["title"].format(count=len(lines))
+    return title, "\n".join(lines)
 
 
 async def send_push_notification(fcm_token: str, title: str, body: str) -> bool:
@@ -0,0 +1,303 @@
+"""
+BazaarSetu Backend - Price Analytics
+Moving averages, changes, volatility and percentiles for many price series at once, with NumPy.
+"""
+
+import asyncio
+import logging
+from datetime import date, timedelta
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+from sqlalchemy import select, func, and_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.cache import TTLCache
+from app.core.config import get_settings
+from app.core.fieldsets import localized_name
+from app.core.responses import list_adapter
+from app.models import Price, PriceRollup, Commodity, Market
+from app.schemas import PriceStats
+from app.services.archive_service import archive_cutoff, price_archive
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+# Trailing windows (days) of the moving averages and price changes
+STAT_WINDOWS = (7, 30, 90)
+VOLATILITY_DAYS = 30
+PERCENTILES = (10, 50, 90)
+
+# Market id of the single series per commodity in all-market cubes
+ALL_MARKETS = -1
+
+# Built stats per (commodity_ids, market_ids, by_market, days, end_date, lang)
+stats_cache = TTLCache(ttl_seconds=settings.trend_cache_ttl_seconds, max_entries=256)
+
+
+class PriceCube:
+    """
+    Daily modal prices as a dense `(series, day)` array, NaN on days without a price.
+    
+    A series is one (commodity, market) pair, so this is the commodity x
+    market x day cube with the pairs that never traded left out (most
+    markets only carry some commodities). In all-market cubes each
+    commodity has one series, `ALL_MARKETS`, holding the mean across
+    markets like the all-market trends. Series are sorted by commodity,
+    then market.
+    """
+    
+    def __init__(self, start: date, days: int, commodity, market, day, total, count):
+        self.start = start
+        keys = commodity.astype(np.int64) << 32 | (market.astype(np.int64) & 0xFFFFFFFF)
+        _, first, series = np.unique(keys, return_index=True, return_inverse=True)
+        self.commodity_ids = commodity[first]
+        self.market_ids = market[first]
+        
+        flat = series * days + day
+        size = len(first) * days
+        totals = np.bincount(flat, weights=total, minlength=size).reshape(len(first), days)
+        counts = np.bincount(flat, weights=count, minlength=size).reshape(len(first), days)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            self.prices = np.where(counts > 0, totals / counts, np.nan)
+    
+    def __len__(self) -> int:
+        return len(self.prices)
+
+
+def _day_columns(rows: Sequence[tuple], start: date) -> tuple:
+    """(commodity_id, market_id, price_date, total, count) rows as arrays, dates as day offsets."""
+    if not rows:
+        return tuple(np.empty(0, dtype) for dtype in (np.int64, np.int64, np.int64, np.float64, np.float64))
+    commodity, market, price_date, total, count = zip(*rows)
+    days = (np.array(price_date, dtype="datetime64[D]") - np.datetime64(start, "D")).astype(np.int64)
+    return (
+        np.array(commodity, dtype=np.int64),
+        np.array(market, dtype=np.int64),
+        days,
+        np.array(total, dtype=np.float64),
+        np.array(count, dtype=np.float64)
+    )
+
+
+async def load_price_cube(
+    db: AsyncSession,
+    start: date,
+    end: date,
+    commodity_ids: Optional[Sequence[int]] = None,
+    market_ids: Optional[Sequence[int]] = None,
+    by_market: bool = False
+) -> PriceCube:
+    """
+    Daily prices for `start`..`end` as a `PriceCube`.
+    
+    Raw prices come from one grouped query. Days before `archive_cutoff`
+    are filled from `price_rollups` for all-market cubes and from the
+    Parquet archive for per-market ones, as the trends do. `None` ids
+    mean every commodity or market.
+    """
+    by_market = by_market or bool(market_ids)
+    group_columns = [Price.commodity_id] + ([Price.market_id] if by_market else [])
+    
+    query = (
+        select(*group_columns, Price.price_date, func.sum(Price.modal_price), func.count())
+        .where(and_(Price.price_date >= start, Price.price_date <= end))
+        .group_by(*group_columns, Price.price_date)
+    )
+    if commodity_ids:
+        query = query.where(Price.commodity_id.in_(commodity_ids))
+    if market_ids:
+        query = query.where(Price.market_id.in_(market_ids))
+    result = await db.execute(query)
+    if by_market:
+        rows = result.all()
+    else:
+        rows = [(commodity_id, ALL_MARKETS, price_date, total, count) for commodity_id, price_date, total, count in result]
+    
+    archived_before = archive_cutoff(end)
+    if start < archived_before:
+        archived_end = min(end, archived_before - timedelta(days=1))
+        if by_market:
+            if not commodity_ids:
+                commodity_ids = (await db.execute(select(Commodity.id))).scalars().all()
+            archived = await asyncio.to_thread(price_archive.read_daily, commodity_ids, market_ids, start, archived_end)
+            rows += [(day.commodity_id, day.market_id, day.price_date, day.total, day.count) for day in archived]
+        else:
+            rollups = select(
+                PriceRollup.commodity_id,
+                PriceRollup.price_date,
+                PriceRollup.modal_total,
+                PriceRollup.row_count
+            ).where(and_(PriceRollup.price_date >= start, PriceRollup.price_date <= archived_end))
+            if commodity_ids:
+                rollups = rollups.where(PriceRollup.commodity_id.in_(commodity_ids))
+            rows += [
+                (commodity_id, ALL_MARKETS, price_date, total, count)
+                for commodity_id, price_date, total, count in await db.execute(rollups)
+            ]
+    
+    return PriceCube(start, (end - start).days + 1, *_day_columns(rows, start))
+
+
+def price_stats(prices: np.ndarray) -> Dict[str, np.ndarray]:
+    """
+    Statistics of every row of a `(series, day)` price array at once.
+    
+    The latest price is the last non-NaN one, and changes compare it with
+    the last price on or before the day `window` days back. Moving
+    averages are the mean of the prices within each trailing window;
+    volatility is the standard deviation (in %) of the log returns between
+    consecutive prices over the last `VOLATILITY_DAYS`; percentiles cover
+    the whole period. Values that cannot be computed are NaN.
+    """
+    series, days = prices.shape
+    valid = ~np.isnan(prices)
+    
+    # Day of the latest price on or before each day (-1 before the first one)
+    last_seen = np.maximum.accumulate(np.where(valid, np.arange(days), -1), axis=1)
+    
+    def carried(columns) -> np.ndarray:
+        """The latest price on or before the given days (NaN before the first one)."""
+        seen = last_seen[:, columns]
+        index = np.maximum(seen, 0)
+        values = np.take_along_axis(prices, index if index.ndim == 2 else index[:, None], axis=1).reshape(seen.shape)
+        return np.where(seen >= 0, values, np.nan)
+    
+    latest = carried(-1)
+    stats = {
+        "latest_day": last_seen[:, -1],
+        "latest_price": latest,
+        "days_with_prices": valid.sum(axis=1),
+    }
+    
+    for window in STAT_WINDOWS:
+        stats[f"moving_avg_{window}d"] = _nan_mean(prices[:, -window:])
+        before = carried(-1 - window) if window < days else np.full(series, np.nan)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            stats[f"price_change_{window}d"] = np.where(before > 0, (latest - before) / before * 100, np.nan)
+    
+    # A return is counted on the day of the newer price, so gaps do not add zero returns
+    recent = carried(slice(-VOLATILITY_DAYS - 1, None))
+    with np.errstate(invalid="ignore", divide="ignore"):
+        logs = np.log(np.where(recent > 0, recent, np.nan))
+    returns = np.where(valid[:, -logs.shape[1] + 1:], np.diff(logs, axis=1), np.nan)
+    stats[f"volatility_{VOLATILITY_DAYS}d"] = _nan_std(returns) * 100
+    
+    low, median, high = _nan_percentiles(prices, PERCENTILES).T
+    stats["percentile_10"] = low
+    stats["median_price"] = median
+    stats["percentile_90"] = high
+    return stats
+
+
+def _nan_mean(values: np.ndarray) -> np.ndarray:
+    """Row means ignoring NaN (NaN for empty rows, without np.nanmean's warning)."""
+    valid = ~np.isnan(values)
+    count = valid.sum(axis=1)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.where(count > 0, np.where(valid, values, 0.0).sum(axis=1) / count, np.nan)
+
+
+def _nan_std(values: np.ndarray) -> np.ndarray:
+    """Row sample standard deviations ignoring NaN (NaN below two values)."""
+    valid = ~np.isnan(values)
+    count = valid.sum(axis=1)
+    mean = _nan_mean(values)
+    squares = np.where(valid, (values - mean[:, None]) ** 2, 0.0).sum(axis=1)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.where(count > 1, np.sqrt(squares / (count - 1)), np.nan)
+
+
+def _nan_percentiles(values: np.ndarray, percentiles: Sequence[float]) -> np.ndarray:
+    """
+    Linearly interpolated percentiles of each row ignoring NaN, shape `(rows, len(percentiles))`.
+    
+    Same results as `np.nanpercentile(values, percentiles, axis=1).T`,
+    which sorts row by row in Python; this sorts once (NaN goes last).
+    """
+    ordered = np.sort(values, axis=1)
+    count = (~np.isnan(values)).sum(axis=1)
+    last = np.maximum(count - 1, 0)[:, None]
+    position = last * (np.asarray(percentiles, dtype=np.float64) / 100.0)
+    below = np.floor(position).astype(np.int64)
+    above = np.minimum(below + 1, last)
+    low = np.take_along_axis(ordered, below, axis=1)
+    high = np.take_along_axis(ordered, above, axis=1)
+    result = low + (high - low) * (position - below)
+    result[count == 0] = np.nan
+    return result
+
+
+def _rounded(values: np.ndarray) -> list:
+    return [None if value != value else value for value in np.round(values, 2).tolist()]
+
+
+async def get_price_stats(
+    db: AsyncSession,
+    commodity_ids: Optional[List[int]] = None,
+    market_ids: Optional[List[int]] = None,
+    by_market: bool = False,
+    days: int = 365,
+    lang: Optional[str] = None,
+    end_date: Optional[date] = None
+) -> List[PriceStats]:
+    """
+    `PriceStats` for each commodity (or commodity and market) with prices in the last `days`.
+    
+    Without `market_ids` or `by_market` there is one all-market series per
+    commodity. The whole set is loaded as one `PriceCube` and computed
+    with `price_stats`, so a year of every market costs one query and a
+    few array passes; results are cached until the next ingestion.
+    """
+    end_date = end_date or date.today()
+    start_date = end_date - timedelta(days=days - 1)
+    commodity_ids = sorted(set(commodity_ids)) if commodity_ids else None
+    market_ids = sorted(set(market_ids)) if market_ids else None
+    by_market = by_market or bool(market_ids)
+    
+    key = (
+        tuple(commodity_ids) if commodity_ids else None,
+        tuple(market_ids) if market_ids else None,
+        by_market, days, end_date, lang
+    )
+    cached = stats_cache.get(key)
+    if cached is not None:
+        return cached
+    
+    cube = await load_price_cube(db, start_date, end_date, commodity_ids, market_ids, by_market)
+    if not len(cube):
+        stats_cache.set(key, [])
+        return []
+    stats = await asyncio.to_thread(price_stats, cube.prices)
+    
+    commodity_names = dict((await db.execute(
+        select(Commodity.id, localized_name(Commodity, lang))
+        .where(Commodity.id.in_(np.unique(cube.commodity_ids).tolist()))
+    )).all())
+    market_names = {}
+    if by_market:
+        market_names = dict((await db.execute(
+            select(Market.id, localized_name(Market, lang))
+            .where(Market.id.in_(np.unique(cube.market_ids).tolist()))
+        )).all())
+    
+    columns = {name: _rounded(values) for name, values in stats.items() if values.dtype.kind == "f"}
+    latest_dates = [start_date + timedelta(days=day) for day in stats["latest_day"].tolist()]
+    observed = stats["days_with_prices"].tolist()
+    rows = []
+    for i, (commodity_id, market_id) in enumerate(zip(cube.commodity_ids.tolist(), cube.market_ids.tolist())):
+        row = {name: values[i] for name, values in columns.items()}
+        row.update(
+            commodity_id=commodity_id,
+            commodity_name=commodity_names.get(commodity_id),
+            market_id=market_id if by_market else None,
+            market_name=market_names.get(market_id),
+            latest_date=latest_dates[i],
+            days_with_prices=observed[i]
+        )
+        rows.append(row)
+    
+    # One validation call for the whole list instead of one per model
+    result = list_adapter(PriceStats).validate_python(rows)
+    stats_cache.set(key, result)
+    return result
@@ -0,0 +1,257 @@
+"""
+BazaarSetu Backend - Price Archive
+Moves aged raw prices into monthly Parquet files, keeping daily rollups in the database.
+"""
+
+import asyncio
+import logging
+import os
+from collections import namedtuple
+from datetime import date, timedelta
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+from sqlalchemy import select, delete, and_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import get_settings
+from app.core.database import AsyncSessionLocal
+from app.core.partitions import PARTITIONED_PRICES, month_start, add_months, drop_month_partition
+from app.models import Price, PriceRollup, PriceSource
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+ARCHIVE_COLUMNS = ["id", "price_date", "commodity_id", "market_id", "min_price", "max_price", "modal_price"]
+
+# Rows per Parquet row group; files are sorted by commodity so a trend
+# read only decompresses the row groups whose statistics match
+ARCHIVE_ROW_GROUP_SIZE = 65536
+
+# One archived (commodity, market, day) aggregate, shaped like a trend query row
+ArchivedDay = namedtuple("ArchivedDay", ["commodity_id", "market_id", "price_date", "total", "count", "low", "high"])
+
+
+def archive_cutoff(today: Optional[date] = None) -> date:
+    """Prices dated before this day may live in the archive instead of the prices table."""
+    return (today or date.today()) - timedelta(days=settings.price_archive_after_days)
+
+
+class PriceArchive:
+    """
+    Monthly zstd-compressed Parquet files of raw prices under one directory.
+    
+    Files are replaced atomically, and merging rows into an existing month
+    drops duplicate ids, so re-running an interrupted archive job is safe.
+    Reads are memory-mapped and push the commodity/market/date filters
+    down to row-group statistics.
+    """
+    
+    def __init__(self, root: str):
+        self.root = Path(root)
+    
+    def path(self, month: date) -> Path:
+        return self.root / f"{month:%Y-%m}.parquet"
+    
+    def months(self, start: date, end: date) -> List[date]:
+        """Archived months overlapping `start`..`end`."""
+        months = []
+        month = month_start(start)
+        while month <= end:
+            if self.path(month).exists():
+                months.append(month)
+            month = add_months(month, 1)
+        return months
+    
+    def schema(self) -> "pa.Schema":
+        return pa.schema([
+            ("id", pa.int64()),
+            ("price_date", pa.date32()),
+            ("commodity_id", pa.int32()),
+            ("market_id", pa.int32()),
+            ("min_price", pa.float64()),
+            ("max_price", pa.float64()),
+            ("modal_price", pa.float64()),
+            ("source", pa.string()),
+        ])
+    
+    def write_month(self, month: date, table: "pa.Table") -> int:
+        """Merge `table` into the month's file and return the file's row count."""
+        path = self.path(month)
+        if path.exists():
+            existing = pq.read_table(path, memory_map=True)
+            fresh = table.filter(pc.invert(pc.is_in(table["id"], value_set=existing["id"])))
+            table = pa.concat_tables([existing, fresh])
+        
+        table = table.sort_by([("commodity_id", "ascending"), ("market_id", "ascending"), ("price_date", "ascending")])
+        path.parent.mkdir(parents=True, exist_ok=True)
+        partial = path.with_suffix(".parquet.tmp")
+        pq.write_table(table, partial, compression="zstd", row_group_size=ARCHIVE_ROW_GROUP_SIZE)
+        os.replace(partial, path)
+        return table.num_rows
+    
+    def read_rows(
+        self,
+        month: date,
+        start: date,
+        end: date,
+        commodity_id: Optional[int] = None,
+        market_id: Optional[int] = None
+    ) -> "pa.Table":
+        """One month's raw rows within `start`..`end`, ordered by date and id."""
+        filters = [("price_date", ">=", start), ("price_date", "<=", end)]
+        if commodity_id:
+            filters.append(("commodity_id", "=", commodity_id))
+        if market_id:
+            filters.append(("market_id", "=", market_id))
+        
+        table = pq.read_table(self.path(month), filters=filters, memory_map=True)
+        return table.sort_by([("price_date", "ascending"), ("id", "ascending")])
+    
+    def read_daily(
+        self,
+        commodity_ids: Iterable[int],
+        market_ids: Optional[Iterable[int]],
+        start: date,
+        end: date
+    ) -> List[ArchivedDay]:
+        """Daily modal-price aggregates per (commodity, market) within `start`..`end`."""
+        filters = [
+            ("commodity_id", "in", list(commodity_ids)),
+            ("price_date", ">=", start),
+            ("price_date", "<=", end),
+        ]
+        if market_ids is not None:
+            filters.append(("market_id", "in", list(market_ids)))
+        
+        tables = [
+            pq.read_table(
+                self.path(month),
+                columns=["commodity_id", "market_id", "price_date", "modal_price"],
+                filters=filters,
+                memory_map=True
+            )
+            for month in self.months(start, end)
+        ]
+        if not tables:
+            return []
+        
+        daily = pa.concat_tables(tables).group_by(["commodity_id", "market_id", "price_date"]).aggregate([
+            ("modal_price", "sum"),
+            ("modal_price", "count"),
+            ("modal_price", "min"),
+            ("modal_price", "max"),
+        ])
+        return [
+            ArchivedDay(*values)
+            for values in zip(
+                daily["commodity_id"].to_pylist(),
+                daily["market_id"].to_pylist(),
+                daily["price_date"].to_pylist(),
+                daily["modal_price_sum"].to_pylist(),
+                daily["modal_price_count"].to_pylist(),
+                daily["modal_price_min"].to_pylist(),
+                daily["modal_price_max"].to_pylist()
+            )
+        ]
+
+
+price_archive = PriceArchive(settings.price_archive_dir)
+
+
+async def archive_prices(today: Optional[date] = None) -> Dict[date, int]:
+    """
+    Move prices older than `price_archive_after_days` to the archive.
+    
+    Works one month at a time: the month's rows are merged into its
+    Parquet file first, then its daily rollups are added and the rows
+    are removed in one transaction (a whole month on a partitioned table
+    is dropped as a partition). Returns archived rows per month.
+    """
+    cutoff = archive_cutoff(today)
+    archived: Dict[date, int] = {}
+    
+    async with AsyncSessionLocal() as db:
+        oldest = (await db.execute(
+            select(Price.price_date).where(Price.price_date < cutoff).order_by(Price.price_date).limit(1)
+        )).scalar()
+        if oldest is None:
+            return archived
+        
+        month = month_start(oldest)
+        while month < cutoff:
+            upper = min(add_months(month, 1), cutoff)
+            in_month = and_(Price.price_date >= month, Price.price_date < upper)
+            rows = (await db.execute(
+                select(*(getattr(Price, column) for column in ARCHIVE_COLUMNS), PriceSource.name.label("source"))
+                .join(PriceSource, Price.source_id == PriceSource.id)
+                .where(in_month)
+            )).all()
+            if rows:
+                table = pa.Table.from_arrays(
+                    [pa.array(values, type=field.type) for values, field in zip(zip(*rows), price_archive.schema())],
+                    schema=price_archive.schema()
+                )
+                await asyncio.to_thread(price_archive.write_month, month, table)
+                await _add_rollups(db, table)
+                await _remove_month(db, month, upper, in_month)
+                await db.commit()
+                archived[month] = len(rows)
+                logger.info(f"Archived {len(rows)} prices for {month:%Y-%m}")
+            month = add_months(month, 1)
+    
+    return archived
+
+
+async def _add_rollups(db: AsyncSession, table: "pa.Table") -> None:
+    """Add a batch of archived rows to the daily per-commodity rollups."""
+    daily = table.group_by(["price_date", "commodity_id"]).aggregate([
+        ("modal_price", "sum"),
+        ("modal_price", "count"),
+        ("modal_price", "min"),
+        ("modal_price", "max"),
+    ])
+    dates = daily["price_date"].to_pylist()
+    existing = {
+        (r.price_date, r.commodity_id): r
+        for r in (await db.execute(
+            select(PriceRollup).where(PriceRollup.price_date.between(min(dates), max(dates)))
+        )).scalars()
+    }
+    
+    # Rows backfilled after their day was archived extend the existing rollup
+    for price_date, commodity_id, total, count, low, high in zip(
+        dates,
+        daily["commodity_id"].to_pylist(),
+        daily["modal_price_sum"].to_pylist(),
+        daily["modal_price_count"].to_pylist(),
+        daily["modal_price_min"].to_pylist(),
+        daily["modal_price_max"].to_pylist()
+    ):
+        rollup = existing.get((price_date, commodity_id))
+        if rollup is None:
+            db.add(PriceRollup(
+                price_date=price_date,
+                commodity_id=commodity_id,
+                modal_total=total,
+                row_count=count,
+                modal_low=low,
+                modal_high=high
+            ))
+        else:
+            rollup.modal_total += total
+            rollup.row_count += count
+            rollup.modal_low = min(rollup.modal_low, low)
+            rollup.modal_high = max(rollup.modal_high, high)
+    await db.flush()
+
+
+async def _remove_month(db: AsyncSession, month: date, upper: date, in_month) -> None:
+    if PARTITIONED_PRICES and upper == add_months(month, 1):
+        # Dropping the whole month is a catalog change, not a row-by-row delete
+        await drop_month_partition(await db.connection(), month)
+    # Whatever is left (a partial month, or rows in the default partition)
+    await db.execute(delete(Price).where(in_month))
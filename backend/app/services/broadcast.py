@@ -0,0 +1,313 @@
+"""
+BazaarSetu Backend - Live Price Broadcast
+Publish/subscribe fan-out for pushing price updates to SSE and WebSocket clients.
+"""
+
+import asyncio
+import json
+import logging
+from collections import defaultdict
+from contextlib import asynccontextmanager
+from datetime import timedelta
+from typing import AsyncIterator, Dict, List, Optional, Set, Tuple
+
+from sqlalchemy import select, func
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import get_settings
+from app.core.responses import dump_json
+from app.models import Price, Market
+
+try:
+    import redis.asyncio as aioredis
+except ImportError:  # redis is only needed for the "redis" backend
+    aioredis = None
+
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+# Sent once per ingestion run so every worker can drop its cached responses
+INGEST_CHANNEL = "prices:ingested"
+
+
+def price_channel(
+    state_id: Optional[int] = None,
+    market_id: Optional[int] = None,
+    commodity_id: Optional[int] = None
+) -> str:
+    """
+    Channel a client subscribes to for the given filters.
+    
+    The most selective filter picks the channel (market, then commodity,
+    then state); any remaining filters are applied per event by `filter_event`.
+    """
+    if market_id:
+        return f"prices:market:{market_id}"
+    if commodity_id:
+        return f"prices:commodity:{commodity_id}"
+    if state_id:
+        return f"prices:state:{state_id}"
+    return "prices:all"
+
+
+class Subscription:
+    """Messages delivered to one subscriber, buffered in a bounded queue."""
+    
+    def __init__(self, queue: "asyncio.Queue[str]"):
+        self._queue = queue
+    
+    async def get(self, timeout: Optional[float] = None) -> Optional[str]:
+        """Next message, or None if nothing arrives within `timeout` seconds."""
+        try:
+            return await asyncio.wait_for(self._queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+
+class LocalBroker:
+    """
+    In-process broker: fans messages out to subscribers of this worker only.
+    
+    Enough for a single uvicorn worker and for tests. Each subscriber has a
+    bounded queue; a client that falls behind loses its oldest events
+    instead of holding memory for the whole burst.
+    """
+    
+    def __init__(self, queue_size: int = 100):
+        self.queue_size = queue_size
+        self._subscribers: Dict[str, Set[asyncio.Queue]] = defaultdict(set)
+    
+    async def start(self) -> None:
+        """Open connections needed to receive messages (no-op locally)."""
+    
+    async def close(self) -> None:
+        """Release connections opened by `start` or `publish`."""
+    
+    async def publish(self, channel: str, message: str) -> None:
+        self._deliver(channel, message)
+    
+    @asynccontextmanager
+    async def subscribe(self, *channels: str) -> AsyncIterator[Subscription]:
+        """Receive messages published to any of `channels` until the block exits."""
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size)
+        for channel in channels:
+            first = not self._subscribers[channel]
+            self._subscribers[channel].add(queue)
+            if first:
+                await self._channel_opened(channel)
+        try:
+            yield Subscription(queue)
+        finally:
+            for channel in channels:
+                subscribers = self._subscribers.get(channel)
+                if subscribers is None:
+                    continue
+                subscribers.discard(queue)
+                if not subscribers:
+                    del self._subscribers[channel]
+                    await self._channel_closed(channel)
+    
+    def subscriber_count(self, channel: Optional[str] = None) -> int:
+        if channel is not None:
+            return len(self._subscribers.get(channel, ()))
+        return len({id(q) for queues in self._subscribers.values() for q in queues})
+    
+    def _deliver(self, channel: str, message: str) -> None:
+        for queue in self._subscribers.get(channel, ()):
+            if queue.full():
+                queue.get_nowait()
+            queue.put_nowait(message)
+    
+    async def _channel_opened(self, channel: str) -> None:
+        pass
+    
+    async def _channel_closed(self, channel: str) -> None:
+        pass
+
+
+class RedisBroker(LocalBroker):
+    """
+    Redis pub/sub broker for fan-out across uvicorn workers and hosts.
+    
+    Each worker holds a single Redis subscription covering the channels its
+    own clients need, and fans received messages out locally, so Redis sees
+    one subscriber per worker rather than one per connected client.
+    """
+    
+    def __init__(self, url: str, queue_size: int = 100):
+        if aioredis is None:
+            raise RuntimeError("The redis package is required for broadcast_backend='redis'")
+        super().__init__(queue_size)
+        self._redis = aioredis.from_url(url, decode_responses=True)
+        self._pubsub = None
+        self._reader: Optional[asyncio.Task] = None
+    
+    async def start(self) -> None:
+        self._pubsub = self._redis.pubsub(ignore_subscribe_messages=True)
+        self._reader = asyncio.create_task(self._read())
+    
+    async def close(self) -> None:
+        if self._reader is not None:
+            self._reader.cancel()
+            try:
+                await self._reader
+            except asyncio.CancelledError:
+                pass
+            self._reader = None
+        if self._pubsub is not None:
+            await self._pubsub.aclose()
+            self._pubsub = None
+        await self._redis.aclose()
+    
+    async def publish(self, channel: str, message: str) -> None:
+        # Local subscribers get it back through the Redis subscription
+        await self._redis.publish(channel, message)
+    
+    async def _channel_opened(self, channel: str) -> None:
+        if self._pubsub is None:
+            raise RuntimeError("RedisBroker.start() must be called before subscribing")
+        await self._pubsub.subscribe(channel)
+    
+    async def _channel_closed(self, channel: str) -> None:
+        if self._pubsub is not None:
+            await self._pubsub.unsubscribe(channel)
+    
+    async def _read(self) -> None:
+        while True:
+            try:
+                if not self._pubsub.subscribed:
+                    await asyncio.sleep(0.5)
+                    continue
+                message = await self._pubsub.get_message(timeout=1.0)
+                if message and message["type"] == "message":
+                    self._deliver(message["channel"], message["data"])
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Redis pub/sub read failed, retrying: {e}")
+                await asyncio.sleep(1.0)
+
+
+def create_broker() -> LocalBroker:
+    """Broker for the configured `broadcast_backend`."""
+    if settings.broadcast_backend == "redis":
+        return RedisBroker(settings.redis_url, queue_size=settings.broadcast_queue_size)
+    return LocalBroker(queue_size=settings.broadcast_queue_size)
+
+
+# Shared by the API routes and the ingestion job of this process
+broker = create_broker()
+
+
+# ==================== Price Deltas ====================
+
+async def build_price_deltas(db: AsyncSession, prices: List[Price]) -> List[Dict]:
+    """
+    Compact per-(market, commodity) updates for newly stored prices.
+    
+    Keys are kept short because every event goes to every subscriber:
+    s/m/c are state, market and commodity ids, p/lo/hi the modal, min and
+    max price, chg the % change from the previous day (as on /prices/today).
+    """
+    if not prices:
+        return []
+    
+    latest: Dict[Tuple[int, int], Price] = {}
+    for price in prices:
+        key = (price.market_id, price.commodity_id)
+        if key not in latest or price.price_date >= latest[key].price_date:
+            latest[key] = price
+    
+    market_ids = {market_id for market_id, _ in latest}
+    states = dict((await db.execute(
+        select(Market.id, Market.state_id).where(Market.id.in_(market_ids))
+    )).all())
+    
+    # Previous day's average modal price per pair, in one grouped query
+    days = {price.price_date for price in latest.values()}
+    previous = {}
+    result = await db.execute(
+        select(
+            Price.market_id,
+            Price.commodity_id,
+            Price.price_date,
+            func.avg(Price.modal_price, type_=Price.modal_price.type).label("modal_price")
+        )
+        .where(
+            Price.price_date.in_([day - timedelta(days=1) for day in days]),
+            Price.market_id.in_(market_ids)
+        )
+        .group_by(Price.market_id, Price.commodity_id, Price.price_date)
+    )
+    for row in result:
+        previous[(row.market_id, row.commodity_id, row.price_date)] = row.modal_price
+    
+    deltas = []
+    for (market_id, commodity_id), price in latest.items():
+        before = previous.get((market_id, commodity_id, price.price_date - timedelta(days=1)))
+        change = (price.modal_price - before) * 100.0 / before if before else None
+        deltas.append({
+            "s": states.get(market_id),
+            "m": market_id,
+            "c": commodity_id,
+            "d": price.price_date,
+            "p": price.modal_price,
+            "lo": price.min_price,
+            "hi": price.max_price,
+            "chg": round(change, 2) if change else None,
+        })
+    return deltas
+
+
+def _encode_event(deltas: List[Dict]) -> str:
+    return dump_json({"type": "prices", "items": deltas}).decode()
+
+
+async def publish_price_deltas(deltas: List[Dict], target: Optional[LocalBroker] = None) -> int:
+    """
+    Publish deltas batched per state, market and commodity channel.
+    
+    Returns the number of messages published.
+    """
+    target = target or broker
+    batches: Dict[str, List[Dict]] = defaultdict(list)
+    for delta in deltas:
+        batches["prices:all"].append(delta)
+        if delta["s"] is not None:
+            batches[price_channel(state_id=delta["s"])].append(delta)
+        batches[price_channel(market_id=delta["m"])].append(delta)
+        batches[price_channel(commodity_id=delta["c"])].append(delta)
+    
+    for channel, items in batches.items():
+        await target.publish(channel, _encode_event(items))
+    return len(batches)
+
+
+def filter_event(
+    message: str,
+    state_id: Optional[int] = None,
+    market_id: Optional[int] = None,
+    commodity_id: Optional[int] = None
+) -> Optional[str]:
+    """
+    Narrow an event from `price_channel` to the subscriber's other filters.
+    
+    Returns the message unchanged when the channel already matches every
+    filter, a re-encoded event with the matching items, or None if nothing
+    is left to send.
+    """
+    channel_filters = sum(1 for value in (state_id, market_id, commodity_id) if value)
+    if channel_filters <= 1:
+        return message
+    
+    event = json.loads(message)
+    items = [
+        item for item in event.get("items", [])
+        if (not state_id or item["s"] == state_id)
+        and (not market_id or item["m"] == market_id)
+        and (not commodity_id or item["c"] == commodity_id)
+    ]
+    if not items:
+        return None
+    return _encode_event(items)
@@ -0,0 +1,177 @@
+"""
+BazaarSetu Backend - Snapshot Bundles
+Builds a self-contained, read-only SQLite copy of the catalogs, recent prices and rollups for offline kiosks.
+"""
+
+import logging
+import os
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+from sqlalchemy import Table, select, insert, func, text, and_
+from sqlalchemy.ext.asyncio import AsyncConnection, create_async_engine
+
+from app.core.config import get_settings
+from app.core.database import Base, read_session
+from app.core.migrations import head_revision
+from app.models import State, Market, Commodity, PriceSource, Vendor, Price, PriceRollup, SyncTombstone
+from app.services.archive_service import archive_cutoff
+from app.services.sync_service import sync_horizon
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+# Copied whole; users, alerts and their events are never shipped to a kiosk
+# (their tables exist in the bundle, empty)
+CATALOG_TABLES = [State, Commodity, Market, PriceSource, Vendor]
+
+BUNDLE_BATCH_SIZE = 5000
+
+
+async def build_bundle(
+    path: str,
+    today: Optional[date] = None,
+    rollup_days: Optional[int] = None
+) -> Dict[str, int]:
+    """
+    Write a snapshot bundle of the main database to `path`.
+    
+    The bundle holds the catalogs, the raw prices that have not been
+    archived yet (from `archive_cutoff`) and daily rollups for the
+    `rollup_days` before that, so every read endpoint can be served from
+    it with `DATABASE_BUNDLE_PATH`; only per-market trends older than the
+    cutoff (which need the Parquet archive) come back empty. The file is
+    built next to `path` and swapped in atomically. Returns rows per table.
+    """
+    today = today or date.today()
+    raw_from = archive_cutoff(today)
+    rollup_from = raw_from - timedelta(days=rollup_days or settings.bundle_rollup_days)
+    
+    target = Path(path)
+    target.parent.mkdir(parents=True, exist_ok=True)
+    partial = target.with_name(target.name + ".tmp")
+    if partial.exists():
+        partial.unlink()
+    
+    # Taken first: rows copied below are all covered by it (some may be newer)
+    async with read_session() as db:
+        horizon = await sync_horizon(db)
+    
+    counts: Dict[str, int] = {}
+    bundle = create_async_engine(f"sqlite+aiosqlite:///{partial}")
+    try:
+        async with bundle.begin() as out:
+            await out.execute(text("PRAGMA journal_mode = OFF"))
+            await out.run_sync(Base.metadata.create_all)
+            # PriceSource's fixed rows were inserted on create; the copy below includes them
+            await out.execute(PriceSource.__table__.delete())
+            
+            for model in CATALOG_TABLES:
+                counts[model.__tablename__] = await _copy(out, model.__table__, select(model.__table__))
+            counts["prices"] = await _copy(
+                out,
+                Price.__table__,
+                select(Price.__table__)
+                .where(Price.price_date >= raw_from)
+                .order_by(Price.price_date, Price.commodity_id, Price.market_id)
+            )
+            counts["price_rollups"] = await _copy_rollups(out, rollup_from, raw_from)
+            counts["sync_tombstones"] = await _copy(
+                out,
+                SyncTombstone.__table__,
+                select(SyncTombstone.__table__).where(SyncTombstone.owner_id.is_(None))
+            )
+            # /sync on the kiosk hands out tokens that the main API accepts as well
+            await out.execute(text("CREATE TABLE sync_counter (value BIGINT NOT NULL)"))
+            await out.execute(text("INSERT INTO sync_counter VALUES (:value)"), {"value": horizon - 1})
+            
+            # Stamped, so the kiosk's startup schema check passes
+            await out.execute(text("CREATE TABLE alembic_version (version_num VARCHAR(32) NOT NULL PRIMARY KEY)"))
+            await out.execute(text("INSERT INTO alembic_version VALUES (:revision)"), {"revision": head_revision()})
+            await out.execute(text("CREATE TABLE bundle_info (name TEXT PRIMARY KEY, value TEXT NOT NULL)"))
+            await out.execute(text("INSERT INTO bundle_info VALUES (:name, :value)"), [
+                {"name": "built_at", "value": datetime.now().isoformat(timespec="seconds")},
+                {"name": "prices_from", "value": raw_from.isoformat()},
+                {"name": "rollups_from", "value": rollup_from.isoformat()},
+            ])
+            await out.execute(text("ANALYZE"))
+        
+        # Packs the pages left behind by the copy, outside any transaction
+        async with bundle.connect() as out:
+            autocommit = await out.execution_options(isolation_level="AUTOCOMMIT")
+            await autocommit.execute(text("VACUUM"))
+    finally:
+        await bundle.dispose()
+    
+    os.replace(partial, target)
+    logger.info(f"Built snapshot bundle {target} ({target.stat().st_size / 1024:.0f} KiB): {counts}")
+    return counts
+
+
+async def _copy(out: AsyncConnection, table: Table, query) -> int:
+    """Stream `query` from the main database into the bundle in batches."""
+    copied = 0
+    async with read_session() as db:
+        result = await db.stream(query.execution_options(yield_per=BUNDLE_BATCH_SIZE))
+        async for rows in result.partitions(BUNDLE_BATCH_SIZE):
+            await out.execute(insert(table), [dict(row._mapping) for row in rows])
+            copied += len(rows)
+    return copied
+
+
+async def _copy_rollups(out: AsyncConnection, start: date, end: date) -> int:
+    """
+    Daily per-commodity rollups for `start`..`end` (exclusive).
+    
+    Archived days come from `price_rollups`; days still held as raw prices
+    (the archive job has not caught up, or rows were backfilled) are
+    aggregated here and merged in.
+    """
+    daily: Dict[Tuple[date, int], list] = {}
+    
+    def merge(price_date, commodity_id, total, count, low, high):
+        current = daily.get((price_date, commodity_id))
+        if current is None:
+            daily[(price_date, commodity_id)] = [total, count, low, high]
+        else:
+            current[0] += total
+            current[1] += count
+            current[2] = min(current[2], low)
+            current[3] = max(current[3], high)
+    
+    async with read_session() as db:
+        rollups = await db.execute(
+            select(PriceRollup).where(and_(PriceRollup.price_date >= start, PriceRollup.price_date < end))
+        )
+        for r in rollups.scalars():
+            merge(r.price_date, r.commodity_id, r.modal_total, r.row_count, r.modal_low, r.modal_high)
+        
+        raw = await db.execute(
+            select(
+                Price.price_date,
+                Price.commodity_id,
+                func.sum(Price.modal_price),
+                func.count(Price.id),
+                func.min(Price.modal_price),
+                func.max(Price.modal_price)
+            )
+            .where(and_(Price.price_date >= start, Price.price_date < end))
+            .group_by(Price.price_date, Price.commodity_id)
+        )
+        for row in raw:
+            merge(*row)
+    
+    if daily:
+        await out.execute(insert(PriceRollup.__table__), [
+            {
+                "price_date": price_date,
+                "commodity_id": commodity_id,
+                "modal_total": total,
+                "row_count": count,
+                "modal_low": low,
+                "modal_high": high,
+            }
+            for (price_date, commodity_id), (total, count, low, high) in sorted(daily.items())
+        ])
+    return len(daily)
@@ -0,0 +1,286 @@
+"""
+BazaarSetu Backend - Price Export Service
+Streams price history (archived months, then live rows) as CSV, NDJSON or Parquet.
+"""
+
+import asyncio
+import csv
+import io
+from collections import namedtuple
+from datetime import date, timedelta
+from typing import AsyncIterator, List, Optional
+
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+from sqlalchemy import select, and_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.database import read_session
+from app.core.responses import dump_json
+from app.models import Price, Commodity, Market, State
+from app.services.archive_service import archive_cutoff, price_archive
+
+
+EXPORT_MEDIA_TYPES = {
+    "csv": "text/csv; charset=utf-8",
+    "ndjson": "application/x-ndjson",
+    "parquet": "application/vnd.apache.parquet",
+}
+
+EXPORT_COLUMNS = [
+    "price_date",
+    "state",
+    "district",
+    "market_id",
+    "market",
+    "commodity_id",
+    "commodity",
+    "min_price",
+    "max_price",
+    "modal_price",
+]
+
+# Columns read from archived months, in the order `_archived_rows` unpacks them
+ARCHIVE_EXPORT_COLUMNS = ["price_date", "market_id", "commodity_id", "min_price", "max_price", "modal_price"]
+
+DEFAULT_EXPORT_DAYS = 30
+EXPORT_BATCH_SIZE = 5000
+
+# The prices table query plus the archived months (and filters) read ahead of it
+ExportQuery = namedtuple(
+    "ExportQuery", ["live", "archived", "date_from", "date_to", "state_id", "market_id", "commodity_id"]
+)
+
+
+def build_export_query(
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    state_id: Optional[int] = None,
+    market_id: Optional[int] = None,
+    commodity_id: Optional[int] = None
+) -> ExportQuery:
+    """
+    Flat, denormalized row query for exports (no ORM objects are built),
+    plus the archived months the range reaches into.
+    """
+    
+    date_to = date_to or date.today()
+    date_from = date_from or date_to - timedelta(days=DEFAULT_EXPORT_DAYS)
+    
+    archived_before = archive_cutoff()
+    archived = []
+    if date_from < archived_before:
+        archived = price_archive.months(date_from, min(date_to, archived_before - timedelta(days=1)))
+    
+    query = (
+        select(
+            Price.price_date,
+            State.name.label("state"),
+            Market.district,
+            Price.market_id,
+            Market.name.label("market"),
+            Price.commodity_id,
+            Commodity.name.label("commodity"),
+            Price.min_price,
+            Price.max_price,
+            Price.modal_price
+        )
+        .join(Market, Price.market_id == Market.id)
+        .join(State, Market.state_id == State.id)
+        .join(Commodity, Price.commodity_id == Commodity.id)
+        .where(
+            and_(
+                Price.price_date >= date_from,
+                Price.price_date <= date_to
+            )
+        )
+        .order_by(Price.price_date, Price.id)
+    )
+    
+    if state_id:
+        query = query.where(Market.state_id == state_id)
+    if market_id:
+        query = query.where(Price.market_id == market_id)
+    if commodity_id:
+        query = query.where(Price.commodity_id == commodity_id)
+    
+    return ExportQuery(query, archived, date_from, date_to, state_id, market_id, commodity_id)
+
+
+async def stream_export(
+    export: ExportQuery,
+    fmt: str = "csv",
+    batch_size: int = EXPORT_BATCH_SIZE
+) -> AsyncIterator[bytes]:
+    """
+    Yield encoded chunks of the export, one per fetched batch.
+    
+    Archived months are read from their Parquet files first, one month at
+    a time, then live rows come from a server-side cursor (`yield_per`),
+    so memory stays bounded by `batch_size` (or one archived month) no
+    matter how large the date range is. The generator opens its own
+    session because it outlives the request handler that creates it.
+    """
+    
+    if fmt not in EXPORT_MEDIA_TYPES:
+        raise ValueError(f"Unsupported export format '{fmt}'")
+    
+    encoder = {
+        "csv": _CSVEncoder,
+        "ndjson": _NDJSONEncoder,
+        "parquet": _ParquetEncoder,
+    }[fmt]()
+    
+    async with read_session() as session:
+        for month in export.archived:
+            async for rows in _archived_rows(session, export, month, batch_size):
+                chunk = encoder.encode(rows)
+                if chunk:
+                    yield chunk
+        
+        result = await session.stream(export.live.execution_options(yield_per=batch_size))
+        async for rows in result.partitions(batch_size):
+            chunk = encoder.encode(rows)
+            if chunk:
+                yield chunk
+    
+    tail = encoder.finish()
+    if tail:
+        yield tail
+
+
+async def _archived_rows(
+    session: AsyncSession,
+    export: ExportQuery,
+    month: date,
+    batch_size: int
+) -> AsyncIterator[List[tuple]]:
+    """
+    One archived month's rows in export order, in batches shaped like the live query's rows.
+    
+    Names come from the current markets, states and commodities; like the
+    live query's inner joins, rows whose market or commodity is gone are left out.
+    """
+    table = await asyncio.to_thread(
+        price_archive.read_rows,
+        month,
+        export.date_from,
+        export.date_to,
+        commodity_id=export.commodity_id,
+        market_id=export.market_id
+    )
+    if not table.num_rows:
+        return
+    
+    market_ids = pc.unique(table["market_id"]).to_pylist()
+    commodity_ids = pc.unique(table["commodity_id"]).to_pylist()
+    market_query = (
+        select(Market.id, State.name, Market.district, Market.name)
+        .join(State, Market.state_id == State.id)
+        .where(Market.id.in_(market_ids))
+    )
+    if export.state_id:
+        market_query = market_query.where(Market.state_id == export.state_id)
+    markets = {row[0]: row[1:] for row in (await session.execute(market_query)).all()}
+    commodities = dict((await session.execute(
+        select(Commodity.id, Commodity.name).where(Commodity.id.in_(commodity_ids))
+    )).all())
+    
+    for batch in table.to_batches(max_chunksize=batch_size):
+        rows = []
+        for price_date, market_id, commodity_id, min_price, max_price, modal_price in zip(
+            *(batch.column(name).to_pylist() for name in ARCHIVE_EXPORT_COLUMNS)
+        ):
+            if market_id in markets and commodity_id in commodities:
+                state, district, market = markets[market_id]
+                rows.append((
+                    price_date, state, district, market_id, market,
+                    commodity_id, commodities[commodity_id], min_price, max_price, modal_price
+                ))
+        if rows:
+            yield rows
+
+
+class _CSVEncoder:
+    def __init__(self):
+        self.header_sent = False
+    
+    def encode(self, rows: List) -> bytes:
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        if not self.header_sent:
+            writer.writerow(EXPORT_COLUMNS)
+            self.header_sent = True
+        writer.writerows(rows)
+        return buffer.getvalue().encode("utf-8")
+    
+    def finish(self) -> bytes:
+        # An empty export still gets its header row
+        return b"" if self.header_sent else self.encode([])
+
+
+class _NDJSONEncoder:
+    def encode(self, rows: List) -> bytes:
+        return b"".join(dump_json(dict(zip(EXPORT_COLUMNS, row))) + b"\n" for row in rows)
+    
+    def finish(self) -> bytes:
+        return b""
+
+
+class _ChunkSink(io.RawIOBase):
+    """Write-only file object that hands written bytes back in chunks."""
+    
+    def __init__(self):
+        self._chunks: List[bytes] = []
+        self._position = 0
+    
+    def writable(self) -> bool:
+        return True
+    
+    def write(self, data) -> int:
+        data = bytes(data)
+        self._chunks.append(data)
+        self._position += len(data)
+        return len(data)
+    
+    def tell(self) -> int:
+        return self._position
+    
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+class _ParquetEncoder:
+    """Writes each batch as one zstd-compressed Parquet row group."""
+    
+    def __init__(self):
+        self.schema = pa.schema([
+            ("price_date", pa.date32()),
+            ("state", pa.string()),
+            ("district", pa.string()),
+            ("market_id", pa.int32()),
+            ("market", pa.string()),
+            ("commodity_id", pa.int32()),
+            ("commodity", pa.string()),
+            ("min_price", pa.float64()),
+            ("max_price", pa.float64()),
+            ("modal_price", pa.float64()),
+        ])
+        self.sink = _ChunkSink()
+        self.writer = pq.ParquetWriter(self.sink, self.schema, compression="zstd")
+    
+    def encode(self, rows: List) -> bytes:
+        columns = list(zip(*rows)) if rows else [[] for _ in EXPORT_COLUMNS]
+        table = pa.Table.from_arrays(
+            [pa.array(values, type=field.type) for values, field in zip(columns, self.schema)],
+            schema=self.schema
+        )
+        self.writer.write_table(table)
+        return self.sink.drain()
+    
+    def finish(self) -> bytes:
+        self.writer.close()
+        return self.sink.drain()
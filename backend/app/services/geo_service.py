@@ -0,0 +1,178 @@
+"""
+BazaarSetu Backend - Nearby Markets & Vendors
+Keeps grid indexes of market and vendor locations and answers nearby queries.
+"""
+
+import asyncio
+import logging
+import time
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+
+from app.core.config import get_settings
+from app.core.database import AsyncSessionLocal
+from app.core.geo import GeoIndex
+from app.models import Market, Vendor
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+# Published (via the broadcast broker) when vendor or market locations change
+GEO_CHANNEL = "geo:changed"
+
+
+class LocationIndexes:
+    """
+    Lazily built `GeoIndex` per location table, dropped on change.
+    
+    An index is rebuilt from (id, latitude, longitude) only, on the first
+    query after `invalidate` or once it is `cache_fallback_ttl_seconds`
+    old (a writer that did not publish on `GEO_CHANNEL` is picked up
+    then); concurrent queries wait for the same build.
+    """
+    
+    def __init__(self):
+        self._indexes: Dict[str, Tuple[GeoIndex, float]] = {}
+        self._locks: Dict[str, asyncio.Lock] = {}
+    
+    def invalidate(self, name: Optional[str] = None) -> None:
+        """Drop one index ("markets" / "vendors") or all of them."""
+        if name is None:
+            self._indexes = {}
+        else:
+            self._indexes.pop(name, None)
+    
+    def _fresh(self, name: str) -> Optional[GeoIndex]:
+        index, built_at = self._indexes.get(name, (None, 0.0))
+        if index is not None and time.monotonic() - built_at < settings.cache_fallback_ttl_seconds:
+            return index
+        return None
+    
+    async def get(self, name: str) -> GeoIndex:
+        index = self._fresh(name)
+        if index is not None:
+            return index
+        
+        lock = self._locks.setdefault(name, asyncio.Lock())
+        async with lock:
+            index = self._fresh(name)
+            if index is None:
+                index = await self._build(name)
+                self._indexes[name] = (index, time.monotonic())
+        return index
+    
+    async def _build(self, name: str) -> GeoIndex:
+        if name == "markets":
+            query = select(Market.id, Market.latitude, Market.longitude).where(
+                Market.is_active == True,
+                Market.latitude.is_not(None),
+                Market.longitude.is_not(None)
+            )
+        else:
+            query = select(Vendor.id, Vendor.latitude, Vendor.longitude)
+        
+        # Built from the primary: the change that invalidated the index may
+        # not have reached a read replica yet
+        async with AsyncSessionLocal() as primary:
+            rows = (await primary.execute(query)).all()
+        index = GeoIndex(
+            [row[0] for row in rows],
+            [row[1] for row in rows],
+            [row[2] for row in rows],
+            cell_degrees=settings.geo_index_cell_degrees
+        )
+        logger.info(f"Built {name} location index with {len(index)} points")
+        return index
+
+
+location_indexes = LocationIndexes()
+
+
+# Nearest hits fetched per requested vendor when filters may drop some (grows until the limit is met)
+FILTER_OVERFETCH = 4
+
+
+def _search(index: GeoIndex, lat: float, lon: float, radius_km: Optional[float], limit: int) -> List[Tuple[int, float]]:
+    if radius_km is not None:
+        return index.within(lat, lon, radius_km, limit)
+    return index.nearest(lat, lon, limit)
+
+
+async def _load(db: AsyncSession, model, ids: List[int], *options) -> Dict[int, object]:
+    """
+    Rows of `model` by id, from `db` and then the primary for any missing.
+    
+    Indexes are built from the primary, so a row just written may not have
+    reached the read replica behind `db` yet.
+    """
+    if not ids:
+        return {}
+    query = select(model).options(*options).where(model.id.in_(ids))
+    rows = {row.id: row for row in (await db.execute(query)).scalars().all()}
+    missing = [row_id for row_id in ids if row_id not in rows]
+    if missing:
+        async with AsyncSessionLocal() as primary:
+            query = select(model).options(*options).where(model.id.in_(missing))
+            rows.update((row.id, row) for row in (await primary.execute(query)).scalars().all())
+    return rows
+
+
+async def find_nearby_markets(
+    db: AsyncSession,
+    lat: float,
+    lon: float,
+    radius_km: Optional[float] = None,
+    limit: int = 20
+) -> List[Tuple[Market, float]]:
+    """
+    Active markets nearest to a point, as (market, distance_km) pairs.
+    
+    With `radius_km`, only markets within that distance are returned;
+    otherwise the `limit` nearest markets are.
+    """
+    index = await location_indexes.get("markets")
+    hits = _search(index, lat, lon, radius_km, limit)
+    markets = await _load(db, Market, [market_id for market_id, _ in hits], selectinload(Market.state))
+    return [(markets[market_id], distance) for market_id, distance in hits if market_id in markets]
+
+
+async def find_nearby_vendors(
+    db: AsyncSession,
+    lat: float,
+    lon: float,
+    radius_km: Optional[float] = None,
+    limit: int = 20,
+    market_id: Optional[int] = None,
+    verified_only: bool = False
+) -> List[Tuple[Vendor, float]]:
+    """
+    Vendors nearest to a point, as (vendor, distance_km) pairs.
+    
+    The index only holds locations, so with a market or verification
+    filter more nearest hits are fetched (`FILTER_OVERFETCH` per vendor,
+    growing) until `limit` vendors match or the index has no more.
+    """
+    index = await location_indexes.get("vendors")
+    filtered = bool(market_id) or verified_only
+    fetch = limit * FILTER_OVERFETCH if filtered else limit
+    vendors: Dict[int, Vendor] = {}
+    loaded = set()
+    while True:
+        hits = _search(index, lat, lon, radius_km, fetch)
+        new_ids = [vendor_id for vendor_id, _ in hits if vendor_id not in loaded]
+        vendors.update(await _load(db, Vendor, new_ids))
+        loaded.update(new_ids)
+        
+        matches = [
+            (vendors[vendor_id], distance)
+            for vendor_id, distance in hits
+            if vendor_id in vendors
+            and (not market_id or vendors[vendor_id].market_id == market_id)
+            and (not verified_only or vendors[vendor_id].is_verified)
+        ]
+        if len(matches) >= limit or len(hits) < fetch:
+            return matches[:limit]
+        fetch *= FILTER_OVERFETCH
@@ -3,16 +3,26 @@ BazaarSetu Backend - Price Service
 Business logic for price queries, trends, and comparisons
 """
 
+import asyncio
+from collections import namedtuple
 from datetime import date, datetime, timedelta
-from typing import List, Optional, Dict
-from sqlalchemy import select, func, and_, desc
+from typing import List, Optional, Dict, Tuple
+from sqlalchemy import select, func, and_, case, desc, type_coerce, Float
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 import logging
+import numpy as np
 
-from app.models import Price, Commodity, Market, State
+from app.core.cache import TTLCache
+from app.core.config import get_settings
+from app.core.fieldsets import default_fields, localized_name
+from app.core.geo import haversine_km
+from app.core.pagination import NUMBER, apply_keyset, decode_cursor, split_page
+from app.models import Price, PriceRollup, Commodity, Market, State
 from app.schemas import PriceWithDetails, PriceTrend, PriceTrendPoint, MarketComparison
+from app.services.archive_service import archive_cutoff, price_archive
 
+settings = get_settings()
 logger = logging.getLogger(__name__)
 
 
@@ -37,217 +47,437 @@ class PriceService:
     ) -> List[PriceWithDetails]:
         """Get today's prices with optional filters and sorting."""
         
+        prices, _ = await self.get_today_prices_page(
+            state_id=state_id,
+            commodity_id=commodity_id,
+            market_id=market_id,
+            category=category,
+            sort_by=sort_by,
+            sort_order=sort_order,
+            date_from=date_from,
+            date_to=date_to,
+            page=page,
+            page_size=page_size
+        )
+        return prices
+    
+    async def get_today_prices_page(
+        self,
+        state_id: Optional[int] = None,
+        commodity_id: Optional[int] = None,
+        market_id: Optional[int] = None,
+        category: Optional[str] = None,
+        sort_by: Optional[str] = "name",
+        sort_order: Optional[str] = "asc",
+        date_from: Optional[date] = None,
+        date_to: Optional[date] = None,
+        page: int = 1,
+        page_size: int = 100,
+        cursor: Optional[str] = None,
+        fields: Optional[List[str]] = None,
+        lang: Optional[str] = None
+    ) -> Tuple[List, Optional[str]]:
+        """
+        Get one page of today's prices plus the cursor for the next page.
+        
+        Filtering, the day-over-day change and sorting all run in SQL, and
+        pages are cut with a keyset on (sort key, price id). With a `cursor`
+        every page costs the same however deep it is, and rows inserted by
+        a concurrent ingestion cannot shift results between pages. Without
+        one, `page` falls back to OFFSET for older clients.
+        
+        With `fields` and/or `lang`, only the requested columns are selected
+        (and only the tables they need are joined), names come back in the
+        requested language, and rows are returned as plain dicts instead of
+        `PriceWithDetails`.
+        
+        Raises ValueError for an invalid cursor.
+        """
+        
         # Determine date range
         if date_from and date_to:
             target_date = date_to  # Use most recent date
         else:
             target_date = date.today()
         
-        query = (
-            select(Price)
-            .options(
-                selectinload(Price.commodity),
-                selectinload(Price.market).selectinload(Market.state)
+        # Yesterday's modal price per (commodity, market) for the change %
+        yesterday = (
+            select(
+                Price.commodity_id,
+                Price.market_id,
+                func.avg(Price.modal_price, type_=Price.modal_price.type).label("modal_price")
             )
-            .where(Price.price_date == target_date)
+            .where(Price.price_date == target_date - timedelta(days=1))
+            .group_by(Price.commodity_id, Price.market_id)
+            .subquery("yesterday")
+        )
+        price_change = case(
+            (
+                yesterday.c.modal_price > 0,
+                # A ratio of paise amounts: coerce so it is read as a plain float
+                type_coerce((Price.modal_price - yesterday.c.modal_price) * 100.0 / yesterday.c.modal_price, Float)
+            ),
+            else_=None
         )
         
+        available = _price_field_columns(lang, price_change)
+        projected = fields is not None or lang is not None
+        selected = fields or default_fields(PriceWithDetails.model_fields, lang)
+        
+        sort_keys = {
+            "name": (func.lower(available["commodity_name"][0]), {"commodity"}),
+            "price": (Price.modal_price, set()),
+            # Biggest drops first when ascending; missing changes count as 0
+            "change": (func.coalesce(price_change, 0), {"yesterday"}),
+        }
+        sort_by = sort_by if sort_by in sort_keys else "name"
+        descending = sort_order == "desc"
+        sort_key, sort_tables = sort_keys[sort_by]
+        sort_name = f"prices:{sort_by}:{'desc' if descending else 'asc'}:{lang or 'en'}"
+        
+        # Join only the tables the selected fields, filters and sort need
+        tables = set(sort_tables)
+        for field in selected:
+            tables |= available[field][1]
+        if state_id:
+            tables.add("market")
+        if category:
+            tables.add("commodity")
+        
+        query = select(
+            *(available[field][0].label(field) for field in selected),
+            Price.id.label("_id"),
+            sort_key.label("_sort_key")
+        ).select_from(Price)
+        if "commodity" in tables:
+            query = query.join(Commodity, Price.commodity_id == Commodity.id)
+        if "market" in tables or "state" in tables:
+            query = query.join(Market, Price.market_id == Market.id)
+        if "state" in tables:
+            query = query.join(State, Market.state_id == State.id)
+        if "yesterday" in tables:
+            query = query.outerjoin(
+                yesterday,
+                and_(
+                    yesterday.c.commodity_id == Price.commodity_id,
+                    yesterday.c.market_id == Price.market_id
+                )
+            )
+        query = query.where(Price.price_date == target_date)
+        
         # Apply filters
         if commodity_id:
             query = query.where(Price.commodity_id == commodity_id)
         if market_id:
             query = query.where(Price.market_id == market_id)
         if state_id:
-            query = query.join(Market).where(Market.state_id == state_id)
+            query = query.where(Market.state_id == state_id)
         if category:
-            query = query.join(Commodity).where(Commodity.category == category)
+            query = query.where(Commodity.category == category)
+        
+        after = decode_cursor(cursor, sort_name, (str if sort_by == "name" else NUMBER, int)) if cursor else None
+        query = apply_keyset(query, [sort_key, Price.id], after, descending, page_size)
+        if after is None and page > 1:
+            query = query.offset((page - 1) * page_size)
         
         result = await self.db.execute(query)
-        prices = result.scalars().all()
-        
-        # Get yesterday's prices for price change calculation
-        yesterday = target_date - timedelta(days=1)
-        yesterday_prices = await self._get_prices_by_date(yesterday)
-        yesterday_map = {
-            (p.commodity_id, p.market_id): p.modal_price 
-            for p in yesterday_prices
-        }
+        rows, next_cursor = split_page(
+            result.all(), page_size, sort_name, key=lambda row: (row._sort_key, row._id)
+        )
         
         # Convert to response schema
         response = []
-        for price in prices:
-            yesterday_price = yesterday_map.get((price.commodity_id, price.market_id))
-            price_change = None
-            if yesterday_price and yesterday_price > 0:
-                price_change = ((price.modal_price - yesterday_price) / yesterday_price) * 100
-            
-            response.append(PriceWithDetails(
-                commodity_id=price.commodity_id,
-                commodity_name=price.commodity.name,
-                commodity_name_telugu=price.commodity.name_telugu,
-                commodity_name_hindi=price.commodity.name_hindi,
-                commodity_image=price.commodity.image_url,
-                category=price.commodity.category,
-                market_name=price.market.name,
-                district=price.market.district,
-                state_name=price.market.state.name,
-                min_price=price.min_price,
-                max_price=price.max_price,
-                modal_price=price.modal_price,
-                price_date=price.price_date,
-                unit=price.commodity.unit,
-                price_change_percent=round(price_change, 2) if price_change else None
-            ))
+        for row in rows:
+            item = {field: getattr(row, field) for field in selected}
+            if "price_change_percent" in item:
+                change = item["price_change_percent"]
+                item["price_change_percent"] = round(change, 2) if change else None
+            response.append(item if projected else PriceWithDetails(**item))
         
-        # Apply sorting
-        if sort_by == "name":
-            response.sort(key=lambda x: x.commodity_name.lower(), reverse=(sort_order == "desc"))
-        elif sort_by == "price":
-            response.sort(key=lambda x: x.modal_price, reverse=(sort_order == "desc"))
-        elif sort_by == "change":
-            # Sort by price change, putting biggest drops first
-            response.sort(key=lambda x: x.price_change_percent or 0, reverse=(sort_order == "desc"))
-        
-        # Pagination
-        offset = (page - 1) * page_size
-        return response[offset:offset + page_size]
-    
-    async def _get_prices_by_date(self, target_date: date) -> List[Price]:
-        """Get all prices for a specific date."""
-        query = select(Price).where(Price.price_date == target_date)
-        result = await self.db.execute(query)
-        return result.scalars().all()
+        return response, next_cursor
     
     async def get_price_trend(
         self,
         commodity_id: int,
         market_id: Optional[int] = None,
-        days: int = 30
+        days: int = 30,
+        lang: Optional[str] = None
     ) -> PriceTrend:
         """Get price trend for a commodity over specified days."""
         
+        trends = await self.get_price_trends(
+            [commodity_id],
+            market_ids=[market_id] if market_id else None,
+            days=days,
+            lang=lang
+        )
+        if not trends:
+            raise ValueError(f"No prices found for commodity {commodity_id}")
+        return trends[0]
+    
+    async def get_price_trends(
+        self,
+        commodity_ids: List[int],
+        market_ids: Optional[List[int]] = None,
+        days: int = 30,
+        lang: Optional[str] = None
+    ) -> List[PriceTrend]:
+        """
+        Get trends for several commodities (optionally per market) at once.
+        
+        Each (commodity, market) pair is one series; without `market_ids`
+        a series averages across all markets. Duplicate IDs are coalesced,
+        cached series are reused, and all missing series come from a single
+        grouped query. Series without data are left out. Commodity and
+        market names are returned in `lang` when given.
+        """
+        
         end_date = date.today()
         start_date = end_date - timedelta(days=days)
         
+        # Coalesce duplicates, keeping request order
+        commodity_ids = list(dict.fromkeys(commodity_ids))
+        per_market = bool(market_ids)
+        series_keys = [
+            (c, m)
+            for c in commodity_ids
+            for m in (list(dict.fromkeys(market_ids)) if per_market else [None])
+        ]
+        
+        trends: Dict[Tuple[int, Optional[int]], Optional[PriceTrend]] = {}
+        missing = []
+        for key in series_keys:
+            cached = trend_cache.get((key, days, end_date, lang), MISSING)
+            if cached is MISSING:
+                missing.append(key)
+            else:
+                trends[key] = cached
+        
+        if missing:
+            fetched = await self._fetch_trends(
+                commodity_ids={c for c, _ in missing},
+                market_ids={m for _, m in missing} if per_market else None,
+                start_date=start_date,
+                end_date=end_date,
+                lang=lang
+            )
+            for key in missing:
+                # Cache empty series too, so repeated misses stay cheap
+                trends[key] = fetched.get(key)
+                trend_cache.set((key, days, end_date, lang), trends[key])
+        
+        return [trends[key] for key in series_keys if trends[key] is not None]
+    
+    async def _fetch_trends(
+        self,
+        commodity_ids: set,
+        market_ids: Optional[set],
+        start_date: date,
+        end_date: date,
+        lang: Optional[str] = None
+    ) -> Dict[Tuple[int, Optional[int]], PriceTrend]:
+        """Aggregate daily modal prices for many series in one grouped query."""
+        
+        group_columns = [Price.commodity_id, localized_name(Commodity, lang).label("commodity_name")]
+        if market_ids:
+            group_columns += [Price.market_id, localized_name(Market, lang).label("market_name")]
+        
         query = (
-            select(Price)
-            .options(selectinload(Price.commodity), selectinload(Price.market))
+            select(
+                *group_columns,
+                Price.price_date,
+                func.sum(Price.modal_price).label("total"),
+                func.count().label("count"),
+                func.min(Price.modal_price).label("low"),
+                func.max(Price.modal_price).label("high")
+            )
+            .join(Commodity, Price.commodity_id == Commodity.id)
             .where(
                 and_(
-                    Price.commodity_id == commodity_id,
+                    Price.commodity_id.in_(commodity_ids),
                     Price.price_date >= start_date,
                     Price.price_date <= end_date
                 )
             )
+            .group_by(*group_columns, Price.price_date)
             .order_by(Price.price_date)
         )
         
-        if market_id:
-            query = query.where(Price.market_id == market_id)
+        if market_ids:
+            query = query.join(Market, Price.market_id == Market.id).where(Price.market_id.in_(market_ids))
         
         result = await self.db.execute(query)
-        prices = result.scalars().all()
         
-        if not prices:
-            raise ValueError(f"No prices found for commodity {commodity_id}")
+        series: Dict[Tuple[int, Optional[int]], list] = {}
+        for row in result.all():
+            key = (row.commodity_id, row.market_id if market_ids else None)
+            series.setdefault(key, []).append(row)
         
-        # Aggregate by date (average across markets if no market specified)
-        date_prices: Dict[date, List[float]] = {}
-        for price in prices:
-            if price.price_date not in date_prices:
-                date_prices[price.price_date] = []
-            date_prices[price.price_date].append(price.modal_price)
+        # Older days may have been moved to the archive: merge them in by date
+        archived_before = archive_cutoff()
+        if start_date < archived_before:
+            archived = await self._fetch_archived_trends(
+                commodity_ids,
+                market_ids,
+                start_date,
+                min(end_date, archived_before - timedelta(days=1)),
+                lang
+            )
+            for key, rows in archived.items():
+                series[key] = _merge_days(rows + series.get(key, []))
         
-        trend_data = [
-            PriceTrendPoint(date=d, modal_price=sum(p)/len(p))
-            for d, p in sorted(date_prices.items())
-        ]
+        return {
+            key: _build_trend(key, rows, market_name=rows[0].market_name if market_ids else None)
+            for key, rows in series.items()
+        }
+    
+    async def _fetch_archived_trends(
+        self,
+        commodity_ids: set,
+        market_ids: Optional[set],
+        start_date: date,
+        end_date: date,
+        lang: Optional[str] = None
+    ) -> Dict[Tuple[int, Optional[int]], list]:
+        """
+        Daily aggregates for archived days, keyed like `_fetch_trends` series.
         
-        all_prices = [p.modal_price for p in prices]
-        avg_price = sum(all_prices) / len(all_prices)
-        
-        # Calculate price changes
-        price_7d = None
-        price_30d = None
-        
-        if len(trend_data) >= 2:
-            latest = trend_data[-1].modal_price
-            
-            # 7 day change
-            if len(trend_data) >= 7:
-                price_7_ago = trend_data[-7].modal_price
-                if price_7_ago > 0:
-                    price_7d = ((latest - price_7_ago) / price_7_ago) * 100
-            
-            # 30 day change
-            if len(trend_data) >= 30:
-                price_30_ago = trend_data[0].modal_price
-                if price_30_ago > 0:
-                    price_30d = ((latest - price_30_ago) / price_30_ago) * 100
-        
-        commodity = prices[0].commodity
-        market = prices[0].market if market_id else None
-        
-        return PriceTrend(
-            commodity_id=commodity_id,
-            commodity_name=commodity.name,
-            market_id=market_id,
-            market_name=market.name if market else None,
-            trend_data=trend_data,
-            avg_price=round(avg_price, 2),
-            min_price=min(all_prices),
-            max_price=max(all_prices),
-            price_change_7d=round(price_7d, 2) if price_7d else None,
-            price_change_30d=round(price_30d, 2) if price_30d else None
-        )
+        All-market series come from the `price_rollups` table; per-market
+        series are read from the memory-mapped Parquet archive.
+        """
+        
+        commodity_names = dict((await self.db.execute(
+            select(Commodity.id, localized_name(Commodity, lang)).where(Commodity.id.in_(commodity_ids))
+        )).all())
+        
+        series: Dict[Tuple[int, Optional[int]], list] = {}
+        if not market_ids:
+            result = await self.db.execute(
+                select(PriceRollup)
+                .where(
+                    and_(
+                        PriceRollup.commodity_id.in_(commodity_ids),
+                        PriceRollup.price_date >= start_date,
+                        PriceRollup.price_date <= end_date
+                    )
+                )
+            )
+            for rollup in result.scalars():
+                series.setdefault((rollup.commodity_id, None), []).append(_TrendRow(
+                    commodity_id=rollup.commodity_id,
+                    commodity_name=commodity_names.get(rollup.commodity_id),
+                    market_id=None,
+                    market_name=None,
+                    price_date=rollup.price_date,
+                    total=rollup.modal_total,
+                    count=rollup.row_count,
+                    low=rollup.modal_low,
+                    high=rollup.modal_high
+                ))
+            return series
+        
+        days = await asyncio.to_thread(price_archive.read_daily, commodity_ids, market_ids, start_date, end_date)
+        if not days:
+            return series
+        market_names = dict((await self.db.execute(
+            select(Market.id, localized_name(Market, lang)).where(Market.id.in_(market_ids))
+        )).all())
+        for day in days:
+            series.setdefault((day.commodity_id, day.market_id), []).append(_TrendRow(
+                commodity_id=day.commodity_id,
+                commodity_name=commodity_names.get(day.commodity_id),
+                market_id=day.market_id,
+                market_name=market_names.get(day.market_id),
+                price_date=day.price_date,
+                total=day.total,
+                count=day.count,
+                low=day.low,
+                high=day.high
+            ))
+        return series
     
     async def compare_markets(
         self,
         commodity_id: int,
-        target_date: Optional[date] = None
+        target_date: Optional[date] = None,
+        fields: Optional[List[str]] = None,
+        lang: Optional[str] = None,
+        lat: Optional[float] = None,
+        lon: Optional[float] = None,
+        cost_per_km: float = 0.0,
+        quantity: float = 1.0,
+        limit: Optional[int] = None
     ) -> MarketComparison:
-        """Compare prices across different markets for a commodity."""
+        """
+        Compare prices across different markets for a commodity.
+        
+        `fields` limits the per-market columns that are selected and
+        returned; `lang` localizes commodity, market and state names.
+        
+        With a location (`lat`/`lon`), markets are ranked by effective cost,
+        `modal_price * quantity + cost_per_km * distance_km`, and each one
+        carries `distance_km` and `effective_cost`. Distances for all markets
+        are computed in one vectorized pass and only the best `limit` are
+        sorted. Markets without coordinates rank last.
+        """
         
         if not target_date:
             target_date = date.today()
         
+        available = _compare_field_columns(lang)
+        selected = fields or list(available)
+        tables = set().union(*(available[field][1] for field in selected))
+        
+        by_distance = lat is not None and lon is not None
+        extra_columns = [localized_name(Commodity, lang).label("_commodity_name")]
+        if by_distance:
+            tables.add("market")
+            extra_columns += [
+                Price.modal_price.label("_modal_price"),
+                Market.latitude.label("_latitude"),
+                Market.longitude.label("_longitude")
+            ]
+        
         query = (
-            select(Price)
-            .options(
-                selectinload(Price.commodity),
-                selectinload(Price.market).selectinload(Market.state)
+            select(
+                *(available[field][0].label(field) for field in selected),
+                *extra_columns
             )
+            .select_from(Price)
+            .join(Commodity, Price.commodity_id == Commodity.id)
             .where(
                 and_(
                     Price.commodity_id == commodity_id,
                     Price.price_date == target_date
                 )
             )
-            .order_by(Price.modal_price)
         )
+        if tables:
+            query = query.join(Market, Price.market_id == Market.id)
+        if "state" in tables:
+            query = query.join(State, Market.state_id == State.id)
+        if not by_distance:
+            query = query.order_by(Price.modal_price)
+            if limit:
+                query = query.limit(limit)
         
         result = await self.db.execute(query)
-        prices = result.scalars().all()
+        rows = result.all()
         
-        if not prices:
+        if not rows:
             raise ValueError(f"No prices found for commodity {commodity_id} on {target_date}")
         
-        markets = [
-            {
-                "market_id": p.market_id,
-                "market_name": p.market.name,
-                "district": p.market.district,
-                "state": p.market.state.name,
-                "min_price": p.min_price,
-                "max_price": p.max_price,
-                "modal_price": p.modal_price
-            }
-            for p in prices
-        ]
+        if by_distance:
+            markets = _rank_by_effective_cost(rows, selected, lat, lon, cost_per_km, quantity, limit)
+        else:
+            markets = [
+                {field: getattr(row, field) for field in selected}
+                for row in rows
+            ]
         
         return MarketComparison(
             commodity_id=commodity_id,
-            commodity_name=prices[0].commodity.name,
+            commodity_name=rows[0]._commodity_name,
             price_date=target_date,
             markets=markets
         )
@@ -271,3 +501,160 @@ class PriceService:
         
         result = await self.db.execute(search_query)
         return result.scalars().all()
+
+
+MISSING = object()
+
+# A daily aggregate from the archive tier, with the attributes of a trend query row
+_TrendRow = namedtuple(
+    "_TrendRow",
+    ["commodity_id", "commodity_name", "market_id", "market_name", "price_date", "total", "count", "low", "high"]
+)
+
+# Built trends per ((commodity_id, market_id), days, end_date, lang)
+trend_cache = TTLCache(ttl_seconds=settings.trend_cache_ttl_seconds, max_entries=4096)
+
+
+def _merge_days(rows: list) -> list:
+    """
+    Sort daily aggregates by date, combining rows of the same day.
+    
+    Prices backfilled for an already archived day have both an archived
+    row and a live one; archived `_TrendRow`s come first and absorb them.
+    """
+    by_day = {}
+    for row in sorted(rows, key=lambda row: row.price_date):
+        same = by_day.get(row.price_date)
+        by_day[row.price_date] = row if same is None else same._replace(
+            total=same.total + row.total,
+            count=same.count + row.count,
+            low=min(same.low, row.low),
+            high=max(same.high, row.high)
+        )
+    return list(by_day.values())
+
+
+def _build_trend(key: Tuple[int, Optional[int]], rows: list, market_name: Optional[str]) -> PriceTrend:
+    """Turn date-ordered daily aggregates into a PriceTrend."""
+    
+    commodity_id, market_id = key
+    
+    # Average across markets per date
+    trend_data = [
+        PriceTrendPoint(date=row.price_date, modal_price=row.total / row.count)
+        for row in rows
+    ]
+    
+    avg_price = sum(row.total for row in rows) / sum(row.count for row in rows)
+    
+    # Calculate price changes
+    price_7d = None
+    price_30d = None
+    
+    if len(trend_data) >= 2:
+        latest = trend_data[-1].modal_price
+        
+        # 7 day change
+        if len(trend_data) >= 7:
+            price_7_ago = trend_data[-7].modal_price
+            if price_7_ago > 0:
+                price_7d = ((latest - price_7_ago) / price_7_ago) * 100
+        
+        # 30 day change
+        if len(trend_data) >= 30:
+            price_30_ago = trend_data[0].modal_price
+            if price_30_ago > 0:
+                price_30d = ((latest - price_30_ago) / price_30_ago) * 100
+    
+    return PriceTrend(
+        commodity_id=commodity_id,
+        commodity_name=rows[0].commodity_name,
+        market_id=market_id,
+        market_name=market_name,
+        trend_data=trend_data,
+        avg_price=round(avg_price, 2),
+        min_price=min(row.low for row in rows),
+        max_price=max(row.high for row in rows),
+        price_change_7d=round(price_7d, 2) if price_7d else None,
+        price_change_30d=round(price_30d, 2) if price_30d else None
+    )
+
+
+def _rank_by_effective_cost(
+    rows: list,
+    selected: List[str],
+    lat: float,
+    lon: float,
+    cost_per_km: float,
+    quantity: float,
+    limit: Optional[int]
+) -> List[dict]:
+    """Order comparison rows by price plus travel cost, keeping the best `limit`."""
+    modal = np.array([row._modal_price for row in rows], dtype=np.float64)
+    lats = np.array([row._latitude if row._latitude is not None else np.nan for row in rows], dtype=np.float64)
+    lons = np.array([row._longitude if row._longitude is not None else np.nan for row in rows], dtype=np.float64)
+    
+    distances = haversine_km(lat, lon, lats, lons)
+    costs = modal * quantity + cost_per_km * distances
+    ranked = np.where(np.isnan(costs), np.inf, costs)
+    
+    # Partial selection: only the top `limit` are sorted
+    if limit and limit < len(rows):
+        best = np.argpartition(ranked, limit - 1)[:limit]
+        order = best[np.argsort(ranked[best], kind="stable")]
+    else:
+        order = np.argsort(ranked, kind="stable")
+    
+    markets = []
+    for i in order.tolist():
+        item = {field: getattr(rows[i], field) for field in selected}
+        known = not np.isnan(costs[i])
+        item["distance_km"] = round(float(distances[i]), 2) if known else None
+        item["effective_cost"] = round(float(costs[i]), 2) if known else None
+        markets.append(item)
+    return markets
+
+
+def _price_field_columns(lang: Optional[str], price_change) -> Dict[str, Tuple]:
+    """Selectable price fields: name -> (SQL expression, tables it needs)."""
+    
+    return {
+        "commodity_id": (Price.commodity_id, set()),
+        "commodity_name": (localized_name(Commodity, lang), {"commodity"}),
+        "commodity_name_telugu": (Commodity.name_telugu, {"commodity"}),
+        "commodity_name_hindi": (Commodity.name_hindi, {"commodity"}),
+        "commodity_image": (Commodity.image_url, {"commodity"}),
+        "category": (Commodity.category, {"commodity"}),
+        "market_id": (Price.market_id, set()),
+        "market_name": (localized_name(Market, lang), {"market"}),
+        "district": (Market.district, {"market"}),
+        "state_name": (localized_name(State, lang), {"state"}),
+        "min_price": (Price.min_price, set()),
+        "max_price": (Price.max_price, set()),
+        "modal_price": (Price.modal_price, set()),
+        "price_date": (Price.price_date, set()),
+        "unit": (Commodity.unit, {"commodity"}),
+        "price_change_percent": (price_change, {"yesterday"}),
+    }
+
+
+# Field names accepted by `fields=` on the price listing
+PRICE_FIELDS = list(_price_field_columns(None, None))
+
+
+def _compare_field_columns(lang: Optional[str]) -> Dict[str, Tuple]:
+    """Selectable per-market comparison fields: name -> (SQL expression, tables it needs)."""
+    
+    return {
+        "market_id": (Price.market_id, set()),
+        "market_name": (localized_name(Market, lang), {"market"}),
+        "district": (Market.district, {"market"}),
+        "state": (localized_name(State, lang), {"state"}),
+        "min_price": (Price.min_price, set()),
+        "max_price": (Price.max_price, set()),
+        "modal_price": (Price.modal_price, set()),
+    }
+
+
+# Per-market field names accepted by `fields=` on market comparisons
+COMPARE_FIELDS = list(_compare_field_columns(None))
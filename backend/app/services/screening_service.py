@@ -0,0 +1,262 @@
+"""
+BazaarSetu Backend - Ingestion Screening
+Vectorized anomaly checks of each ingested batch against rolling per-(commodity, market) medians.
+"""
+
+import math
+from datetime import timedelta
+from collections import namedtuple
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+from sqlalchemy import select, delete, and_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import get_settings
+from app.models import Price, QuarantinedPrice
+
+settings = get_settings()
+
+# Checked in this order; a row is quarantined with the first one it fails
+REASONS = ("outside_range", "unit_mismatch", "spike", "outside_band")
+
+# Per-quintal prices are 100x per-kg ones; within this factor of 100x counts as a unit mix-up
+QUINTAL_KG = 100
+UNIT_TOLERANCE = 2.0
+
+# Scales a MAD to a standard deviation for normally distributed values
+MAD_TO_SIGMA = 1.4826
+
+# Columns a released quarantined row carries over into `prices`
+PRICE_COLUMNS = ["market_id", "commodity_id", "price_date", "min_price", "max_price", "modal_price", "source_id"]
+
+# Rows to store as prices and to quarantine, and quarantined prices released by the batch
+ScreeningResult = namedtuple("ScreeningResult", ["accepted", "quarantined", "released"])
+
+
+def _group_medians(keys: np.ndarray, values: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Median of `values` per distinct key: (keys, medians, counts), keys sorted."""
+    order = np.lexsort((values, keys))
+    keys, values = keys[order], values[order]
+    unique, start, count = np.unique(keys, return_index=True, return_counts=True)
+    medians = (values[start + (count - 1) // 2] + values[start + count // 2]) / 2
+    return unique, medians, count
+
+
+def _group_mads(keys: np.ndarray, values: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """Median and median absolute deviation per key: (keys, medians, mads, counts)."""
+    unique, medians, count = _group_medians(keys, values)
+    deviations = np.abs(values - medians[np.searchsorted(unique, keys)])
+    _, mads, _ = _group_medians(keys, deviations)
+    return unique, medians, mads, count
+
+
+def _lookup(unique: np.ndarray, values: np.ndarray, keys: np.ndarray, missing=np.nan) -> np.ndarray:
+    """`values` of each of `keys` in the sorted `unique` keys, `missing` where absent."""
+    if not len(unique):
+        return np.full(len(keys), missing, dtype=np.float64)
+    index = np.minimum(np.searchsorted(unique, keys), len(unique) - 1)
+    return np.where(unique[index] == keys, values[index], missing)
+
+
+def screen(
+    history_commodity: np.ndarray,
+    history_market: np.ndarray,
+    history_modal: np.ndarray,
+    commodity: np.ndarray,
+    market: np.ndarray,
+    low: np.ndarray,
+    high: np.ndarray,
+    modal: np.ndarray,
+    held_commodity: Optional[np.ndarray] = None,
+    held_market: Optional[np.ndarray] = None,
+    held_day: Optional[np.ndarray] = None,
+    held_modal: Optional[np.ndarray] = None
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Check a batch of prices against recent history, all rows at once.
+    
+    Returns the index into `REASONS` of each row's first failed check
+    (-1 if it passed), the baseline median it was compared with (NaN if
+    none), and which of the `held_*` rows (recently quarantined prices)
+    confirm a new level. Comparisons are on log prices, so bands are
+    symmetric ratios: a row fails when
+    
+    - its modal price is outside its own min..max (when both are given);
+    - it is about 100x off the baseline (per-quintal vs per-kg);
+    - it is `screening_spike_ratio` or more times off the baseline;
+    - it is further from its (commodity, market) median than
+      `screening_mad_threshold` scaled MADs. This band needs
+      `screening_min_history` prices of the pair; pairs with less history
+      are compared with the commodity's median across markets for the
+      unit and spike checks only.
+    
+    A row that fails only against the baseline is accepted after all when
+    quarantined prices of its pair from `screening_confirm_days` distinct
+    days agree with it: the market really moved (or reports in another
+    unit from now on). Those quarantined rows are flagged for release.
+    """
+    log_modal = np.log(modal)
+    pair = commodity.astype(np.int64) << 32 | market.astype(np.int64)
+    
+    history_log = np.log(history_modal)
+    history_pair = history_commodity.astype(np.int64) << 32 | history_market.astype(np.int64)
+    pairs, pair_medians, pair_mads, pair_counts = _group_mads(history_pair, history_log)
+    commodities, commodity_medians, _ = _group_medians(history_commodity.astype(np.int64), history_log)
+    
+    counts = _lookup(pairs, pair_counts, pair, missing=0)
+    own = counts >= settings.screening_min_history
+    baseline = np.where(
+        own,
+        _lookup(pairs, pair_medians, pair),
+        _lookup(commodities, commodity_medians, commodity.astype(np.int64))
+    )
+    spread = np.maximum(_lookup(pairs, pair_mads, pair), settings.screening_min_spread) * MAD_TO_SIGMA
+    
+    with np.errstate(invalid="ignore"):
+        distance = np.abs(log_modal - baseline)
+        checks = [
+            (low > 0) & (high > 0) & ((modal < low) | (modal > high)),
+            np.abs(distance - math.log(QUINTAL_KG)) <= math.log(UNIT_TOLERANCE),
+            distance >= math.log(settings.screening_spike_ratio),
+            own & (distance > settings.screening_mad_threshold * spread),
+        ]
+    reasons = np.select(checks, list(range(len(REASONS))), default=-1)
+    
+    release = np.zeros(0 if held_modal is None else len(held_modal), dtype=bool)
+    if held_modal is not None and len(held_modal):
+        # Few rows fail, so the confirmation check loops over those only
+        held_pair = held_commodity.astype(np.int64) << 32 | held_market.astype(np.int64)
+        order = np.argsort(held_pair, kind="stable")
+        held_pair, held_log, held_day = held_pair[order], np.log(held_modal[order]), held_day[order]
+        agreement = settings.screening_mad_threshold * settings.screening_min_spread * MAD_TO_SIGMA
+        for i in np.flatnonzero(reasons > REASONS.index("outside_range")).tolist():
+            start, end = np.searchsorted(held_pair, [pair[i], pair[i] + 1])
+            agrees = np.abs(held_log[start:end] - log_modal[i]) <= agreement
+            if len(np.unique(held_day[start:end][agrees])) >= settings.screening_confirm_days:
+                reasons[i] = -1
+                release[order[start:end][agrees]] = True
+    
+    return reasons, np.exp(baseline), release
+
+
+async def screen_prices(db: AsyncSession, rows: List[Dict]) -> ScreeningResult:
+    """
+    Split ingested price rows into accepted and quarantined ones.
+    
+    `rows` are `Price` column dicts with a positive `modal_price`. The
+    baseline is every stored price of the batch's commodities from
+    `screening_baseline_days` before its earliest date up to its latest,
+    and the quarantined prices of the same span are checked for a
+    confirmed new level (see `screen`). Quarantined rows come back with
+    `reason` and `baseline_price` added, ready for `QuarantinedPrice`;
+    quarantined rows confirmed by this batch are released into `prices`
+    in the caller's transaction.
+    """
+    if not rows or not settings.screening_enabled:
+        return ScreeningResult(rows, [], [])
+    
+    dates = [row["price_date"] for row in rows]
+    commodity_ids = {row["commodity_id"] for row in rows}
+    since = min(dates) - timedelta(days=settings.screening_baseline_days)
+    history = (await db.execute(
+        select(Price.commodity_id, Price.market_id, Price.modal_price)
+        .where(
+            and_(
+                Price.commodity_id.in_(commodity_ids),
+                Price.price_date >= since,
+                Price.price_date <= max(dates),
+                Price.modal_price > 0
+            )
+        )
+    )).all()
+    held = (await db.execute(
+        select(
+            QuarantinedPrice.id,
+            QuarantinedPrice.commodity_id,
+            QuarantinedPrice.market_id,
+            QuarantinedPrice.price_date,
+            QuarantinedPrice.modal_price
+        )
+        .where(
+            and_(
+                QuarantinedPrice.commodity_id.in_(commodity_ids),
+                QuarantinedPrice.price_date >= since,
+                QuarantinedPrice.price_date <= max(dates),
+                QuarantinedPrice.modal_price > 0
+            )
+        )
+    )).all()
+    history_columns = list(zip(*history)) or [(), (), ()]
+    held_columns = list(zip(*held)) or [(), (), (), (), ()]
+    
+    reasons, baselines, release = screen(
+        np.array(history_columns[0], dtype=np.int64),
+        np.array(history_columns[1], dtype=np.int64),
+        np.array(history_columns[2], dtype=np.float64),
+        np.array([row["commodity_id"] for row in rows], dtype=np.int64),
+        np.array([row["market_id"] for row in rows], dtype=np.int64),
+        np.array([row["min_price"] for row in rows], dtype=np.float64),
+        np.array([row["max_price"] for row in rows], dtype=np.float64),
+        np.array([row["modal_price"] for row in rows], dtype=np.float64),
+        np.array(held_columns[1], dtype=np.int64),
+        np.array(held_columns[2], dtype=np.int64),
+        np.array([day.toordinal() for day in held_columns[3]], dtype=np.int64),
+        np.array(held_columns[4], dtype=np.float64)
+    )
+    
+    accepted, quarantined = [], []
+    for row, reason, baseline in zip(rows, reasons.tolist(), baselines.tolist()):
+        if reason < 0:
+            accepted.append(row)
+        else:
+            quarantined.append({
+                **row,
+                "reason": REASONS[reason],
+                "baseline_price": None if baseline != baseline else round(baseline, 2)
+            })
+    
+    released = []
+    release_ids = [held_columns[0][i] for i in np.flatnonzero(release).tolist()]
+    if release_ids:
+        released = await release_quarantined(db, ids=release_ids)
+    return ScreeningResult(accepted, quarantined, released)
+
+
+async def release_quarantined(
+    db: AsyncSession,
+    ids: Optional[List[int]] = None,
+    commodity_id: Optional[int] = None,
+    market_id: Optional[int] = None,
+    reason: Optional[str] = None
+) -> List[Price]:
+    """
+    Move quarantined rows into `prices` (after review, or once confirmed).
+    
+    Rows are selected by id and/or pair and reason; at least one filter is
+    required. The new `Price` rows are added to `db` and the quarantined
+    ones deleted; the caller commits.
+    """
+    filters = []
+    if ids is not None:
+        filters.append(QuarantinedPrice.id.in_(ids))
+    if commodity_id is not None:
+        filters.append(QuarantinedPrice.commodity_id == commodity_id)
+    if market_id is not None:
+        filters.append(QuarantinedPrice.market_id == market_id)
+    if reason is not None:
+        filters.append(QuarantinedPrice.reason == reason)
+    if not filters:
+        raise ValueError("Select the quarantined rows to release (ids, commodity, market or reason)")
+    
+    held = (await db.execute(
+        select(QuarantinedPrice).where(and_(*filters)).order_by(QuarantinedPrice.price_date, QuarantinedPrice.id)
+    )).scalars().all()
+    prices = [
+        Price(**{column: getattr(row, column) for column in PRICE_COLUMNS})
+        for row in held
+    ]
+    db.add_all(prices)
+    if held:
+        await db.execute(delete(QuarantinedPrice).where(QuarantinedPrice.id.in_([row.id for row in held])))
+    return prices
@@ -0,0 +1,155 @@
+"""
+BazaarSetu Backend - Home Screen Snapshots
+Per-state "today" payloads built once per ingestion and served from memory.
+"""
+
+import asyncio
+import gzip
+import hashlib
+import logging
+from collections import defaultdict
+from datetime import date, datetime
+from typing import Dict, List, Optional
+
+from sqlalchemy import select
+from sqlalchemy.orm import selectinload
+
+from app.core.config import get_settings
+from app.core.database import AsyncSessionLocal
+from app.models import State, Market
+from app.schemas import StateResponse, MarketResponse, PriceWithDetails, HomeSnapshot
+from app.services.price_service import PriceService
+
+try:
+    import brotli
+except ImportError:  # brotli is optional; gzip is always available
+    brotli = None
+
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+# Enough rows for every price of the day in one query
+MAX_SNAPSHOT_PRICES = 1_000_000
+
+
+class EncodedSnapshot:
+    """A snapshot serialized once, with its compressed variants and ETag."""
+    
+    def __init__(self, body: bytes):
+        self.etag = '"' + hashlib.blake2b(body, digest_size=12).hexdigest() + '"'
+        self.bodies = {
+            "identity": body,
+            "gzip": gzip.compress(body, compresslevel=settings.compression_gzip_level),
+        }
+        if brotli is not None:
+            self.bodies["br"] = brotli.compress(body, quality=settings.compression_brotli_quality)
+
+
+class SnapshotStore:
+    """
+    Encoded home-screen snapshots keyed by state id (None = all states).
+    
+    `rebuild` reads the database once for every state, encodes all
+    snapshots, and only then replaces the mapping in a single assignment,
+    so readers never see a half-built set and never wait on the database.
+    Snapshots are rebuilt after each ingestion message, and by
+    `ensure_built` once they are from an earlier day or older than
+    `cache_fallback_ttl_seconds` (in case that message never arrives).
+    """
+    
+    def __init__(self, top_movers: int = 5):
+        self.top_movers = top_movers
+        self.built_at: Optional[datetime] = None
+        self._snapshots: Dict[Optional[int], EncodedSnapshot] = {}
+        self._lock = asyncio.Lock()
+    
+    def get(self, state_id: Optional[int]) -> Optional[EncodedSnapshot]:
+        return self._snapshots.get(state_id)
+    
+    @property
+    def is_built(self) -> bool:
+        return self.built_at is not None
+    
+    @property
+    def is_fresh(self) -> bool:
+        """Built today, within `cache_fallback_ttl_seconds`."""
+        if self.built_at is None:
+            return False
+        now = datetime.now()
+        return (
+            self.built_at.date() == now.date()
+            and (now - self.built_at).total_seconds() < settings.cache_fallback_ttl_seconds
+        )
+    
+    async def ensure_built(self) -> None:
+        """Build the snapshots if they are missing or stale, unless another request already has."""
+        if self.is_fresh:
+            return
+        async with self._lock:
+            if not self.is_fresh:
+                await self._rebuild()
+    
+    async def rebuild(self) -> None:
+        """Rebuild every snapshot (e.g. after an ingestion run)."""
+        async with self._lock:
+            await self._rebuild()
+    
+    async def _rebuild(self) -> None:
+        started = datetime.now()
+        async with AsyncSessionLocal() as db:
+            states = (await db.execute(select(State).order_by(State.name))).scalars().all()
+            markets = (await db.execute(
+                select(Market).options(selectinload(Market.state)).order_by(Market.name)
+            )).scalars().all()
+            prices = await PriceService(db).get_today_prices(page_size=MAX_SNAPSHOT_PRICES)
+        
+        state_items = [StateResponse.model_validate(s) for s in states]
+        market_items = [MarketResponse.model_validate(m) for m in markets]
+        
+        # Prices carry market_id, not state_id; group them through the markets
+        market_states = {m.id: m.state_id for m in market_items}
+        prices_by_state: Dict[int, List[PriceWithDetails]] = defaultdict(list)
+        for price in prices:
+            prices_by_state[market_states.get(price.market_id)].append(price)
+        markets_by_state: Dict[int, List[MarketResponse]] = defaultdict(list)
+        for market in market_items:
+            markets_by_state[market.state_id].append(market)
+        
+        snapshots = {None: self._encode(None, state_items, market_items, prices, started)}
+        for state in state_items:
+            snapshots[state.id] = self._encode(
+                state.id, state_items, markets_by_state[state.id], prices_by_state[state.id], started
+            )
+        
+        self._snapshots = snapshots
+        self.built_at = started
+        elapsed = (datetime.now() - started).total_seconds() * 1000
+        logger.info(f"Built {len(snapshots)} home snapshots from {len(prices)} prices in {elapsed:.0f} ms")
+    
+    def _encode(
+        self,
+        state_id: Optional[int],
+        states: List[StateResponse],
+        markets: List[MarketResponse],
+        prices: List[PriceWithDetails],
+        generated_at: datetime
+    ) -> EncodedSnapshot:
+        movers = sorted(
+            (p for p in prices if p.price_change_percent is not None),
+            key=lambda p: p.price_change_percent
+        )
+        snapshot = HomeSnapshot(
+            state_id=state_id,
+            price_date=date.today(),
+            generated_at=generated_at,
+            states=states,
+            markets=markets,
+            prices=prices,
+            top_gainers=[p for p in reversed(movers[-self.top_movers:]) if p.price_change_percent > 0],
+            top_losers=[p for p in movers[:self.top_movers] if p.price_change_percent < 0]
+        )
+        return EncodedSnapshot(snapshot.model_dump_json().encode())
+
+
+snapshot_store = SnapshotStore()
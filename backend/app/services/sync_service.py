@@ -0,0 +1,110 @@
+"""
+BazaarSetu Backend - Delta Sync
+Rows inserted, updated or deleted since a client's last sync token, in a compact columnar form.
+"""
+
+from datetime import date, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import select, text, and_, or_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import get_settings
+from app.models import State, Market, Commodity, Vendor, Price, PriceAlert, SyncTombstone
+
+settings = get_settings()
+
+# Synced tables and the columns a client keeps (rows are sent as value lists in this order)
+SYNC_TABLES: Dict[str, Tuple[type, List[str]]] = {
+    "states": (State, ["id", "name", "name_telugu", "name_hindi", "code"]),
+    "commodities": (Commodity, ["id", "name", "name_telugu", "name_hindi", "category", "image_url", "unit"]),
+    "markets": (Market, [
+        "id", "name", "name_telugu", "name_hindi", "state_id", "district", "latitude", "longitude", "is_active"
+    ]),
+    "vendors": (Vendor, ["id", "name", "market_id", "phone", "address", "latitude", "longitude", "is_verified"]),
+    "prices": (Price, ["id", "market_id", "commodity_id", "min_price", "max_price", "modal_price", "price_date"]),
+    "price_alerts": (PriceAlert, [
+        "id", "commodity_id", "market_id", "threshold_price", "alert_type", "is_active", "instant", "last_triggered"
+    ]),
+}
+
+
+def parse_sync_token(token: Optional[str]) -> int:
+    """The change sequence a token stands for; no token means a full first sync."""
+    if not token:
+        return 0
+    if not token.isdigit():
+        raise ValueError(f"Invalid sync token '{token}'")
+    return int(token)
+
+
+async def sync_horizon(db: AsyncSession) -> int:
+    """
+    Upper bound (exclusive) of the change sequences that are safe to hand out.
+    
+    On PostgreSQL `change_seq` is the writing transaction's id, and every
+    transaction below the snapshot's xmin has finished: rows stamped below
+    it can no longer appear later, so a client that syncs up to it never
+    misses one. SQLite serializes writers, so its counter is already final.
+    """
+    connection = await db.connection()
+    if connection.dialect.name == "postgresql":
+        query = "SELECT pg_snapshot_xmin(pg_current_snapshot())::text::bigint"
+    else:
+        query = "SELECT value + 1 FROM sync_counter"
+    return (await connection.execute(text(query))).scalar_one()
+
+
+async def collect_changes(
+    db: AsyncSession,
+    since: int,
+    user_id: Optional[int] = None,
+    today: Optional[date] = None
+) -> Dict[str, Any]:
+    """
+    Changes with `since <= change_seq < horizon`, and the token for next time.
+    
+    Each changed table appears as `{"columns": [...], "rows": [[...]],
+    "deleted": [ids]}`; unchanged tables are left out. Prices are limited
+    to the last `sync_price_days` (`prices_from`), and clients drop older
+    ones themselves. Alerts are only included for `user_id`.
+    """
+    horizon = await sync_horizon(db)
+    prices_from = (today or date.today()) - timedelta(days=settings.sync_price_days)
+    
+    def changed(column):
+        if since == 0:
+            # First sync: everything, including rows written before change tracking
+            return or_(column.is_(None), column < horizon)
+        return and_(column >= since, column < horizon)
+    
+    tables: Dict[str, Dict[str, Any]] = {}
+    for name, (model, columns) in SYNC_TABLES.items():
+        if model is PriceAlert and user_id is None:
+            continue
+        query = select(*(getattr(model, column) for column in columns)).where(changed(model.change_seq))
+        if model is Price:
+            query = query.where(Price.price_date >= prices_from)
+        elif model is PriceAlert:
+            query = query.where(PriceAlert.user_id == user_id)
+        rows = (await db.execute(query.order_by(model.id))).all()
+        if rows:
+            tables[name] = {"columns": columns, "rows": [list(row) for row in rows], "deleted": []}
+    
+    if since > 0:
+        tombstones = await db.execute(
+            select(SyncTombstone.table_name, SyncTombstone.row_id)
+            .where(
+                changed(SyncTombstone.change_seq),
+                or_(SyncTombstone.owner_id.is_(None), SyncTombstone.owner_id == user_id)
+            )
+            .order_by(SyncTombstone.change_seq)
+        )
+        for table_name, row_id in tombstones:
+            if table_name in SYNC_TABLES:
+                entry = tables.setdefault(
+                    table_name, {"columns": SYNC_TABLES[table_name][1], "rows": [], "deleted": []}
+                )
+                entry["deleted"].append(row_id)
+    
+    return {"token": str(horizon), "prices_from": prices_from, "tables": tables}
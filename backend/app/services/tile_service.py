@@ -0,0 +1,198 @@
+"""
+BazaarSetu Backend - Vendor Map Tiles
+Web-mercator tiles of vendors: precomputed clusters at low zoom, points at high zoom.
+"""
+
+import asyncio
+import hashlib
+import logging
+import math
+import time
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+from sqlalchemy import select
+
+from app.core.cache import TTLCache
+from app.core.config import get_settings
+from app.core.database import AsyncSessionLocal
+from app.core.responses import dump_json
+from app.models import Vendor
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+TILE_SIZE = 256
+MAX_ZOOM = 20
+MAX_LATITUDE = 85.05112878
+
+
+def mercator(lats: np.ndarray, lons: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Project to web-mercator world coordinates in [0, 1)."""
+    lat = np.radians(np.clip(lats, -MAX_LATITUDE, MAX_LATITUDE))
+    x = (lons + 180.0) / 360.0
+    y = (1.0 - np.log(np.tan(lat) + 1.0 / np.cos(lat)) / math.pi) / 2.0
+    return np.clip(x, 0.0, np.nextafter(1.0, 0.0)), np.clip(y, 0.0, np.nextafter(1.0, 0.0))
+
+
+class _ZoomClusters:
+    """Clusters for one zoom level, sorted by tile so each tile is one slice."""
+    
+    def __init__(self, tiles: Dict[Tuple[int, int], Tuple[int, int]], lats, lons, counts, verified):
+        self.tiles = tiles
+        self.lats = lats
+        self.lons = lons
+        self.counts = counts
+        self.verified = verified
+
+
+class VendorTileSet:
+    """
+    Every vendor location, with grid clusters precomputed per zoom level.
+    
+    At zoom `z` the world is cut into cells of `cell_px` screen pixels;
+    the vendors in a cell become one cluster at their mean position. Up to
+    `cluster_max_zoom` a tile is just a slice of that level's clusters;
+    above it tiles list individual vendors.
+    """
+    
+    def __init__(self, rows: list, cell_px: int, cluster_max_zoom: int):
+        self.cell_px = cell_px
+        self.cluster_max_zoom = cluster_max_zoom
+        self.ids = np.array([row.id for row in rows], dtype=np.int64)
+        self.names = [row.name for row in rows]
+        self.lats = np.array([row.latitude for row in rows], dtype=np.float64)
+        self.lons = np.array([row.longitude for row in rows], dtype=np.float64)
+        self.is_verified = np.array([bool(row.is_verified) for row in rows], dtype=bool)
+        self.x, self.y = mercator(self.lats, self.lons)
+        
+        # Sorted by x so high-zoom tiles can binary-search their column
+        self._by_x = np.argsort(self.x, kind="stable")
+        self._sorted_x = self.x[self._by_x]
+        
+        self.zooms = {z: self._cluster(z) for z in range(cluster_max_zoom + 1)}
+    
+    def _cluster(self, zoom: int) -> _ZoomClusters:
+        cells_per_axis = (TILE_SIZE << zoom) // self.cell_px
+        cells_per_tile = TILE_SIZE // self.cell_px
+        cx = np.minimum((self.x * cells_per_axis).astype(np.int64), cells_per_axis - 1)
+        cy = np.minimum((self.y * cells_per_axis).astype(np.int64), cells_per_axis - 1)
+        
+        # Key cells by (tile, cell within tile) so each tile's cells are contiguous
+        tile_key = (cy // cells_per_tile) * (1 << zoom) + cx // cells_per_tile
+        local_key = (cy % cells_per_tile) * cells_per_tile + cx % cells_per_tile
+        keys, inverse = np.unique(tile_key * cells_per_tile ** 2 + local_key, return_inverse=True)
+        inverse = inverse.reshape(-1)
+        
+        counts = np.bincount(inverse, minlength=len(keys))
+        lats = np.bincount(inverse, weights=self.lats, minlength=len(keys)) / np.maximum(counts, 1)
+        lons = np.bincount(inverse, weights=self.lons, minlength=len(keys)) / np.maximum(counts, 1)
+        verified = np.bincount(inverse, weights=self.is_verified, minlength=len(keys)).astype(np.int64)
+        
+        tiles = {}
+        if len(keys):
+            tile_keys = keys // cells_per_tile ** 2
+            boundaries = np.flatnonzero(np.diff(tile_keys)) + 1
+            starts = np.concatenate(([0], boundaries)).tolist()
+            ends = np.concatenate((boundaries, [len(keys)])).tolist()
+            for start, end in zip(starts, ends):
+                ty, tx = divmod(int(tile_keys[start]), 1 << zoom)
+                tiles[(tx, ty)] = (start, end)
+        return _ZoomClusters(tiles, lats, lons, counts, verified)
+    
+    def tile(self, z: int, x: int, y: int) -> dict:
+        """JSON-ready content of one tile."""
+        if z <= self.cluster_max_zoom:
+            level = self.zooms[z]
+            start, end = level.tiles.get((x, y), (0, 0))
+            return {
+                "z": z, "x": x, "y": y,
+                "clusters": [
+                    {"lat": round(lat, 6), "lon": round(lon, 6), "count": count, "verified": verified}
+                    for lat, lon, count, verified in zip(
+                        level.lats[start:end].tolist(),
+                        level.lons[start:end].tolist(),
+                        level.counts[start:end].tolist(),
+                        level.verified[start:end].tolist()
+                    )
+                ]
+            }
+        
+        scale = 1 << z
+        lo = np.searchsorted(self._sorted_x, x / scale, side="left")
+        hi = np.searchsorted(self._sorted_x, (x + 1) / scale, side="left")
+        column = self._by_x[lo:hi]
+        in_tile = column[(self.y[column] >= y / scale) & (self.y[column] < (y + 1) / scale)]
+        return {
+            "z": z, "x": x, "y": y,
+            "vendors": [
+                {
+                    "id": int(self.ids[i]),
+                    "name": self.names[i],
+                    "lat": float(self.lats[i]),
+                    "lon": float(self.lons[i]),
+                    "verified": bool(self.is_verified[i])
+                }
+                for i in in_tile.tolist()
+            ]
+        }
+
+
+class VendorTiles:
+    """
+    Lazily built `VendorTileSet` plus a cache of encoded tiles.
+    
+    Both are dropped by `invalidate` when vendors change, and the tile set
+    after `cache_fallback_ttl_seconds` in case a change message never
+    arrives; the next request rebuilds it off the event loop.
+    """
+    
+    def __init__(self):
+        self._tile_set: Optional[VendorTileSet] = None
+        self._built_at = 0.0
+        self._lock = asyncio.Lock()
+        self._cache = TTLCache(
+            ttl_seconds=settings.vendor_tile_cache_ttl_seconds,
+            max_entries=settings.vendor_tile_cache_max_entries
+        )
+    
+    def invalidate(self) -> None:
+        self._tile_set = None
+        self._cache.clear()
+    
+    async def get_tile(self, z: int, x: int, y: int) -> Tuple[bytes, str]:
+        """Encoded tile and its ETag."""
+        tile_set = self._tile_set if self._is_fresh() else await self._build()
+        key = (id(tile_set), z, x, y)
+        cached = self._cache.get(key)
+        if cached is None:
+            body = dump_json(tile_set.tile(z, x, y))
+            cached = (body, '"' + hashlib.blake2b(body, digest_size=12).hexdigest() + '"')
+            self._cache.set(key, cached)
+        return cached
+    
+    def _is_fresh(self) -> bool:
+        return self._tile_set is not None and time.monotonic() - self._built_at < settings.cache_fallback_ttl_seconds
+    
+    async def _build(self) -> VendorTileSet:
+        async with self._lock:
+            if not self._is_fresh():
+                # Read from the primary so a just-created vendor is never missed
+                async with AsyncSessionLocal() as primary:
+                    result = await primary.execute(
+                        select(Vendor.id, Vendor.name, Vendor.latitude, Vendor.longitude, Vendor.is_verified)
+                    )
+                    rows = result.all()
+                self._tile_set = await asyncio.to_thread(
+                    VendorTileSet,
+                    rows,
+                    settings.vendor_cluster_cell_px,
+                    settings.vendor_cluster_max_zoom
+                )
+                self._built_at = time.monotonic()
+                self._cache.clear()
+                logger.info(f"Built vendor tiles for {len(rows)} vendors")
+            return self._tile_set
+
+
+vendor_tiles = VendorTiles()
@@ -0,0 +1,131 @@
+"""
+BazaarSetu Backend - Worker Warm-up
+Opens connections, primes caches and compiles hot queries before a worker reports ready.
+"""
+
+import asyncio
+import logging
+import time
+from datetime import datetime
+from typing import Dict, Optional
+
+import httpx
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from app.core.config import get_settings
+from app.core.database import engine, read_replicas, read_session
+from app.core.metrics import startup_metrics
+from app.models import Commodity
+from app.services.geo_service import location_indexes
+from app.services.price_service import PriceService
+from app.services.snapshot_service import snapshot_store
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+
+class Readiness:
+    """Whether this worker has finished warming up (and is not shutting down)."""
+    
+    def __init__(self):
+        self.ready = False
+        self.warmed_at: Optional[datetime] = None
+        self.phases: Dict[str, float] = {}
+        self.errors: Dict[str, str] = {}
+    
+    def status(self) -> dict:
+        return {
+            "status": "ready" if self.ready else "warming",
+            "warmed_at": self.warmed_at.isoformat() if self.warmed_at else None,
+            "warmup_ms": {name: round(seconds * 1000, 1) for name, seconds in self.phases.items()},
+            "errors": self.errors,
+        }
+
+
+readiness = Readiness()
+
+
+async def _open_connections(target: AsyncEngine, count: int) -> None:
+    """Check out `count` connections at once so the pool opens them now, then return them."""
+    results = await asyncio.gather(*(target.connect() for _ in range(count)), return_exceptions=True)
+    for result in results:
+        if not isinstance(result, BaseException):
+            await result.close()
+    failures = [r for r in results if isinstance(r, BaseException)]
+    if failures:
+        raise failures[0]
+
+
+async def open_pools() -> None:
+    count = settings.warmup_connections or settings.db_pool_size
+    await asyncio.gather(*(_open_connections(e, count) for e in [engine, *read_replicas.engines]))
+
+
+async def prime_queries() -> None:
+    """
+    Run the main PriceService queries once.
+    
+    This fills SQLAlchemy's compiled-statement cache (and asyncpg's
+    prepared statements on the pooled connections) and leaves a 30-day
+    trend for every commodity in the trend cache.
+    """
+    async with read_session() as db:
+        commodity_ids = (await db.execute(select(Commodity.id).order_by(Commodity.id))).scalars().all()
+        if not commodity_ids:
+            return
+        service = PriceService(db)
+        await service.get_price_trends(list(commodity_ids), days=30)
+        await service.get_price_trends(commodity_ids[:1], market_ids=[0], days=30)
+        try:
+            await service.compare_markets(commodity_ids[0])
+        except ValueError:
+            pass  # No prices for it today; the statement is compiled all the same
+
+
+async def prime_responses(app) -> None:
+    """Render the hot GET endpoints through the app, filling the compressed response cache."""
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://warmup") as client:
+        for path in settings.warmup_paths:
+            for encoding in ("br", "gzip"):
+                response = await client.get(path, headers={"Accept-Encoding": encoding})
+                if response.status_code >= 400:
+                    raise RuntimeError(f"GET {path} returned {response.status_code}")
+
+
+async def _build_location_indexes() -> None:
+    await location_indexes.get("markets")
+    await location_indexes.get("vendors")
+
+
+async def warm_up(app) -> None:
+    """
+    Warm this worker, then mark it ready.
+    
+    Each step is timed (also exported as `app_startup_seconds`) and a
+    failing step is logged and skipped: warm-up only makes first requests
+    faster, so it never keeps a worker out of rotation on its own.
+    """
+    started = time.perf_counter()
+    steps = [
+        ("warmup_connections", open_pools),
+        ("warmup_snapshots", snapshot_store.ensure_built),
+        ("warmup_locations", _build_location_indexes),
+        ("warmup_queries", prime_queries),
+        ("warmup_responses", lambda: prime_responses(app)),
+    ]
+    for name, step in steps:
+        try:
+            with startup_metrics.phase(name):
+                await step()
+        except Exception as e:
+            readiness.errors[name] = str(e)
+            logger.warning(f"Warm-up step {name} failed: {e}")
+        readiness.phases[name] = startup_metrics.phases[name]
+    
+    startup_metrics.phases["warmup_total"] = time.perf_counter() - started
+    readiness.phases["total"] = startup_metrics.phases["warmup_total"]
+    readiness.warmed_at = datetime.now()
+    readiness.ready = True
+    logger.info(f"Warm-up finished in {readiness.phases['total'] * 1000:.0f} ms, worker ready")
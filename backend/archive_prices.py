@@ -0,0 +1,35 @@
+"""
+Move raw prices older than PRICE_ARCHIVE_AFTER_DAYS (default 90) into
+monthly Parquet files, keeping daily per-commodity rollups in the database.
+
+Usage:
+    python archive_prices.py
+    python archive_prices.py --today 2025-06-30   # archive as if run on that day
+"""
+import argparse
+import asyncio
+import time
+from datetime import date
+
+from app.core.database import engine
+from app.services.archive_service import archive_prices, archive_cutoff, price_archive
+
+
+async def main(args):
+    started = time.perf_counter()
+    try:
+        archived = await archive_prices(today=args.today)
+    finally:
+        await engine.dispose()
+    
+    for month, count in archived.items():
+        size = price_archive.path(month).stat().st_size
+        print(f"📦 {month:%Y-%m}: {count} prices -> {price_archive.path(month)} ({size / 1024:.1f} KiB)")
+    elapsed = time.perf_counter() - started
+    print(f"✅ Archived {sum(archived.values())} prices before {archive_cutoff(args.today)} in {elapsed:.1f} s")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Archive aged prices to Parquet")
+    parser.add_argument("--today", type=date.fromisoformat, help="Reference day (YYYY-MM-DD, default: today)")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1 @@
+"""BazaarSetu backend benchmarks. Run each module with `python -m benchmarks.<name>`."""
@@ -0,0 +1,67 @@
+"""
+BazaarSetu - Price Analytics Benchmark
+Times `price_stats` over a synthetic year of daily prices against computing
+the same statistics one series at a time with NumPy's nan-functions.
+
+Usage (from backend/):
+    python -m benchmarks.analytics [--series 20000] [--days 365] [--repeat 3]
+"""
+
+import argparse
+import timeit
+import warnings
+
+import numpy as np
+
+from app.services.analytics_service import price_stats, STAT_WINDOWS, VOLATILITY_DAYS, PERCENTILES
+
+
+def make_prices(series: int, days: int, seed: int = 7) -> np.ndarray:
+    """Random-walk prices with about one day in five missing (holidays, unreported days)."""
+    rng = np.random.default_rng(seed)
+    steps = rng.normal(0.0, 0.03, size=(series, days))
+    prices = rng.uniform(10, 120, size=(series, 1)) * np.exp(np.cumsum(steps, axis=1))
+    prices[rng.random((series, days)) < 0.2] = np.nan
+    return prices
+
+
+def per_series(prices: np.ndarray) -> list:
+    """The same statistics, one row at a time."""
+    results = []
+    for row in prices:
+        observed = np.flatnonzero(~np.isnan(row))
+        values = row[observed]
+        stats = {"latest_price": values[-1]}
+        for window in STAT_WINDOWS:
+            stats[f"moving_avg_{window}d"] = np.nanmean(row[-window:])
+            earlier = values[observed <= len(row) - 1 - window]
+            stats[f"price_change_{window}d"] = (values[-1] / earlier[-1] - 1) * 100 if len(earlier) else np.nan
+        returns = np.diff(np.log(values))[observed[1:] >= len(row) - VOLATILITY_DAYS]
+        stats[f"volatility_{VOLATILITY_DAYS}d"] = np.std(returns, ddof=1) * 100
+        stats["percentiles"] = np.nanpercentile(row, PERCENTILES)
+        results.append(stats)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--series", type=int, default=20000, help="(commodity, market) series")
+    parser.add_argument("--days", type=int, default=365)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+    
+    prices = make_prices(args.series, args.days)
+    print(f"{args.series} series x {args.days} days ({prices.nbytes / 2 ** 20:.0f} MiB), best of {args.repeat}\n")
+    
+    vectorized = min(timeit.repeat(lambda: price_stats(prices), number=1, repeat=args.repeat))
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", RuntimeWarning)
+        looped = min(timeit.repeat(lambda: per_series(prices), number=1, repeat=args.repeat))
+    
+    print(f"{'method':<12} {'ms':>10}")
+    print(f"{'per series':<12} {looped * 1000:>10.1f}")
+    print(f"{'vectorized':<12} {vectorized * 1000:>10.1f}  ({looped / vectorized:.0f}x)")
+
+
+if __name__ == "__main__":
+    main()
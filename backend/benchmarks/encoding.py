@@ -0,0 +1,67 @@
+"""
+BazaarSetu - Response Encoding Benchmark
+Compares JSON with plain and compact (dictionary-encoded) MessagePack for
+`/prices/today` rows: body size raw and compressed, server encode time and
+client decode time.
+
+Usage (from backend/):
+    python -m benchmarks.encoding [--rows 200] [--repeat 200]
+"""
+
+import argparse
+import gzip
+import json
+import timeit
+
+from app.core.binary import dump_msgpack, load_msgpack, msgpack
+from app.core.compression import brotli
+from app.core.responses import dump_models
+from app.schemas import PriceWithDetails
+from benchmarks.serialization import make_rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=200)
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+    
+    if msgpack is None:
+        parser.exit(1, "msgpack is not installed\n")
+    
+    rows = make_rows(args.rows)
+    dicts = [row.model_dump(mode="json") for row in rows]
+    
+    # name -> (encode, decode)
+    cases = {
+        "json": (
+            lambda: dump_models(rows, PriceWithDetails),
+            json.loads
+        ),
+        "msgpack (plain)": (
+            lambda: msgpack.packb(dicts, use_bin_type=True),
+            lambda body: msgpack.unpackb(body, raw=False)
+        ),
+        "msgpack (compact)": (
+            lambda: dump_msgpack(rows),
+            load_msgpack
+        ),
+    }
+    
+    print(f"Encoding {args.rows} PriceWithDetails rows, {args.repeat} runs each\n")
+    header = f"{'encoding':<20} {'bytes':>8} {'gzip':>8}"
+    if brotli is not None:
+        header += f" {'br':>8}"
+    print(header + f" {'encode ms':>10} {'decode ms':>10}")
+    for name, (encode, decode) in cases.items():
+        body = encode()
+        line = f"{name:<20} {len(body):>8} {len(gzip.compress(body, 6)):>8}"
+        if brotli is not None:
+            line += f" {len(brotli.compress(body, quality=5)):>8}"
+        encode_seconds = min(timeit.repeat(encode, number=args.repeat, repeat=3)) / args.repeat
+        decode_seconds = min(timeit.repeat(lambda: decode(body), number=args.repeat, repeat=3)) / args.repeat
+        print(line + f" {encode_seconds * 1000:>10.3f} {decode_seconds * 1000:>10.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""
+BazaarSetu - Serialization Benchmark
+Compares FastAPI's default response path with the fast JSON path for list endpoints.
+
+Usage (from backend/):
+    python -m benchmarks.serialization [--rows 200] [--repeat 200]
+"""
+
+import argparse
+import json
+import timeit
+from datetime import date
+from typing import List
+
+from pydantic import TypeAdapter
+
+from app.core.responses import dump_json, dump_models
+from app.schemas import PriceWithDetails
+
+
+def make_rows(count: int) -> List[PriceWithDetails]:
+    """Build realistic `/prices/today` rows (three scripts per commodity name)."""
+    return [
+        PriceWithDetails(
+            commodity_id=i % 40 + 1,
+            commodity_name=f"Tomato {i % 40}",
+            commodity_name_telugu="టమాటా",
+            commodity_name_hindi="टमाटर",
+            commodity_image="https://example.com/images/tomato.png",
+            category="vegetable",
+            market_name=f"Market {i % 25}",
+            district="Krishna",
+            state_name="Andhra Pradesh",
+            min_price=32.0 + i % 7,
+            max_price=48.0 + i % 5,
+            modal_price=40.5 + i % 9,
+            price_date=date.today(),
+            unit="kg",
+            price_change_percent=round((i % 11 - 5) * 1.37, 2)
+        )
+        for i in range(count)
+    ]
+
+
+def fastapi_default(rows: List[PriceWithDetails], adapter: TypeAdapter) -> bytes:
+    """What `response_model=List[...]` + JSONResponse does with returned models."""
+    content = [row.model_dump() for row in rows]
+    validated = adapter.validate_python(content)
+    data = adapter.dump_python(validated, mode="json")
+    return json.dumps(data, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=200)
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+    
+    rows = make_rows(args.rows)
+    dicts = [row.model_dump() for row in rows]
+    adapter = TypeAdapter(List[PriceWithDetails])
+    
+    cases = {
+        "fastapi default (validate + json)": lambda: fastapi_default(rows, adapter),
+        "fast path (pydantic-core dump_json)": lambda: dump_models(rows, PriceWithDetails),
+        "orjson (pre-built dicts)": lambda: dump_json(dicts),
+    }
+    
+    print(f"Serializing {args.rows} PriceWithDetails rows, {args.repeat} runs each\n")
+    print(f"{'path':<40} {'ms/response':>12} {'bytes':>10}")
+    baseline = None
+    for name, fn in cases.items():
+        size = len(fn())
+        seconds = min(timeit.repeat(fn, number=args.repeat, repeat=3)) / args.repeat
+        baseline = baseline or seconds
+        print(f"{name:<40} {seconds * 1000:>12.3f} {size:>10}  ({baseline / seconds:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,40 @@
+"""
+Build a read-only snapshot bundle (a single SQLite file) of the catalogs,
+recent prices and daily rollups, for kiosks that cannot rely on reaching
+the main database. Serve it with DATABASE_BUNDLE_PATH=<file>.
+
+Usage:
+    python build_bundle.py                              # to BUNDLE_OUTPUT_PATH
+    python build_bundle.py -o /srv/kiosk/bazaarsetu.db --rollup-days 180
+"""
+import argparse
+import asyncio
+import os
+import time
+from datetime import date
+
+from app.core.config import get_settings
+from app.core.database import engine
+from app.services.bundle_service import build_bundle
+
+
+async def main(args):
+    started = time.perf_counter()
+    try:
+        counts = await build_bundle(args.output, today=args.today, rollup_days=args.rollup_days)
+    finally:
+        await engine.dispose()
+    
+    for table, count in counts.items():
+        print(f"   {table:<14} {count:>10} rows")
+    size = os.path.getsize(args.output)
+    print(f"📦 Wrote {args.output} ({size / 1024 / 1024:.2f} MiB) in {time.perf_counter() - started:.1f} s")
+
+
+if __name__ == "__main__":
+    settings = get_settings()
+    parser = argparse.ArgumentParser(description="Build an offline snapshot bundle")
+    parser.add_argument("-o", "--output", default=settings.bundle_output_path, help="Bundle file to write")
+    parser.add_argument("--rollup-days", type=int, help=f"Days of daily rollups (default {settings.bundle_rollup_days})")
+    parser.add_argument("--today", type=date.fromisoformat, help="Reference day (YYYY-MM-DD, default: today)")
+    asyncio.run(main(parser.parse_args()))
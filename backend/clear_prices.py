@@ -1,14 +1,43 @@
-"""Clear all prices and refetch real ones"""
+"""
+Clear prices and refetch real ones.
+
+Usage:
+    python clear_prices.py                      # everything
+    python clear_prices.py --before 2024-01-01  # only older prices
+"""
+import argparse
 import asyncio
-from sqlalchemy import delete
-from app.core.database import AsyncSessionLocal
+from datetime import date
+from sqlalchemy import delete, text
+from app.core.database import AsyncSessionLocal, engine
+from app.core.partitions import PARTITIONED_PRICES, is_partitioned, drop_partitions_before
 from app.models import Price
 
-async def clear_prices():
+async def clear_prices(before=None):
+    dropped = []
+    if PARTITIONED_PRICES:
+        async with engine.begin() as conn:
+            if await is_partitioned(conn):
+                if before is None:
+                    # TRUNCATE empties every partition without scanning rows
+                    await conn.execute(text("TRUNCATE prices"))
+                    print(f"🗑️ Cleared all price records from database!")
+                    return
+                dropped = await drop_partitions_before(conn, before)
+    
     async with AsyncSessionLocal() as session:
-        result = await session.execute(delete(Price))
+        query = delete(Price)
+        if before is not None:
+            query = query.where(Price.price_date < before)
+        result = await session.execute(query)
         await session.commit()
+    
+    if before is None:
         print(f"🗑️ Cleared all price records from database!")
+    else:
+        print(f"🗑️ Dropped {len(dropped)} monthly partitions and {result.rowcount} other prices before {before}")
 
 if __name__ == "__main__":
-    asyncio.run(clear_prices())
+    parser = argparse.ArgumentParser(description="Clear price records")
+    parser.add_argument("--before", type=date.fromisoformat, help="Only clear prices before this day (YYYY-MM-DD)")
+    asyncio.run(clear_prices(parser.parse_args().before))
@@ -0,0 +1,158 @@
+"""
+Convert an existing prices table to the compact layout: integer paise instead
+of floats, a smallint source_id into price_sources instead of the free-text
+source, and no fetched_at. Prints the table size and a full-scan timing
+before and after.
+
+This is the first step for a database created before migrations: it also
+creates price_rollups and leaves prices at revision 0001, ready for
+`alembic stamp 0001` and `alembic upgrade head`.
+
+Usage:
+    python compact_prices.py              # migrate and drop the old table
+    python compact_prices.py --keep-old   # keep it as prices_uncompacted
+    python compact_prices.py --report     # only measure the current table
+"""
+import argparse
+import asyncio
+import os
+import time
+
+from sqlalchemy import inspect, text
+from sqlalchemy.engine import make_url
+
+from app.core.config import get_settings
+from app.core.database import engine, Base, match_baseline_prices
+from app.core.partitions import PARTITIONED_PRICES, ensure_price_partitions, ensure_upcoming_partitions
+from app.models import Price, PriceSource, PriceRollup, DATA_GOV_SOURCE_ID
+
+OLD_TABLE = "prices_uncompacted"
+
+# A typical full scan: daily per-commodity aggregates over every row
+SCAN_QUERY = "SELECT commodity_id, price_date, sum(modal_price), min(modal_price), max(modal_price), count(*) FROM {table} GROUP BY commodity_id, price_date"
+
+
+async def table_size(conn, table: str) -> int:
+    """Bytes used by a table with its indexes (and partitions on PostgreSQL)."""
+    if conn.dialect.name == "postgresql":
+        return (await conn.execute(text(
+            "SELECT COALESCE(sum(pg_total_relation_size(c.oid)), 0) FROM pg_class c "
+            "WHERE c.oid = CAST(:table AS regclass) "
+            "OR c.oid IN (SELECT inhrelid FROM pg_inherits WHERE inhparent = CAST(:table AS regclass))"
+        ), {"table": table})).scalar_one()
+    
+    # SQLite: pages of the table and its indexes, when dbstat is available
+    try:
+        return (await conn.execute(text(
+            "SELECT COALESCE(sum(pgsize), 0) FROM dbstat WHERE name = :table "
+            "OR name IN (SELECT name FROM sqlite_master WHERE type = 'index' AND tbl_name = :table)"
+        ), {"table": table})).scalar_one()
+    except Exception:
+        return os.path.getsize(make_url(get_settings().database_url).database)
+
+
+async def scan_seconds(conn, table: str, repeat: int = 3) -> float:
+    """Best-of-`repeat` time of the full-scan aggregate."""
+    best = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        (await conn.execute(text(SCAN_QUERY.format(table=table)))).all()
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+async def report(conn, table: str, label: str) -> None:
+    rows = (await conn.execute(text(f"SELECT count(*) FROM {table}"))).scalar_one()
+    size = await table_size(conn, table)
+    seconds = await scan_seconds(conn, table)
+    per_row = size / rows if rows else 0
+    print(f"{label:<8} {rows:>10} rows  {size / 1024 / 1024:>9.2f} MiB  {per_row:>6.1f} B/row  scan {seconds * 1000:>8.1f} ms")
+
+
+def _columns(sync_conn, table: str) -> set:
+    return {column["name"] for column in inspect(sync_conn).get_columns(table)}
+
+
+async def compact(args):
+    async with engine.begin() as conn:
+        # Creates price_sources (with its fixed rows) and price_rollups if they are missing
+        await conn.run_sync(Base.metadata.create_all, tables=[PriceSource.__table__, PriceRollup.__table__])
+        
+        columns = await conn.run_sync(_columns, "prices")
+        if "source_id" in columns:
+            print("✅ prices already uses the compact layout")
+            await report(conn, "prices", "current")
+            return
+        await report(conn, "prices", "before")
+        
+        # Register every free-text source that is not known yet
+        await conn.execute(text(
+            "INSERT INTO price_sources (id, name) "
+            "SELECT (SELECT max(id) FROM price_sources) + row_number() OVER (ORDER BY source), source "
+            "FROM (SELECT DISTINCT source FROM prices WHERE source IS NOT NULL) s "
+            "WHERE source NOT IN (SELECT name FROM price_sources)"
+        ))
+        
+        # Move the old table (and its index names) out of the way
+        await conn.execute(text(f"ALTER TABLE prices RENAME TO {OLD_TABLE}"))
+        if conn.dialect.name == "postgresql":
+            indexes = (await conn.execute(
+                text("SELECT indexname FROM pg_indexes WHERE tablename = :table"), {"table": OLD_TABLE}
+            )).scalars().all()
+            for index in indexes:
+                await conn.execute(text(f"ALTER INDEX {index} RENAME TO {index}_uncompacted"))
+            await conn.execute(text(f"ALTER SEQUENCE IF EXISTS prices_id_seq RENAME TO {OLD_TABLE}_id_seq"))
+        else:
+            # SQLite index names are global and cannot be renamed
+            for index in await conn.run_sync(lambda sync_conn: inspect(sync_conn).get_indexes(OLD_TABLE)):
+                await conn.execute(text(f"DROP INDEX {index['name']}"))
+        
+        await conn.run_sync(Price.__table__.create)
+        await match_baseline_prices(conn)
+        if PARTITIONED_PRICES:
+            first, last = (await conn.execute(text(f"SELECT min(price_date), max(price_date) FROM {OLD_TABLE}"))).one()
+            if first is not None:
+                await ensure_price_partitions(conn, first, last)
+            await ensure_upcoming_partitions(conn)
+        
+        copied = await conn.execute(text(
+            f"INSERT INTO prices (id, market_id, commodity_id, min_price, max_price, modal_price, price_date, source_id) "
+            f"SELECT p.id, p.market_id, p.commodity_id, "
+            f"CAST(round(p.min_price * 100) AS INTEGER), CAST(round(p.max_price * 100) AS INTEGER), "
+            f"CAST(round(p.modal_price * 100) AS INTEGER), p.price_date, COALESCE(s.id, {DATA_GOV_SOURCE_ID}) "
+            f"FROM {OLD_TABLE} p LEFT JOIN price_sources s ON s.name = p.source"
+        ))
+        if conn.dialect.name == "postgresql":
+            await conn.execute(text(
+                "SELECT setval(pg_get_serial_sequence('prices', 'id'), COALESCE((SELECT max(id) FROM prices), 0) + 1, false)"
+            ))
+        if not args.keep_old:
+            await conn.execute(text(f"DROP TABLE {OLD_TABLE}"))
+    
+    if conn.dialect.name == "postgresql":
+        # Fresh statistics (and a visibility map) before measuring
+        async with engine.connect() as conn:
+            autocommit = await conn.execution_options(isolation_level="AUTOCOMMIT")
+            await autocommit.execute(text("VACUUM ANALYZE prices"))
+    async with engine.connect() as conn:
+        await report(conn, "prices", "after")
+    print(f"✅ Copied {copied.rowcount} prices into the compact layout" + (f" (kept {OLD_TABLE})" if args.keep_old else ""))
+
+
+async def main(args):
+    try:
+        if args.report:
+            async with engine.connect() as conn:
+                await report(conn, "prices", "current")
+        else:
+            await compact(args)
+    finally:
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Migrate prices to the compact row layout")
+    parser.add_argument("--keep-old", action="store_true", help=f"Keep the old table as {OLD_TABLE}")
+    parser.add_argument("--report", action="store_true", help="Only print size and scan time of the current table")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,48 @@
+"""
+Export price history to a file (or stdout) without loading it into memory.
+
+Usage:
+    python export_prices.py --format parquet --from 2023-01-01 --to 2025-12-31 -o prices.parquet
+    python export_prices.py --state-id 1 --commodity-id 5 > tomato_ap.csv
+"""
+import argparse
+import asyncio
+import sys
+from datetime import date
+
+from app.services.export_service import build_export_query, stream_export, EXPORT_MEDIA_TYPES
+
+
+async def export_prices(args):
+    export = build_export_query(
+        date_from=args.date_from,
+        date_to=args.date_to,
+        state_id=args.state_id,
+        market_id=args.market_id,
+        commodity_id=args.commodity_id
+    )
+    
+    out = open(args.output, "wb") if args.output else sys.stdout.buffer
+    written = 0
+    try:
+        async for chunk in stream_export(export, fmt=args.format):
+            out.write(chunk)
+            written += len(chunk)
+    finally:
+        if args.output:
+            out.close()
+    
+    if args.output:
+        print(f"📦 Wrote {written / 1024:.1f} KiB to {args.output}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Export price history")
+    parser.add_argument("--format", choices=sorted(EXPORT_MEDIA_TYPES), default="csv")
+    parser.add_argument("--from", dest="date_from", type=date.fromisoformat, help="First day (YYYY-MM-DD)")
+    parser.add_argument("--to", dest="date_to", type=date.fromisoformat, help="Last day (YYYY-MM-DD)")
+    parser.add_argument("--state-id", type=int)
+    parser.add_argument("--market-id", type=int)
+    parser.add_argument("--commodity-id", type=int)
+    parser.add_argument("-o", "--output", help="Output file (default: stdout)")
+    asyncio.run(export_prices(parser.parse_args()))
@@ -0,0 +1,128 @@
+"""
+Manage the monthly partitions of the prices table (PostgreSQL only).
+
+Usage:
+    python manage_partitions.py ensure                   # this month +/- the configured window
+    python manage_partitions.py ensure --from 2023-01-01 --to 2026-12-01
+    python manage_partitions.py list
+    python manage_partitions.py drop-before 2024-01-01 [--detach-only]
+    python manage_partitions.py migrate [--keep-old]     # convert an existing plain prices table
+
+A database created before migrations is converted at revision 0001 (see
+compact_prices.py), ready for `alembic stamp 0001`.
+"""
+import argparse
+import asyncio
+import sys
+import time
+from datetime import date
+
+from sqlalchemy import inspect, text
+
+from app.core.database import engine, match_baseline_prices
+from app.core.partitions import (
+    PARTITIONED_PRICES,
+    is_partitioned,
+    ensure_price_partitions,
+    ensure_upcoming_partitions,
+    list_price_partitions,
+    drop_partitions_before,
+)
+from app.models import Price
+
+OLD_SUFFIX = "_unpartitioned"
+
+
+async def ensure(args):
+    async with engine.begin() as conn:
+        if args.date_from and args.date_to:
+            created = await ensure_price_partitions(conn, args.date_from, args.date_to)
+        else:
+            created = await ensure_upcoming_partitions(conn)
+    print(f"✅ Created {len(created)} partitions" + (f": {', '.join(created)}" if created else ""))
+
+
+async def list_partitions(args):
+    async with engine.connect() as conn:
+        for name, lower, upper in await list_price_partitions(conn):
+            rows = (await conn.execute(text(f"SELECT count(*) FROM {name}"))).scalar_one()
+            bounds = f"{lower} .. {upper}" if lower else "DEFAULT"
+            print(f"{name:<20} {bounds:<26} {rows:>10} rows")
+
+
+async def drop_before(args):
+    started = time.perf_counter()
+    async with engine.begin() as conn:
+        removed = await drop_partitions_before(conn, args.cutoff, detach_only=args.detach_only)
+    action = "Detached" if args.detach_only else "Dropped"
+    elapsed = (time.perf_counter() - started) * 1000
+    print(f"🗑️ {action} {len(removed)} partitions in {elapsed:.0f} ms" + (f": {', '.join(removed)}" if removed else ""))
+
+
+async def migrate(args):
+    """Rebuild a plain prices table as a partitioned one, copying every row."""
+    old = "prices" + OLD_SUFFIX
+    
+    async with engine.begin() as conn:
+        if await is_partitioned(conn):
+            print("✅ prices is already partitioned")
+            return
+        
+        # Move the old table, its indexes and id sequence out of the way
+        await conn.execute(text(f"ALTER TABLE prices RENAME TO {old}"))
+        indexes = (await conn.execute(
+            text("SELECT indexname FROM pg_indexes WHERE tablename = :table"), {"table": old}
+        )).scalars().all()
+        for index in indexes:
+            await conn.execute(text(f"ALTER INDEX {index} RENAME TO {index}{OLD_SUFFIX}"))
+        await conn.execute(text(f"ALTER SEQUENCE IF EXISTS prices_id_seq RENAME TO {old}_id_seq"))
+        
+        await conn.run_sync(Price.__table__.create)
+        await match_baseline_prices(conn)
+        existing = await conn.run_sync(lambda sync_conn: {c["name"] for c in inspect(sync_conn).get_columns(old)})
+        columns = ", ".join(column.name for column in Price.__table__.columns if column.name in existing)
+        first, last = (await conn.execute(text(f"SELECT min(price_date), max(price_date) FROM {old}"))).one()
+        await ensure_price_partitions(conn, first or date.today(), last or date.today())
+        await ensure_upcoming_partitions(conn)
+        
+        copied = await conn.execute(text(f"INSERT INTO prices ({columns}) SELECT {columns} FROM {old}"))
+        await conn.execute(text(
+            "SELECT setval(pg_get_serial_sequence('prices', 'id'), COALESCE((SELECT max(id) FROM prices), 0) + 1, false)"
+        ))
+        if not args.keep_old:
+            await conn.execute(text(f"DROP TABLE {old}"))
+    
+    print(f"✅ Copied {copied.rowcount} prices into the partitioned table" + (f" (kept {old})" if args.keep_old else ""))
+
+
+COMMANDS = {"ensure": ensure, "list": list_partitions, "drop-before": drop_before, "migrate": migrate}
+
+
+async def main(args):
+    try:
+        await COMMANDS[args.command](args)
+    finally:
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Manage monthly price partitions")
+    commands = parser.add_subparsers(dest="command", required=True)
+    
+    ensure_parser = commands.add_parser("ensure", help="Create missing partitions")
+    ensure_parser.add_argument("--from", dest="date_from", type=date.fromisoformat, help="First month (YYYY-MM-DD)")
+    ensure_parser.add_argument("--to", dest="date_to", type=date.fromisoformat, help="Last month (YYYY-MM-DD)")
+    
+    commands.add_parser("list", help="Show partitions and their row counts")
+    
+    drop_parser = commands.add_parser("drop-before", help="Remove whole months ending on or before a date")
+    drop_parser.add_argument("cutoff", type=date.fromisoformat, help="Cutoff day (YYYY-MM-DD)")
+    drop_parser.add_argument("--detach-only", action="store_true", help="Keep detached months as standalone tables")
+    
+    migrate_parser = commands.add_parser("migrate", help="Convert a plain prices table to a partitioned one")
+    migrate_parser.add_argument("--keep-old", action="store_true", help=f"Keep the old table as prices{OLD_SUFFIX}")
+    
+    args = parser.parse_args()
+    if not PARTITIONED_PRICES:
+        sys.exit("❌ Price partitioning needs a PostgreSQL DATABASE_URL")
+    asyncio.run(main(args))
@@ -0,0 +1,78 @@
+"""
+Review prices held back by ingestion screening and move accepted ones into
+`prices` (for example after a market switched to per-quintal prices).
+
+Usage:
+    python release_quarantine.py --commodity-id 3                  # list matching rows
+    python release_quarantine.py --commodity-id 3 --market-id 12 --release
+    python release_quarantine.py --id 41 --id 42 --release
+    python release_quarantine.py --reason spike --discard          # drop rows for good
+"""
+import argparse
+import asyncio
+
+from sqlalchemy import select, delete, and_
+
+from app.core.database import engine, AsyncSessionLocal
+from app.models import QuarantinedPrice
+from app.services.screening_service import release_quarantined, REASONS
+
+
+async def main(args):
+    filters = []
+    if args.id:
+        filters.append(QuarantinedPrice.id.in_(args.id))
+    if args.commodity_id is not None:
+        filters.append(QuarantinedPrice.commodity_id == args.commodity_id)
+    if args.market_id is not None:
+        filters.append(QuarantinedPrice.market_id == args.market_id)
+    if args.reason:
+        filters.append(QuarantinedPrice.reason == args.reason)
+    
+    try:
+        async with AsyncSessionLocal() as session:
+            if args.release:
+                released = await release_quarantined(
+                    session,
+                    ids=args.id or None,
+                    commodity_id=args.commodity_id,
+                    market_id=args.market_id,
+                    reason=args.reason
+                )
+                await session.commit()
+                print(f"✅ Released {len(released)} quarantined prices into prices")
+                return
+            if args.discard:
+                result = await session.execute(delete(QuarantinedPrice).where(and_(*filters)))
+                await session.commit()
+                print(f"🗑️ Discarded {result.rowcount} quarantined prices")
+                return
+            
+            query = select(QuarantinedPrice).order_by(QuarantinedPrice.price_date, QuarantinedPrice.id)
+            if filters:
+                query = query.where(and_(*filters))
+            rows = (await session.execute(query)).scalars().all()
+    finally:
+        await engine.dispose()
+    
+    for row in rows:
+        print(
+            f"{row.id:>8}  {row.price_date}  commodity {row.commodity_id:<5} market {row.market_id:<6}"
+            f" modal {row.modal_price:>10.2f}  baseline {row.baseline_price or '-':>10}  {row.reason}"
+        )
+    print(f"🚧 {len(rows)} quarantined prices (pass --release to move them into prices)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Review and release quarantined prices")
+    parser.add_argument("--id", type=int, action="append", help="Quarantined row id (repeatable)")
+    parser.add_argument("--commodity-id", type=int)
+    parser.add_argument("--market-id", type=int)
+    parser.add_argument("--reason", choices=REASONS)
+    action = parser.add_mutually_exclusive_group()
+    action.add_argument("--release", action="store_true", help="Move the matching rows into prices")
+    action.add_argument("--discard", action="store_true", help="Delete the matching rows")
+    args = parser.parse_args()
+    if (args.release or args.discard) and not (args.id or args.commodity_id or args.market_id or args.reason):
+        parser.error("--release and --discard need --id, --commodity-id, --market-id or --reason")
+    asyncio.run(main(args))
@@ -8,7 +8,7 @@ import random
 from datetime import date, timedelta
 from sqlalchemy import select, delete
 from app.core.database import AsyncSessionLocal
-from app.models import Market, Commodity, Price
+from app.models import Market, Commodity, Price, SEED_SOURCE_ID
 
 # Base prices for each commodity (realistic values)
 BASE_PRICES = {
@@ -103,7 +103,7 @@ async def seed_historical_data():
                             min_price=max(5, min_price),
                             max_price=max_price,
                             modal_price=modal_price,
-                            source="seed_data"
+                            source_id=SEED_SOURCE_ID
                         )
                         session.add(price)
                         prices_added += 1
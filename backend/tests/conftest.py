@@ -0,0 +1,31 @@
+"""
+Shared test setup: every test runs against a throwaway SQLite database,
+migrated at app startup. The environment is set before `app` is imported.
+"""
+
+import os
+import tempfile
+
+import pytest
+
+_DATA_DIR = tempfile.mkdtemp(prefix="bazaarsetu-tests-")
+os.environ["DATABASE_URL"] = f"sqlite+aiosqlite:///{_DATA_DIR}/test.db"
+os.environ["DB_AUTO_MIGRATE"] = "true"
+os.environ["WARMUP_ENABLED"] = "false"
+os.environ["PRICE_ARCHIVE_DIR"] = f"{_DATA_DIR}/archive"
+
+
+@pytest.fixture(scope="session")
+def client():
+    """A client for the app with its lifespan running (one event loop for the whole session)."""
+    from starlette.testclient import TestClient
+    from app.main import app
+    
+    with TestClient(app) as test_client:
+        yield test_client
+
+
+@pytest.fixture
+def run(client):
+    """Run a coroutine on the app's event loop (the database engine is bound to it)."""
+    return client.portal.call
@@ -0,0 +1,30 @@
+"""Triggered alerts carry the owner's push preference, so instant pushes respect it."""
+
+from sqlalchemy import delete
+
+from app.core.database import AsyncSessionLocal
+from app.models import User, Commodity, PriceAlert, Price
+from app.services.alert_service import AlertService
+
+COMMODITY_ID = 903
+
+
+def test_triggered_alerts_carry_push_enabled(run):
+    async def trigger():
+        async with AsyncSessionLocal() as session:
+            session.add(Commodity(id=COMMODITY_ID, name="Trigger Chilli"))
+            for user_id, push_enabled in ((903, True), (904, False)):
+                session.add(User(id=user_id, fcm_token=f"token-{user_id}", push_enabled=push_enabled))
+                session.add(PriceAlert(user_id=user_id, commodity_id=COMMODITY_ID, threshold_price=50, alert_type="below"))
+            await session.commit()
+            try:
+                price = Price(commodity_id=COMMODITY_ID, market_id=1, modal_price=40)
+                return await AlertService(session).check_and_trigger_alerts([price])
+            finally:
+                await session.execute(delete(PriceAlert).where(PriceAlert.commodity_id == COMMODITY_ID))
+                await session.execute(delete(User).where(User.id.in_([903, 904])))
+                await session.execute(delete(Commodity).where(Commodity.id == COMMODITY_ID))
+                await session.commit()
+    
+    triggered = {alert["user_id"]: alert["push_enabled"] for alert in run(trigger)}
+    assert triggered == {903: True, 904: False}
@@ -0,0 +1,83 @@
+"""Reads that span archived months: trends merge by day, exports include the archived rows."""
+
+import csv
+import io
+import json
+from datetime import date, timedelta
+
+import pyarrow.parquet as pq
+import pytest
+from sqlalchemy import delete
+
+from app.core.database import AsyncSessionLocal
+from app.models import State, Market, Commodity, Price, PriceRollup
+from app.services.archive_service import archive_cutoff, archive_prices, price_archive
+from app.services.price_service import _TrendRow, _merge_days
+
+STATE_ID, MARKET_ID, COMMODITY_ID = 906, 906, 906
+
+
+def test_backfilled_day_is_merged_into_its_archived_row():
+    day = date(2026, 1, 5)
+    archived = [
+        _TrendRow(1, "Tomato", None, None, day, total=80.0, count=2, low=38.0, high=42.0),
+        _TrendRow(1, "Tomato", None, None, day + timedelta(days=1), total=41.0, count=1, low=41.0, high=41.0),
+    ]
+    backfilled = [_TrendRow(1, "Tomato", None, None, day, total=50.0, count=1, low=50.0, high=50.0)]
+    
+    merged = _merge_days(archived + backfilled)
+    assert [row.price_date for row in merged] == [day, day + timedelta(days=1)]
+    assert (merged[0].total, merged[0].count, merged[0].low, merged[0].high) == (130.0, 3, 38.0, 50.0)
+
+
+@pytest.fixture
+def archived(run):
+    """One price old enough to be archived (and archived) and one recent one."""
+    old_day, recent_day = archive_cutoff() - timedelta(days=40), archive_cutoff()
+    
+    async def seed():
+        async with AsyncSessionLocal() as session:
+            session.add(State(id=STATE_ID, name="Archive State", code="ARC"))
+            session.add(Market(id=MARKET_ID, name="Archive Market", state_id=STATE_ID, district="Old Town"))
+            session.add(Commodity(id=COMMODITY_ID, name="Archive Brinjal"))
+            session.add_all(
+                Price(commodity_id=COMMODITY_ID, market_id=MARKET_ID, min_price=amount - 2, max_price=amount + 2, modal_price=amount, price_date=day)
+                for day, amount in ((old_day, 31.5), (recent_day, 35.0))
+            )
+            await session.commit()
+        return await archive_prices()
+    
+    async def clean():
+        async with AsyncSessionLocal() as session:
+            await session.execute(delete(Price).where(Price.commodity_id == COMMODITY_ID))
+            await session.execute(delete(PriceRollup).where(PriceRollup.commodity_id == COMMODITY_ID))
+            await session.execute(delete(Commodity).where(Commodity.id == COMMODITY_ID))
+            await session.execute(delete(Market).where(Market.id == MARKET_ID))
+            await session.execute(delete(State).where(State.id == STATE_ID))
+            await session.commit()
+    
+    assert run(seed) == {old_day.replace(day=1): 1}
+    yield old_day, recent_day
+    run(clean)
+    price_archive.path(old_day.replace(day=1)).unlink()
+
+
+def test_export_streams_archived_months_ahead_of_live_rows(client, archived):
+    old_day, recent_day = archived
+    params = {"date_from": old_day.isoformat(), "commodity_id": COMMODITY_ID}
+    
+    response = client.get("/api/v1/prices/export", params={**params, "format": "ndjson"})
+    assert response.status_code == 200
+    rows = [json.loads(line) for line in response.text.splitlines()]
+    assert [(row["price_date"], row["modal_price"]) for row in rows] == [(old_day.isoformat(), 31.5), (recent_day.isoformat(), 35.0)]
+    assert rows[0] == {**rows[1], "price_date": old_day.isoformat(), "min_price": 29.5, "max_price": 33.5, "modal_price": 31.5}
+    
+    csv_rows = list(csv.reader(io.StringIO(client.get("/api/v1/prices/export", params=params).text)))
+    assert csv_rows[1] == [old_day.isoformat(), "Archive State", "Old Town", str(MARKET_ID), "Archive Market", str(COMMODITY_ID), "Archive Brinjal", "29.5", "33.5", "31.5"]
+    
+    table = pq.read_table(io.BytesIO(client.get("/api/v1/prices/export", params={**params, "format": "parquet"}).content))
+    assert table["price_date"].to_pylist() == [old_day, recent_day]
+    
+    # Filters apply to archived rows too
+    other_state = client.get("/api/v1/prices/export", params={**params, "format": "ndjson", "state_id": STATE_ID + 1})
+    assert other_state.text == ""
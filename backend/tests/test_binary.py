@@ -0,0 +1,22 @@
+"""Negotiated endpoints vary on Accept, whichever body they send."""
+
+import pytest
+
+from app.core.binary import MSGPACK_MEDIA_TYPE
+from app.core.cache import response_cache
+
+
+@pytest.mark.parametrize("path", [
+    "/api/v1/prices/today",
+    "/api/v1/prices/today?fields=commodity_name,modal_price",
+    "/api/v1/prices/trends?commodity_ids=1",
+    "/api/v1/prices/stats?commodity_ids=1",
+    "/api/v1/sync",
+])
+@pytest.mark.parametrize("accept", ["application/json", MSGPACK_MEDIA_TYPE])
+def test_negotiated_responses_vary_on_accept(client, path, accept):
+    response_cache.clear()
+    response = client.get(path, headers={"Accept": accept})
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith(accept)
+    assert "accept" in [value.strip().lower() for value in response.headers["vary"].split(",")]
@@ -0,0 +1,67 @@
+"""Bulk alert endpoints report every item on its own: missing references, repeats, no-op updates."""
+
+import pytest
+from sqlalchemy import delete
+
+from app.core.database import AsyncSessionLocal
+from app.models import User, Commodity, PriceAlert
+
+USER_ID, COMMODITY_ID = 902, 902
+
+
+@pytest.fixture
+def user(run):
+    async def seed():
+        async with AsyncSessionLocal() as session:
+            session.add(User(id=USER_ID, phone="9000000902"))
+            session.add(Commodity(id=COMMODITY_ID, name="Bulk Onion"))
+            await session.commit()
+    
+    async def clean():
+        async with AsyncSessionLocal() as session:
+            await session.execute(delete(PriceAlert).where(PriceAlert.user_id == USER_ID))
+            await session.execute(delete(Commodity).where(Commodity.id == COMMODITY_ID))
+            await session.execute(delete(User).where(User.id == USER_ID))
+            await session.commit()
+    
+    run(seed)
+    yield
+    run(clean)
+
+
+def _create(client, user_id, alerts):
+    response = client.post("/api/v1/alerts/bulk", json={"user_id": user_id, "alerts": alerts})
+    assert response.status_code == 200
+    return response.json()
+
+
+def test_bulk_create_reports_unknown_references(client, user):
+    body = _create(client, USER_ID, [
+        {"commodity_id": COMMODITY_ID, "threshold_price": 30},
+        {"commodity_id": 99999, "threshold_price": 30},
+        {"commodity_id": COMMODITY_ID, "market_id": 99999, "threshold_price": 30},
+    ])
+    assert [r["status"] for r in body["results"]] == ["created", "not_found", "not_found"]
+    assert (body["succeeded"], body["failed"]) == (1, 2)
+    
+    body = _create(client, 99999, [{"commodity_id": COMMODITY_ID, "threshold_price": 30}])
+    assert body["results"][0]["status"] == "not_found"
+
+
+def test_bulk_update_reports_repeats_and_unchanged(client, user):
+    created = _create(client, USER_ID, [
+        {"commodity_id": COMMODITY_ID, "threshold_price": 30},
+        {"commodity_id": COMMODITY_ID, "threshold_price": 50},
+    ])["results"]
+    first, second = (r["id"] for r in created)
+    
+    response = client.patch("/api/v1/alerts/bulk", json={"user_id": USER_ID, "alerts": [
+        {"id": first, "threshold_price": 25},
+        {"id": first, "threshold_price": 20},
+        {"id": second, "threshold_price": 50},
+        {"id": 99999, "threshold_price": 10},
+    ]})
+    results = response.json()["results"]
+    assert [r["status"] for r in results] == ["updated", "invalid", "unchanged", "not_found"]
+    assert results[0]["alert"]["threshold_price"] == 25
+    assert results[2]["alert"]["threshold_price"] == 50
@@ -0,0 +1,73 @@
+"""Market comparison: cheapest first, or ranked by price plus travel cost from a location."""
+
+from datetime import date
+
+import pytest
+from sqlalchemy import delete
+
+from app.core.cache import response_cache
+from app.core.database import AsyncSessionLocal
+from app.models import State, Market, Commodity, Price
+
+STATE_ID, COMMODITY_ID = 917, 917
+LAT, LON = 10.0, 77.0
+# (market id, name, km north of the point or None without coordinates, modal price)
+MARKETS = [
+    (917, "Near Market", 2, 30.0),
+    (918, "Far Market", 40, 24.0),
+    (919, "Unmapped Market", None, 10.0),
+]
+
+
+@pytest.fixture
+def prices(run):
+    async def seed():
+        async with AsyncSessionLocal() as session:
+            session.add(State(id=STATE_ID, name="Compare State", code="CMP"))
+            session.add(Commodity(id=COMMODITY_ID, name="Compare Cabbage"))
+            for market_id, name, km, price in MARKETS:
+                session.add(Market(
+                    id=market_id, name=name, state_id=STATE_ID, district="Test",
+                    latitude=None if km is None else LAT + km / 111.2, longitude=None if km is None else LON
+                ))
+                session.add(Price(commodity_id=COMMODITY_ID, market_id=market_id, min_price=price, max_price=price, modal_price=price, price_date=date.today()))
+            await session.commit()
+    
+    async def clean():
+        async with AsyncSessionLocal() as session:
+            await session.execute(delete(Price).where(Price.commodity_id == COMMODITY_ID))
+            await session.execute(delete(Commodity).where(Commodity.id == COMMODITY_ID))
+            await session.execute(delete(Market).where(Market.state_id == STATE_ID))
+            await session.execute(delete(State).where(State.id == STATE_ID))
+            await session.commit()
+    
+    run(seed)
+    yield
+    run(clean)
+
+
+def _compare(client, **params):
+    response_cache.clear()
+    response = client.get(f"/api/v1/prices/compare/{COMMODITY_ID}", params=params)
+    assert response.status_code == 200
+    return response.json()["markets"]
+
+
+def test_without_a_location_the_cheapest_market_comes_first(client, prices):
+    assert [market["market_name"] for market in _compare(client)] == ["Unmapped Market", "Far Market", "Near Market"]
+
+
+def test_travel_cost_can_outweigh_a_lower_price(client, prices):
+    free_travel = _compare(client, lat=LAT, lon=LON)
+    assert [market["market_name"] for market in free_travel] == ["Far Market", "Near Market", "Unmapped Market"]
+    
+    costly_travel = _compare(client, lat=LAT, lon=LON, cost_per_km=0.5, quantity=2)
+    assert [market["market_name"] for market in costly_travel] == ["Near Market", "Far Market", "Unmapped Market"]
+    near = costly_travel[0]
+    assert near["effective_cost"] == pytest.approx(30.0 * 2 + 0.5 * near["distance_km"], abs=0.01)
+    assert (costly_travel[-1]["distance_km"], costly_travel[-1]["effective_cost"]) == (None, None)
+
+
+def test_limit_keeps_the_best_ranked_markets(client, prices):
+    best = _compare(client, lat=LAT, lon=LON, cost_per_km=0.5, limit=1)
+    assert [market["market_name"] for market in best] == ["Near Market"]
@@ -0,0 +1,37 @@
+"""Response cache and CORS: cached bodies must not carry another caller's CORS headers."""
+
+import pytest
+
+from app.core.cache import response_cache
+
+PATH = "/api/v1/states"
+
+
+@pytest.fixture(autouse=True)
+def empty_cache():
+    response_cache.clear()
+    yield
+    response_cache.clear()
+
+
+def test_cached_response_gets_cors_headers_for_a_later_origin(client):
+    first = client.get(PATH)
+    assert first.headers["x-cache"] == "MISS"
+    assert "access-control-allow-origin" not in first.headers
+    
+    second = client.get(PATH, headers={"Origin": "https://app.example"})
+    assert second.headers["x-cache"] == "HIT"
+    assert second.headers["access-control-allow-origin"] == "https://app.example"
+
+
+def test_cached_response_does_not_replay_the_first_origin(client):
+    first = client.get(PATH, headers={"Origin": "https://one.example"})
+    assert first.headers["access-control-allow-origin"] == "https://one.example"
+    
+    second = client.get(PATH, headers={"Origin": "https://two.example"})
+    assert second.headers["x-cache"] == "HIT"
+    assert second.headers["access-control-allow-origin"] == "https://two.example"
+    
+    third = client.get(PATH)
+    assert third.headers["x-cache"] == "HIT"
+    assert "access-control-allow-origin" not in third.headers
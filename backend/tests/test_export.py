@@ -0,0 +1,84 @@
+"""Exports stream in batches: one CSV header, one Parquet row group per batch, filters applied."""
+
+import csv
+import io
+import json
+from datetime import date, timedelta
+
+import pyarrow.parquet as pq
+import pytest
+from sqlalchemy import delete
+
+from app.core.database import AsyncSessionLocal
+from app.models import State, Market, Commodity, Price
+from app.services.export_service import EXPORT_COLUMNS, build_export_query, stream_export
+
+STATE_ID, MARKET_ID, COMMODITY_ID = 913, 913, 913
+DAYS = 5
+
+
+@pytest.fixture
+def prices(run):
+    """One price a day for the last five days."""
+    async def seed():
+        async with AsyncSessionLocal() as session:
+            session.add(State(id=STATE_ID, name="Export State", code="EXP"))
+            session.add(Market(id=MARKET_ID, name="Export Market", state_id=STATE_ID, district="Export District"))
+            session.add(Commodity(id=COMMODITY_ID, name="Export Carrot"))
+            session.add_all(
+                Price(commodity_id=COMMODITY_ID, market_id=MARKET_ID, min_price=20 + day, max_price=30 + day, modal_price=25 + day, price_date=date.today() - timedelta(days=day))
+                for day in range(DAYS)
+            )
+            await session.commit()
+    
+    async def clean():
+        async with AsyncSessionLocal() as session:
+            await session.execute(delete(Price).where(Price.commodity_id == COMMODITY_ID))
+            await session.execute(delete(Commodity).where(Commodity.id == COMMODITY_ID))
+            await session.execute(delete(Market).where(Market.id == MARKET_ID))
+            await session.execute(delete(State).where(State.id == STATE_ID))
+            await session.commit()
+    
+    run(seed)
+    yield
+    run(clean)
+
+
+def _export(run, fmt, **filters):
+    async def collect():
+        export = build_export_query(commodity_id=COMMODITY_ID, **filters)
+        return [chunk async for chunk in stream_export(export, fmt=fmt, batch_size=2)]
+    return run(collect)
+
+
+def test_csv_is_streamed_in_batches_with_one_header(run, prices):
+    chunks = _export(run, "csv")
+    assert len(chunks) == 3  # 2 + 2 + 1 rows
+    rows = list(csv.reader(io.StringIO(b"".join(chunks).decode("utf-8"))))
+    assert rows[0] == EXPORT_COLUMNS
+    assert [row[0] for row in rows[1:]] == [(date.today() - timedelta(days=day)).isoformat() for day in reversed(range(DAYS))]
+    assert rows[-1][1:] == ["Export State", "Export District", str(MARKET_ID), "Export Market", str(COMMODITY_ID), "Export Carrot", "20.0", "30.0", "25.0"]
+
+
+def test_parquet_has_one_row_group_per_batch(run, prices):
+    parquet = pq.ParquetFile(io.BytesIO(b"".join(_export(run, "parquet"))))
+    assert parquet.metadata.num_row_groups == 3
+    table = parquet.read()
+    assert table.column_names == EXPORT_COLUMNS
+    assert table["modal_price"].to_pylist() == [29.0, 28.0, 27.0, 26.0, 25.0]
+
+
+def test_ndjson_honours_the_date_range(run, prices):
+    yesterday = date.today() - timedelta(days=1)
+    lines = b"".join(_export(run, "ndjson", date_from=yesterday, date_to=yesterday)).splitlines()
+    assert [json.loads(line)["modal_price"] for line in lines] == [26.0]
+
+
+def test_empty_csv_export_still_has_its_header(run, prices):
+    assert _export(run, "csv", state_id=STATE_ID + 1) == [(",".join(EXPORT_COLUMNS) + "\r\n").encode("utf-8")]
+
+
+def test_export_endpoint_rejects_a_reversed_range(client):
+    today = date.today()
+    params = {"date_from": today.isoformat(), "date_to": (today - timedelta(days=1)).isoformat()}
+    assert client.get("/api/v1/prices/export", params=params).status_code == 400
@@ -0,0 +1,82 @@
+"""fields= and lang=: only the requested columns come back, names in the requested language."""
+
+from datetime import date
+
+import pytest
+from sqlalchemy import delete
+
+from app.core.cache import response_cache
+from app.core.database import AsyncSessionLocal
+from app.models import State, Market, Commodity, Price
+
+STATE_ID, MARKET_ID = 909, 909
+TRANSLATED_ID, ENGLISH_ONLY_ID = 909, 910
+
+
+@pytest.fixture
+def catalog(run):
+    """A commodity with Telugu and Hindi names, one without, and a price for each today."""
+    async def seed():
+        async with AsyncSessionLocal() as session:
+            session.add(State(id=STATE_ID, name="Fields State", code="FLD"))
+            session.add(Market(id=MARKET_ID, name="Fields Market", name_hindi="फ़ील्ड्स मंडी", state_id=STATE_ID, district="Test"))
+            session.add(Commodity(id=TRANSLATED_ID, name="Fields Onion", name_telugu="ఉల్లిపాయ", name_hindi="प्याज", category="fieldtest"))
+            session.add(Commodity(id=ENGLISH_ONLY_ID, name="Fields Radish", category="fieldtest"))
+            session.add_all(
+                Price(commodity_id=commodity_id, market_id=MARKET_ID, min_price=20, max_price=30, modal_price=25, price_date=date.today())
+                for commodity_id in (TRANSLATED_ID, ENGLISH_ONLY_ID)
+            )
+            await session.commit()
+    
+    async def clean():
+        async with AsyncSessionLocal() as session:
+            await session.execute(delete(Price).where(Price.market_id == MARKET_ID))
+            await session.execute(delete(Commodity).where(Commodity.category == "fieldtest"))
+            await session.execute(delete(Market).where(Market.id == MARKET_ID))
+            await session.execute(delete(State).where(State.id == STATE_ID))
+            await session.commit()
+    
+    run(seed)
+    response_cache.clear()
+    yield
+    run(clean)
+
+
+def test_catalog_fields_keep_request_order(client, catalog):
+    response = client.get("/api/v1/commodities", params={"category": "fieldtest", "fields": "unit,name"})
+    assert response.status_code == 200
+    assert response.json() == [{"unit": "kg", "name": "Fields Onion"}, {"unit": "kg", "name": "Fields Radish"}]
+    assert [list(item) for item in response.json()] == [["unit", "name"]] * 2
+
+
+def test_catalog_lang_localizes_names_with_english_fallback(client, catalog):
+    response = client.get("/api/v1/commodities", params={"category": "fieldtest", "lang": "te"})
+    items = response.json()
+    assert [item["name"] for item in items] == ["ఉల్లిపాయ", "Fields Radish"]
+    assert not any(key.endswith(("_telugu", "_hindi")) for key in items[0])
+
+
+@pytest.mark.parametrize("path", ["/api/v1/states", "/api/v1/markets", "/api/v1/commodities"])
+def test_catalog_projection_hides_internal_columns(client, catalog, path):
+    assert all("change_seq" not in item for item in client.get(path, params={"lang": "en"}).json())
+    
+    response = client.get(path, params={"fields": "id,change_seq"})
+    assert response.status_code == 400
+    assert "change_seq" in response.json()["detail"]
+
+
+def test_price_fields_and_lang(client, catalog):
+    params = {"market_id": MARKET_ID, "fields": "commodity_name,market_name,modal_price", "lang": "hi"}
+    response = client.get("/api/v1/prices/today", params=params)
+    assert response.status_code == 200
+    # Sorted by the localized name
+    assert response.json() == [
+        {"commodity_name": "Fields Radish", "market_name": "फ़ील्ड्स मंडी", "modal_price": 25.0},
+        {"commodity_name": "प्याज", "market_name": "फ़ील्ड्स मंडी", "modal_price": 25.0},
+    ]
+
+
+def test_unknown_fields_are_rejected(client):
+    response = client.get("/api/v1/prices/today", params={"fields": "commodity_name,secret"})
+    assert response.status_code == 400
+    assert "secret" in response.json()["detail"]
@@ -0,0 +1,146 @@
+"""Nearby search: location indexes expire, market changes reach cached responses, and filtered vendor searches still fill their limit."""
+
+import asyncio
+import time
+
+import pytest
+from sqlalchemy import delete
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+from app.core.cache import response_cache
+from app.core.config import get_settings
+from app.core.database import AsyncSessionLocal
+from app.models import State, Market, Vendor
+from app.services import broker, location_indexes, find_nearby_vendors, GEO_CHANNEL
+
+STATE_ID, MARKET_ID = 904, 904
+LAT, LON = -33.9, 18.4  # Far from every seeded market
+
+
+@pytest.fixture
+def state(run):
+    async def seed():
+        async with AsyncSessionLocal() as session:
+            session.add(State(id=STATE_ID, name="Geo State", code="GEO"))
+            await session.commit()
+    
+    async def clean():
+        async with AsyncSessionLocal() as session:
+            await session.execute(delete(Vendor).where(Vendor.name.like("Geo Vendor%")))
+            await session.execute(delete(Market).where(Market.state_id == STATE_ID))
+            await session.execute(delete(State).where(State.id == STATE_ID))
+            await session.commit()
+    
+    run(seed)
+    yield
+    run(clean)
+    location_indexes.invalidate()
+
+
+def _nearby_ids(client) -> list:
+    response_cache.clear()
+    response = client.get("/api/v1/markets/nearby", params={"lat": LAT, "lon": LON, "radius_km": 50})
+    return [market["id"] for market in response.json()]
+
+
+@pytest.fixture
+def markets(run, state):
+    """Markets about 1, 5, 20 and 120 km north of the point, added out of order."""
+    async def seed():
+        async with AsyncSessionLocal() as session:
+            session.add_all(
+                Market(id=MARKET_ID + offset, name=f"Geo Market {km} km", state_id=STATE_ID, district="Test", latitude=LAT + km / 111.2, longitude=LON)
+                for offset, km in enumerate((20, 1, 120, 5))
+            )
+            await session.commit()
+    
+    run(seed)
+    location_indexes.invalidate("markets")
+
+
+def test_nearby_markets_come_closest_first(client, markets):
+    response_cache.clear()
+    response = client.get("/api/v1/markets/nearby", params={"lat": LAT, "lon": LON, "radius_km": 50})
+    nearby = response.json()
+    assert [market["name"] for market in nearby] == ["Geo Market 1 km", "Geo Market 5 km", "Geo Market 20 km"]
+    assert [round(market["distance_km"]) for market in nearby] == [1, 5, 20]
+    
+    # Without a radius: the k nearest, however far
+    response_cache.clear()
+    nearest = client.get("/api/v1/markets/nearby", params={"lat": LAT, "lon": LON, "limit": 4}).json()
+    assert [market["name"] for market in nearest] == ["Geo Market 1 km", "Geo Market 5 km", "Geo Market 20 km", "Geo Market 120 km"]
+
+
+def test_market_index_is_rebuilt_after_the_fallback_ttl(client, run, state):
+    assert MARKET_ID not in _nearby_ids(client)
+    
+    # Written without a GEO_CHANNEL message, like a script on the local broker
+    async def add_market():
+        async with AsyncSessionLocal() as session:
+            session.add(Market(id=MARKET_ID, name="Geo Market", state_id=STATE_ID, district="Test", latitude=LAT, longitude=LON))
+            await session.commit()
+    
+    run(add_market)
+    assert MARKET_ID not in _nearby_ids(client)
+    
+    index, _ = location_indexes._indexes["markets"]
+    location_indexes._indexes["markets"] = (index, time.monotonic() - get_settings().cache_fallback_ttl_seconds - 1)
+    assert MARKET_ID in _nearby_ids(client)
+
+
+def test_published_market_change_drops_cached_market_responses(client, run, state):
+    assert MARKET_ID not in _nearby_ids(client)
+    cached = client.get("/api/v1/markets/nearby", params={"lat": LAT, "lon": LON, "radius_km": 50})
+    assert cached.headers["x-cache"] == "HIT"
+    
+    async def add_market():
+        async with AsyncSessionLocal() as session:
+            session.add(Market(id=MARKET_ID, name="Geo Market", state_id=STATE_ID, district="Test", latitude=LAT, longitude=LON))
+            await session.commit()
+        await broker.publish(GEO_CHANNEL, "markets")
+        await asyncio.sleep(0.05)  # Let the listener task handle the message
+    
+    run(add_market)
+    response = client.get("/api/v1/markets/nearby", params={"lat": LAT, "lon": LON, "radius_km": 50})
+    assert response.headers["x-cache"] == "MISS"
+    assert MARKET_ID in [market["id"] for market in response.json()]
+
+
+@pytest.fixture
+def vendors(run, state):
+    """Ten unverified vendors right at the point and two verified ones a little further out."""
+    async def seed():
+        async with AsyncSessionLocal() as session:
+            session.add_all(
+                Vendor(name=f"Geo Vendor {i}", latitude=LAT + i * 0.0001, longitude=LON, is_verified=False)
+                for i in range(10)
+            )
+            session.add_all(
+                Vendor(name=f"Geo Vendor verified {i}", latitude=LAT + 0.01 + i * 0.001, longitude=LON, is_verified=True)
+                for i in range(2)
+            )
+            await session.commit()
+    
+    run(seed)
+    location_indexes.invalidate("vendors")
+
+
+def test_filtered_vendor_search_fills_its_limit(client, vendors):
+    response_cache.clear()
+    response = client.get("/api/v1/vendors/nearby", params={"lat": LAT, "lon": LON, "limit": 2, "verified_only": True})
+    assert [vendor["name"] for vendor in response.json()] == ["Geo Vendor verified 0", "Geo Vendor verified 1"]
+
+
+def test_vendors_missing_on_the_replica_come_from_the_primary(run, vendors):
+    async def search():
+        # A replica that has not received any vendor yet
+        replica = create_async_engine("sqlite+aiosqlite://")
+        async with replica.begin() as conn:
+            await conn.run_sync(Vendor.__table__.create)
+        try:
+            async with AsyncSession(replica) as session:
+                return await find_nearby_vendors(session, LAT, LON, limit=3)
+        finally:
+            await replica.dispose()
+    
+    assert [vendor.name for vendor, _ in run(search)] == ["Geo Vendor 0", "Geo Vendor 1", "Geo Vendor 2"]
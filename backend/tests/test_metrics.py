@@ -0,0 +1,58 @@
+"""Connection pool metrics in the Prometheus text format."""
+
+import re
+
+import pytest
+from sqlalchemy import exc, text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app.core.database import InstrumentedPool
+from app.core.metrics import Histogram, pool_metrics
+
+
+def _value(text: str, name: str) -> float:
+    return float(re.search(rf"^{name} (\S+)$", text, re.MULTILINE).group(1))
+
+
+def test_histogram_buckets_are_cumulative():
+    histogram = Histogram([0.1, 1])
+    for value in (0.05, 0.1, 0.5, 3):
+        histogram.observe(value)
+    assert histogram.render("wait") == [
+        'wait_bucket{le="0.1"} 2',
+        'wait_bucket{le="1"} 3',
+        'wait_bucket{le="+Inf"} 4',
+        "wait_sum 3.650000",
+        "wait_count 4",
+    ]
+
+
+def test_instrumented_pool_times_checkouts_and_counts_timeouts(run, tmp_path):
+    async def exhaust():
+        engine = create_async_engine(
+            f"sqlite+aiosqlite:///{tmp_path}/pool.db",
+            poolclass=InstrumentedPool, pool_size=1, max_overflow=0, pool_timeout=0.05
+        )
+        try:
+            async with engine.connect() as held:
+                await held.execute(text("SELECT 1"))
+                with pytest.raises(exc.TimeoutError):
+                    async with engine.connect():
+                        pass
+        finally:
+            await engine.dispose()
+    
+    checkouts, timeouts = pool_metrics.checkout_seconds.count, pool_metrics.checkout_timeouts
+    run(exhaust)
+    assert pool_metrics.checkout_seconds.count == checkouts + 2
+    assert pool_metrics.checkout_timeouts == timeouts + 1
+
+
+def test_metrics_endpoint_exposes_the_pool(client):
+    assert client.get("/api/v1/states").status_code == 200
+    metrics = client.get("/metrics").text
+    
+    assert _value(metrics, "db_pool_connections_opened_total") >= 1
+    assert _value(metrics, "db_pool_checked_out") >= 0
+    assert "# TYPE db_pool_checkout_seconds histogram" in metrics
+    assert 'app_startup_seconds{phase="total"}' in metrics
@@ -0,0 +1,23 @@
+"""The startup schema check expects the head of alembic/versions."""
+
+import pytest
+from sqlalchemy import text
+
+from app.core.database import engine, check_schema_version
+from app.core.migrations import head_revision
+
+
+def test_schema_check_expects_the_migration_head(run):
+    assert run(check_schema_version) == head_revision()
+    
+    async def check_at(revision):
+        async with engine.begin() as conn:
+            await conn.execute(text("UPDATE alembic_version SET version_num = :revision"), {"revision": revision})
+        try:
+            await check_schema_version()
+        finally:
+            async with engine.begin() as conn:
+                await conn.execute(text("UPDATE alembic_version SET version_num = :revision"), {"revision": head_revision()})
+    
+    with pytest.raises(RuntimeError, match=f"expected {head_revision()}"):
+        run(check_at, "0001")
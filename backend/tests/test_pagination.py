@@ -0,0 +1,81 @@
+"""Keyset cursors: pages follow on from each other, and tampered or mismatched keys are a 400, never a 500."""
+
+from datetime import date
+
+import pytest
+from sqlalchemy import delete
+
+from app.core.cache import response_cache
+from app.core.database import AsyncSessionLocal
+from app.core.pagination import NEXT_CURSOR_HEADER, NUMBER, decode_cursor, encode_cursor
+from app.models import State, Market, Commodity, Price
+
+STATE_ID, COMMODITY_ID = 905, 905
+MARKET_IDS = range(905, 910)
+
+
+@pytest.mark.parametrize("values", [[1, 2], ["2026-01-01T00:00:00"], ["2026-01-01T00:00:00", 1, 2], [None, 1], "k"])
+def test_decode_cursor_rejects_keys_of_the_wrong_shape(values):
+    with pytest.raises(ValueError):
+        decode_cursor(encode_cursor("alerts:created", values), "alerts:created", (str, int))
+
+
+def test_decode_cursor_accepts_whole_numbers_for_numeric_keys():
+    cursor = encode_cursor("prices:price:asc:en", [40, 7])
+    assert decode_cursor(cursor, "prices:price:asc:en", (NUMBER, int)) == [40, 7]
+
+
+def test_markets_cursor_with_wrong_key_types_is_rejected(client):
+    response = client.get("/api/v1/markets", params={"limit": 5, "cursor": encode_cursor("markets:name", [1, 2])})
+    assert response.status_code == 400
+
+
+def test_prices_cursor_with_wrong_key_count_is_rejected(client):
+    cursor = encode_cursor("prices:name:asc:en", ["tomato"])
+    response = client.get("/api/v1/prices/today", params={"cursor": cursor})
+    assert response.status_code == 400
+
+
+@pytest.fixture
+def prices(run):
+    """Five of today's prices for one commodity, with fractional rupee amounts."""
+    async def seed():
+        async with AsyncSessionLocal() as session:
+            session.add(State(id=STATE_ID, name="Cursor State", code="CUR"))
+            session.add(Commodity(id=COMMODITY_ID, name="Cursor Okra"))
+            session.add_all(
+                Market(id=market_id, name=f"Cursor Market {market_id}", state_id=STATE_ID, district="Test")
+                for market_id in MARKET_IDS
+            )
+            session.add_all(
+                Price(commodity_id=COMMODITY_ID, market_id=market_id, min_price=amount, max_price=amount, modal_price=amount, price_date=date.today())
+                for market_id, amount in zip(MARKET_IDS, (22.5, 18.25, 30.0, 22.75, 19.5))
+            )
+            await session.commit()
+    
+    async def clean():
+        async with AsyncSessionLocal() as session:
+            await session.execute(delete(Price).where(Price.commodity_id == COMMODITY_ID))
+            await session.execute(delete(Commodity).where(Commodity.id == COMMODITY_ID))
+            await session.execute(delete(Market).where(Market.state_id == STATE_ID))
+            await session.execute(delete(State).where(State.id == STATE_ID))
+            await session.commit()
+    
+    run(seed)
+    yield
+    run(clean)
+
+
+@pytest.mark.parametrize("sort_order", ["asc", "desc"])
+def test_price_sorted_pages_follow_on_from_each_other(client, prices, sort_order):
+    params = {"commodity_id": COMMODITY_ID, "sort_by": "price", "sort_order": sort_order, "page_size": 2}
+    amounts = []
+    for _ in range(3):
+        response_cache.clear()
+        response = client.get("/api/v1/prices/today", params=params)
+        assert response.status_code == 200
+        amounts += [price["modal_price"] for price in response.json()]
+        params["cursor"] = response.headers.get(NEXT_CURSOR_HEADER)
+    
+    assert params["cursor"] is None
+    assert amounts == sorted([22.5, 18.25, 30.0, 22.75, 19.5], reverse=sort_order == "desc")
@@ -0,0 +1,35 @@
+"""Monthly partition arithmetic; partitions themselves only exist on PostgreSQL."""
+
+from datetime import date
+
+import pytest
+
+from app.core.partitions import PARTITIONED_PRICES, _BOUND_PATTERN, add_months, month_start, partition_name
+
+
+@pytest.mark.parametrize("month, months, expected", [
+    (date(2026, 1, 1), 1, date(2026, 2, 1)),
+    (date(2026, 12, 1), 1, date(2027, 1, 1)),
+    (date(2026, 1, 1), -1, date(2025, 12, 1)),
+    (date(2026, 3, 1), -15, date(2024, 12, 1)),
+])
+def test_add_months_crosses_years(month, months, expected):
+    assert add_months(month, months) == expected
+
+
+def test_partition_names_sort_by_month():
+    months = [add_months(date(2025, 11, 1), i) for i in range(4)]
+    names = [partition_name(month) for month in months]
+    assert names == ["prices_y2025m11", "prices_y2025m12", "prices_y2026m01", "prices_y2026m02"]
+    assert names == sorted(names)
+    assert partition_name(month_start(date(2026, 1, 31))) == "prices_y2026m01"
+
+
+def test_partition_bounds_are_parsed_from_the_catalog_expression():
+    match = _BOUND_PATTERN.search("FOR VALUES FROM ('2026-01-01') TO ('2026-02-01')")
+    assert match.groups() == ("2026-01-01", "2026-02-01")
+    assert _BOUND_PATTERN.search("DEFAULT") is None
+
+
+def test_sqlite_keeps_a_plain_prices_table():
+    assert not PARTITIONED_PRICES
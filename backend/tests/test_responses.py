@@ -0,0 +1,54 @@
+"""The fast JSON path sends the same documents as FastAPI's default serialization."""
+
+from datetime import date
+
+import orjson
+import pytest
+from sqlalchemy import delete
+
+from app.core.cache import response_cache
+from app.core.config import get_settings
+from app.core.database import AsyncSessionLocal
+from app.core.responses import dump_json, dump_models
+from app.models import Commodity
+from app.schemas import CommodityResponse
+
+
+@pytest.fixture
+def commodities(run):
+    async def seed():
+        async with AsyncSessionLocal() as session:
+            session.add(Commodity(id=911, name="Fast Beans", name_telugu="చిక్కుడు", category="fasttest"))
+            session.add(Commodity(id=912, name="Fast Peas", category="fasttest", unit="dozen"))
+            await session.commit()
+    
+    async def clean():
+        async with AsyncSessionLocal() as session:
+            await session.execute(delete(Commodity).where(Commodity.category == "fasttest"))
+            await session.commit()
+    
+    run(seed)
+    yield
+    run(clean)
+
+
+def test_fast_path_matches_default_serialization(client, commodities, monkeypatch):
+    def get():
+        response_cache.clear()
+        response = client.get("/api/v1/commodities", params={"category": "fasttest"})
+        assert response.status_code == 200
+        return response.json()
+    
+    default = get()
+    monkeypatch.setattr(get_settings(), "fast_json_responses", True)
+    assert get() == default
+    assert [item["name"] for item in default] == ["Fast Beans", "Fast Peas"]
+
+
+def test_dump_models_limits_fields():
+    items = [CommodityResponse(id=1, name="Tomato", category="vegetable", unit="kg")]
+    assert orjson.loads(dump_models(items, CommodityResponse, include=["id", "name"])) == [{"id": 1, "name": "Tomato"}]
+
+
+def test_dump_json_handles_dates_and_int_keys():
+    assert dump_json({1: date(2026, 1, 5)}) == b'{"1":"2026-01-05"}'
@@ -0,0 +1,128 @@
+"""Ingestion screening: suspect prices are quarantined, a confirmed new level is accepted and released."""
+
+from datetime import date, timedelta
+
+import pytest
+from sqlalchemy import select, delete
+
+from app.core.config import get_settings
+from app.core.database import AsyncSessionLocal
+from app.models import State, Market, Commodity, Price, QuarantinedPrice
+from app.models.models import SEED_SOURCE_ID, DATA_GOV_SOURCE_ID
+from app.services.screening_service import screen_prices, release_quarantined
+
+STATE_ID, MARKET_ID, COMMODITY_ID = 901, 901, 901
+START = date(2026, 3, 1)
+
+
+@pytest.fixture
+def tomatoes(run):
+    """A market with twenty days of per-kg tomato prices around 40."""
+    async def seed():
+        async with AsyncSessionLocal() as session:
+            session.add(State(id=STATE_ID, name="Screening State", code="SCR"))
+            session.add(Market(id=MARKET_ID, name="Screening Market", state_id=STATE_ID, district="Test"))
+            session.add(Commodity(id=COMMODITY_ID, name="Screening Tomato"))
+            await session.flush()
+            session.add_all(
+                Price(
+                    market_id=MARKET_ID, commodity_id=COMMODITY_ID, price_date=START + timedelta(days=day),
+                    min_price=36 + day % 3, max_price=44 + day % 3, modal_price=40 + day % 3, source_id=SEED_SOURCE_ID
+                )
+                for day in range(20)
+            )
+            await session.commit()
+    
+    async def clean():
+        async with AsyncSessionLocal() as session:
+            for model in (QuarantinedPrice, Price):
+                await session.execute(delete(model).where(model.commodity_id == COMMODITY_ID))
+            await session.execute(delete(Commodity).where(Commodity.id == COMMODITY_ID))
+            await session.execute(delete(Market).where(Market.id == MARKET_ID))
+            await session.execute(delete(State).where(State.id == STATE_ID))
+            await session.commit()
+    
+    run(seed)
+    yield
+    run(clean)
+
+
+def _row(day: int, modal: float) -> dict:
+    return {
+        "market_id": MARKET_ID,
+        "commodity_id": COMMODITY_ID,
+        "price_date": START + timedelta(days=day),
+        "min_price": modal * 0.9,
+        "max_price": modal * 1.1,
+        "modal_price": modal,
+        "source_id": DATA_GOV_SOURCE_ID
+    }
+
+
+def _ingest(row: dict):
+    """Screen and store one row the way the fetch script does."""
+    async def ingest():
+        async with AsyncSessionLocal() as session:
+            result = await screen_prices(session, [row])
+            session.add_all(Price(**accepted) for accepted in result.accepted)
+            session.add_all(QuarantinedPrice(**held) for held in result.quarantined)
+            await session.commit()
+            return result
+    return ingest
+
+
+def _stored(model):
+    async def stored():
+        async with AsyncSessionLocal() as session:
+            return (await session.execute(
+                select(model.price_date, model.modal_price)
+                .where(model.commodity_id == COMMODITY_ID, model.price_date >= START + timedelta(days=20))
+                .order_by(model.price_date)
+            )).all()
+    return stored
+
+
+def test_per_quintal_level_is_accepted_once_confirmed(tomatoes, run):
+    confirm_days = get_settings().screening_confirm_days
+    held = [4100 + day * 20 for day in range(confirm_days)]
+    
+    for day, modal in enumerate(held):
+        result = run(_ingest(_row(20 + day, modal)))
+        assert not result.accepted
+        assert result.quarantined[0]["reason"] == "unit_mismatch"
+    
+    result = run(_ingest(_row(20 + confirm_days, 4150)))
+    assert len(result.accepted) == 1
+    assert len(result.released) == confirm_days
+    
+    assert not run(_stored(QuarantinedPrice))
+    assert [modal for _, modal in run(_stored(Price))] == held + [4150]
+
+
+def test_isolated_spike_stays_quarantined(tomatoes, run):
+    run(_ingest(_row(20, 4100)))
+    result = run(_ingest(_row(21, 41)))
+    assert len(result.accepted) == 1
+    assert not result.released
+    assert len(run(_stored(QuarantinedPrice))) == 1
+
+
+def test_release_quarantined_moves_reviewed_rows(tomatoes, run):
+    run(_ingest(_row(20, 4100)))
+    
+    async def release():
+        async with AsyncSessionLocal() as session:
+            released = await release_quarantined(session, commodity_id=COMMODITY_ID, reason="unit_mismatch")
+            await session.commit()
+            return released
+    
+    assert len(run(release)) == 1
+    assert not run(_stored(QuarantinedPrice))
+    assert run(_stored(Price)) == [(START + timedelta(days=20), 4100)]
+    
+    async def release_everything():
+        async with AsyncSessionLocal() as session:
+            await release_quarantined(session)
+    
+    with pytest.raises(ValueError):
+        run(release_everything)
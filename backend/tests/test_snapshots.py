@@ -0,0 +1,26 @@
+"""Home snapshots are rebuilt once stale, even without an ingestion message."""
+
+from datetime import datetime, timedelta
+
+from app.core.config import get_settings
+from app.services import snapshot_store
+
+
+def test_snapshot_from_yesterday_is_rebuilt(client):
+    assert client.get("/api/v1/prices/snapshot").status_code == 200
+    built_at = snapshot_store.built_at
+    
+    snapshot_store.built_at = built_at - timedelta(days=1)
+    client.get("/api/v1/prices/snapshot")
+    assert snapshot_store.built_at.date() == datetime.now().date()
+    assert snapshot_store.built_at >= built_at
+
+
+def test_snapshot_older_than_the_fallback_ttl_is_rebuilt(client):
+    client.get("/api/v1/prices/snapshot")
+    stale = datetime.now() - timedelta(seconds=get_settings().cache_fallback_ttl_seconds + 1)
+    snapshot_store.built_at = stale
+    
+    client.get("/api/v1/prices/snapshot")
+    assert snapshot_store.built_at > stale
+    assert snapshot_store.is_fresh
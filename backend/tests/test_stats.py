@@ -0,0 +1,46 @@
+"""Price statistics: one series per commodity, named when the commodity still exists."""
+
+from datetime import date, timedelta
+
+import pytest
+from sqlalchemy import delete
+
+from app.core.database import AsyncSessionLocal
+from app.models import Commodity, Price
+from app.services.analytics_service import stats_cache
+
+NAMED_ID, UNNAMED_ID = 907, 908
+
+
+@pytest.fixture
+def prices(run):
+    """Ten days of prices for a commodity and for one whose row was removed."""
+    async def seed():
+        async with AsyncSessionLocal() as session:
+            session.add(Commodity(id=NAMED_ID, name="Stats Garlic"))
+            session.add_all(
+                Price(commodity_id=commodity_id, market_id=1, min_price=amount, max_price=amount, modal_price=amount, price_date=date.today() - timedelta(days=day))
+                for commodity_id in (NAMED_ID, UNNAMED_ID)
+                for day, amount in enumerate(range(60, 50, -1))
+            )
+            await session.commit()
+    
+    async def clean():
+        async with AsyncSessionLocal() as session:
+            await session.execute(delete(Price).where(Price.commodity_id.in_([NAMED_ID, UNNAMED_ID])))
+            await session.execute(delete(Commodity).where(Commodity.id == NAMED_ID))
+            await session.commit()
+    
+    run(seed)
+    stats_cache.clear()
+    yield
+    run(clean)
+
+
+def test_stats_cover_commodities_without_a_name(client, prices):
+    response = client.get("/api/v1/prices/stats", params={"commodity_ids": [NAMED_ID, UNNAMED_ID], "days": 30})
+    assert response.status_code == 200
+    stats = {series["commodity_id"]: series for series in response.json()}
+    assert (stats[NAMED_ID]["commodity_name"], stats[UNNAMED_ID]["commodity_name"]) == ("Stats Garlic", None)
+    assert stats[NAMED_ID]["latest_price"] == 60.0
+    assert stats[NAMED_ID]["days_with_prices"] == 10
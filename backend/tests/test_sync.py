@@ -0,0 +1,102 @@
+"""/sync: each change arrives exactly once across consecutive tokens, deletions as tombstones."""
+
+from datetime import date
+
+import pytest
+from sqlalchemy import delete, update
+
+from app.core.database import AsyncSessionLocal
+from app.models import User, Commodity, Price, PriceAlert
+
+KEPT, RENAMED, REMOVED, ADDED = 918, 919, 920, 921
+USER_ID, OTHER_USER_ID = 918, 919
+
+
+@pytest.fixture
+def commodities(run):
+    async def seed():
+        async with AsyncSessionLocal() as session:
+            session.add_all(Commodity(id=commodity_id, name=f"Sync {commodity_id}", category="synctest") for commodity_id in (KEPT, RENAMED, REMOVED))
+            await session.commit()
+    
+    async def clean():
+        async with AsyncSessionLocal() as session:
+            await session.execute(delete(PriceAlert).where(PriceAlert.user_id.in_([USER_ID, OTHER_USER_ID])))
+            await session.execute(delete(User).where(User.id.in_([USER_ID, OTHER_USER_ID])))
+            await session.execute(delete(Price).where(Price.commodity_id.in_([KEPT, RENAMED])))
+            await session.execute(delete(Commodity).where(Commodity.category == "synctest"))
+            await session.commit()
+    
+    run(seed)
+    yield
+    run(clean)
+
+
+def _sync(client, token=None, **params):
+    response = client.get("/api/v1/sync", params={"since": token, **params} if token else params)
+    assert response.status_code == 200
+    assert response.headers["cache-control"] == "no-store"
+    return response.json()
+
+
+def _ids(changes, table):
+    entry = changes["tables"].get(table, {"columns": ["id"], "rows": [], "deleted": []})
+    position = entry["columns"].index("id")
+    return [row[position] for row in entry["rows"]], entry["deleted"]
+
+
+def test_consecutive_syncs_neither_miss_nor_repeat_rows(client, run, commodities):
+    first = _sync(client)
+    synced, _ = _ids(first, "commodities")
+    assert {KEPT, RENAMED, REMOVED} <= set(synced)
+    
+    async def change():
+        async with AsyncSessionLocal() as session:
+            session.add(Commodity(id=ADDED, name="Sync added", category="synctest"))
+            await session.execute(update(Commodity).where(Commodity.id == RENAMED).values(name="Sync renamed"))
+            await session.execute(delete(Commodity).where(Commodity.id == REMOVED))
+            session.add(Price(commodity_id=KEPT, market_id=1, min_price=10, max_price=12, modal_price=11, price_date=date.today()))
+            await session.commit()
+    
+    run(change)
+    second = _sync(client, first["token"])
+    assert _ids(second, "commodities") == ([RENAMED, ADDED], [REMOVED])
+    renamed = dict(zip(second["tables"]["commodities"]["columns"], second["tables"]["commodities"]["rows"][0]))
+    assert renamed["name"] == "Sync renamed"
+    [price] = second["tables"]["prices"]["rows"]
+    assert price[second["tables"]["prices"]["columns"].index("modal_price")] == 11.0
+    
+    # Nothing changed since: nothing comes back
+    third = _sync(client, second["token"])
+    assert third["tables"] == {}
+    assert int(third["token"]) >= int(second["token"])
+
+
+def test_alert_changes_and_tombstones_reach_only_their_owner(client, run, commodities):
+    async def add_alerts():
+        async with AsyncSessionLocal() as session:
+            session.add_all([User(id=USER_ID), User(id=OTHER_USER_ID)])
+            alerts = [
+                PriceAlert(user_id=user_id, commodity_id=KEPT, threshold_price=20, alert_type="below")
+                for user_id in (USER_ID, OTHER_USER_ID)
+            ]
+            session.add_all(alerts)
+            await session.commit()
+            return [alert.id for alert in alerts]
+    
+    own_alert, other_alert = run(add_alerts)
+    token = _sync(client, user_id=USER_ID)["token"]
+    
+    async def delete_alerts():
+        async with AsyncSessionLocal() as session:
+            await session.execute(delete(PriceAlert).where(PriceAlert.id.in_([own_alert, other_alert])))
+            await session.commit()
+    
+    run(delete_alerts)
+    assert _ids(_sync(client, token, user_id=USER_ID), "price_alerts") == ([], [own_alert])
+    assert "price_alerts" not in _sync(client, token, user_id=OTHER_USER_ID + 1)["tables"]
+    assert "price_alerts" not in _sync(client, token)["tables"]
+
+
+def test_malformed_token_is_rejected(client):
+    assert client.get("/api/v1/sync", params={"since": "yesterday"}).status_code == 400
@@ -0,0 +1,76 @@
+"""Vendor tiles: clusters up to vendor_cluster_max_zoom, individual vendors above it."""
+
+import numpy as np
+import pytest
+from sqlalchemy import delete
+
+from app.core.config import get_settings
+from app.core.database import AsyncSessionLocal
+from app.models import Vendor
+from app.services import vendor_tiles
+from app.services.tile_service import mercator
+
+LAT, LON = 12.9716, 77.5946
+CLUSTER_ZOOM = get_settings().vendor_cluster_max_zoom
+
+
+def _tile(z: int, lat: float = LAT, lon: float = LON) -> str:
+    x, y = mercator(np.array([lat]), np.array([lon]))
+    return f"/api/v1/vendors/tiles/{z}/{int(x[0] * (1 << z))}/{int(y[0] * (1 << z))}"
+
+
+@pytest.fixture
+def vendors(run):
+    """Two vendors about 10 m apart (one verified) and one about 50 km away."""
+    async def seed():
+        async with AsyncSessionLocal() as session:
+            session.add_all([
+                Vendor(name="Tile Vendor A", latitude=LAT, longitude=LON, is_verified=True),
+                Vendor(name="Tile Vendor B", latitude=LAT + 0.0001, longitude=LON, is_verified=False),
+                Vendor(name="Tile Vendor far", latitude=LAT + 0.45, longitude=LON, is_verified=False),
+            ])
+            await session.commit()
+    
+    async def clean():
+        async with AsyncSessionLocal() as session:
+            await session.execute(delete(Vendor).where(Vendor.name.like("Tile Vendor%")))
+            await session.commit()
+    
+    run(seed)
+    vendor_tiles.invalidate()
+    yield
+    run(clean)
+    vendor_tiles.invalidate()
+
+
+def test_tiles_up_to_the_cluster_zoom_hold_clusters(client, vendors):
+    tile = client.get(_tile(CLUSTER_ZOOM)).json()
+    assert "vendors" not in tile
+    [cluster] = tile["clusters"]
+    assert (cluster["count"], cluster["verified"]) == (2, 1)
+    assert cluster["lat"] == pytest.approx(LAT + 0.00005, abs=1e-6)
+    
+    # Zoomed out far enough, the distant vendor joins the same cluster
+    assert [cluster["count"] for cluster in client.get(_tile(4)).json()["clusters"]] == [3]
+
+
+def test_tiles_above_the_cluster_zoom_list_vendors(client, vendors):
+    tile = client.get(_tile(CLUSTER_ZOOM + 1)).json()
+    assert "clusters" not in tile
+    assert sorted((vendor["name"], vendor["verified"]) for vendor in tile["vendors"]) == [("Tile Vendor A", True), ("Tile Vendor B", False)]
+
+
+def test_unchanged_tile_is_not_modified(client, vendors):
+    etag = client.get(_tile(CLUSTER_ZOOM)).headers["etag"]
+    assert client.get(_tile(CLUSTER_ZOOM), headers={"If-None-Match": etag}).status_code == 304
+
+
+def test_new_vendor_appears_in_its_tile(client, vendors):
+    assert len(client.get(_tile(CLUSTER_ZOOM + 1)).json()["vendors"]) == 2
+    created = client.post("/api/v1/vendors/", json={"name": "Tile Vendor C", "latitude": LAT, "longitude": LON + 0.0001})
+    assert created.status_code == 200
+    assert len(client.get(_tile(CLUSTER_ZOOM + 1)).json()["vendors"]) == 3
+
+
+def test_tile_outside_the_zoom_level_is_rejected(client):
+    assert client.get("/api/v1/vendors/tiles/2/4/0").status_code == 400
@@ -0,0 +1,90 @@
+"""Batch trends: one grouped query for every missing series, cached until new prices are ingested."""
+
+import asyncio
+from datetime import date, timedelta
+
+import pytest
+from sqlalchemy import delete, event
+
+from app.core.cache import response_cache
+from app.core.database import AsyncSessionLocal, engine
+from app.models import State, Market, Commodity, Price
+from app.services import broker, INGEST_CHANNEL
+from app.services.price_service import trend_cache
+
+STATE_ID, MARKET_ID = 914, 914
+ONION, POTATO, EMPTY = 914, 915, 916
+
+
+@pytest.fixture
+def prices(run):
+    """Three days of prices for two commodities, none for a third."""
+    async def seed():
+        async with AsyncSessionLocal() as session:
+            session.add(State(id=STATE_ID, name="Trend State", code="TRD"))
+            session.add(Market(id=MARKET_ID, name="Trend Market", state_id=STATE_ID, district="Test"))
+            session.add_all(Commodity(id=commodity_id, name=f"Trend {commodity_id}") for commodity_id in (ONION, POTATO, EMPTY))
+            session.add_all(
+                Price(commodity_id=commodity_id, market_id=MARKET_ID, min_price=base, max_price=base, modal_price=base + day, price_date=date.today() - timedelta(days=day))
+                for commodity_id, base in ((ONION, 30), (POTATO, 20))
+                for day in range(1, 4)
+            )
+            await session.commit()
+    
+    async def clean():
+        async with AsyncSessionLocal() as session:
+            await session.execute(delete(Price).where(Price.market_id == MARKET_ID))
+            await session.execute(delete(Commodity).where(Commodity.id.in_([ONION, POTATO, EMPTY])))
+            await session.execute(delete(Market).where(Market.id == MARKET_ID))
+            await session.execute(delete(State).where(State.id == STATE_ID))
+            await session.commit()
+    
+    run(seed)
+    trend_cache.clear()
+    yield
+    run(clean)
+
+
+@pytest.fixture
+def price_queries():
+    """Statements reading the prices table, recorded while the test runs."""
+    statements = []
+    
+    def record(conn, cursor, statement, parameters, context, executemany):
+        if "FROM prices" in statement:
+            statements.append(statement)
+    
+    event.listen(engine.sync_engine, "before_cursor_execute", record)
+    yield statements
+    event.remove(engine.sync_engine, "before_cursor_execute", record)
+
+
+def _trends(client, *commodity_ids):
+    response_cache.clear()
+    response = client.get("/api/v1/prices/trends", params={"commodity_ids": list(commodity_ids), "days": 7})
+    assert response.status_code == 200
+    return response.json()
+
+
+def test_trends_are_batched_coalesced_and_cached(client, prices, price_queries):
+    trends = _trends(client, POTATO, ONION, POTATO, EMPTY)
+    assert [trend["commodity_id"] for trend in trends] == [POTATO, ONION]  # Request order, no duplicates or empty series
+    assert [point["modal_price"] for point in trends[1]["trend_data"]] == [33.0, 32.0, 31.0]
+    assert len(price_queries) == 1
+    
+    assert _trends(client, ONION, EMPTY) == [trends[1]]
+    assert len(price_queries) == 1  # Both series, the empty one included, came from the cache
+
+
+def test_ingestion_message_clears_cached_trends(client, run, prices):
+    assert len(_trends(client, ONION)[0]["trend_data"]) == 3
+    
+    async def ingest():
+        async with AsyncSessionLocal() as session:
+            session.add(Price(commodity_id=ONION, market_id=MARKET_ID, min_price=40, max_price=40, modal_price=40, price_date=date.today()))
+            await session.commit()
+        await broker.publish(INGEST_CHANNEL, "1")
+        await asyncio.sleep(0.05)  # Let the listener task handle the message
+    
+    run(ingest)
+    assert len(_trends(client, ONION)[0]["trend_data"]) == 4
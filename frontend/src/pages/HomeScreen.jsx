@@ -1,5 +1,5 @@
 import React, { useEffect, useState } from 'react';
-import { fetchTodayPrices, fetchStates } from '../services/api';
+import { fetchHomeSnapshot, subscribePriceUpdates } from '../services/api';
 import PriceCard from '../components/PriceCard';
 import ThemeToggle from '../components/ThemeToggle';
 import LanguageSelector from '../components/LanguageSelector';
@@ -26,37 +26,19 @@ const HomeScreen = () => {
         return state.name;
     };
 
-    useEffect(() => {
-        loadStates();
-    }, []);
-
+    // One snapshot per state holds states, markets and prices; category and sort apply locally
     useEffect(() => {
         loadData();
-    }, [selectedState, selectedCategory, selectedSort]);
-
-    const loadStates = async () => {
-        try {
-            const data = await fetchStates();
-            setStates(data);
-        } catch (err) {
-            console.error('Failed to load states', err);
-        }
-    };
+    }, [selectedState]);
 
     const loadData = async () => {
         try {
             setLoading(true);
             setError(null);
 
-            const [sortBy, sortOrder] = selectedSort.split('-');
-
-            const data = await fetchTodayPrices({
-                stateId: selectedState,
-                category: selectedCategory || null,
-                sortBy: sortBy,
-                sortOrder: sortOrder
-            });
-            setPrices(data);
+            const snapshot = await fetchHomeSnapshot(selectedState);
+            setStates(snapshot.states);
+            setPrices(snapshot.prices);
         } catch (err) {
             console.error('Fetch error:', err);
             setError(err.message || t('failed_to_load'));
@@ -65,10 +47,39 @@ const HomeScreen = () => {
         }
     };
 
-    const filteredPrices = prices.filter(p =>
-        p.commodity_name.toLowerCase().includes(searchQuery.toLowerCase()) ||
-        p.market_name.toLowerCase().includes(searchQuery.toLowerCase())
-    );
+    // Apply pushed price updates in place instead of re-fetching the list
+    useEffect(() => {
+        return subscribePriceUpdates({ stateId: selectedState }, (items) => {
+            const updates = new Map(items.map(u => [`${u.m}-${u.c}`, u]));
+            setPrices(current => current.map(p => {
+                const u = updates.get(`${p.market_id}-${p.commodity_id}`);
+                if (!u || u.d !== p.price_date) return p;
+                return {
+                    ...p,
+                    modal_price: u.p,
+                    min_price: u.lo,
+                    max_price: u.hi,
+                    price_change_percent: u.chg,
+                };
+            }));
+        });
+    }, [selectedState]);
+
+    const sortPrices = (a, b) => {
+        const [sortBy, sortOrder] = selectedSort.split('-');
+        const direction = sortOrder === 'desc' ? -1 : 1;
+        if (sortBy === 'price') return (a.modal_price - b.modal_price) * direction;
+        if (sortBy === 'change') return ((a.price_change_percent || 0) - (b.price_change_percent || 0)) * direction;
+        return a.commodity_name.localeCompare(b.commodity_name) * direction;
+    };
+
+    const filteredPrices = prices
+        .filter(p => !selectedCategory || p.category === selectedCategory)
+        .filter(p =>
+            p.commodity_name.toLowerCase().includes(searchQuery.toLowerCase()) ||
+            p.market_name.toLowerCase().includes(searchQuery.toLowerCase())
+        )
+        .sort(sortPrices);
 
     return (
         <div className="home-screen">
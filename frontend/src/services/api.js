@@ -37,6 +37,20 @@ export const fetchTodayPrices = async (filters = {}) => {
     }
 };
 
+// States, markets, today's prices and top movers for the home screen in one call
+export const fetchHomeSnapshot = async (stateId = null) => {
+    try {
+        const params = {};
+        if (stateId) params.state_id = stateId;
+
+        const response = await api.get('/prices/snapshot', { params });
+        return response.data;
+    } catch (error) {
+        console.error('Error fetching home snapshot:', error);
+        throw error;
+    }
+};
+
 export const fetchMarkets = async () => {
     try {
         const response = await api.get('/markets/');
@@ -60,6 +74,23 @@ export const fetchPriceTrend = async (commodityId, marketId = null, days = 30) =
     }
 };
 
+export const fetchPriceTrends = async (commodityIds, marketIds = null, days = 30) => {
+    try {
+        const params = { commodity_ids: commodityIds, days };
+        if (marketIds && marketIds.length) params.market_ids = marketIds;
+
+        // One request for all series: repeat keys (commodity_ids=1&commodity_ids=2)
+        const response = await api.get('/prices/trends', {
+            params,
+            paramsSerializer: { indexes: null },
+        });
+        return response.data;
+    } catch (error) {
+        console.error('Error fetching trends:', error);
+        throw error;
+    }
+};
+
 export const fetchMarketDetails = async (marketId) => {
     try {
         const response = await api.get(`/markets/${marketId}`);
@@ -70,4 +101,23 @@ export const fetchMarketDetails = async (marketId) => {
     }
 };
 
+// Live price updates over Server-Sent Events; returns a function that closes the stream
+export const subscribePriceUpdates = (filters = {}, onUpdate) => {
+    const params = new URLSearchParams();
+    if (filters.stateId) params.set('state_id', filters.stateId);
+    if (filters.marketId) params.set('market_id', filters.marketId);
+    if (filters.commodityId) params.set('commodity_id', filters.commodityId);
+
+    // EventSource reconnects on its own after network errors
+    const source = new EventSource(`${BASE_URL}/prices/stream?${params}`);
+    source.addEventListener('prices', (event) => {
+        try {
+            onUpdate(JSON.parse(event.data).items);
+        } catch (error) {
+            console.error('Bad price update:', error);
+        }
+    });
+    return () => source.close();
+};
+
 export default api;